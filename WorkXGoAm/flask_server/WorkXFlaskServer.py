@@ -1,22 +1,126 @@
+from startup import startup_profile, subsystems
 from flask import Flask, request, jsonify, Response
-from flask_cors import CORS
+from flask_cors import CORS, cross_origin
+import os
 import sys
 import time
 import ctypes
-from connection import find_free_port, save_port_info, connection_bp
-from video_service import recortar_video
-from floating_face_manager_tk import FloatingFaceManagerTk
-from ui_state import set_popup_hover, get_state, set_auto_hide_rdp, get_auto_hide_rdp, set_on_face_hover_callback
-from classes.core_hotkey_manager import GlobalHotkeyManager
-from classes.core_window_manager import WindowManagerCore
-from rtsp_stream_service import rtsp_service
+startup_profile.mark('import flask')
+from connection import bind_server_socket, save_port_info, connection_bp
+from video_service import (
+    recortar_video, unir_videos, tiempo_a_segundos,
+    obtener_escenas, escenas_en_cache, sugerir_puntos_corte
+)
+from media_cache import file_fingerprint, media_cache
+from media_file_service import media_file_service, APP_ORIGINS
+from thumbnail_service import thumbnail_service
+from proxy_service import proxy_service
+from job_service import job_service
+from event_bus import event_bus, HOTKEY_TRIGGERED, WINDOW_EVENT, UI_FACE_HOVER
+from action_worker import DebouncedActionWorker
+from transcription_service import transcription_service
+from transcript_index import transcript_index
+from ui_state import (
+    set_popup_hover, get_state, set_auto_hide_rdp, wait_for_change, enable_shared_memory
+)
+from wsgi_server import add_server_arguments, config_from_args, serve
+from request_metrics import request_metrics
+startup_profile.mark('import servicios')
 
 app = Flask(__name__)
 CORS(app)
 app.register_blueprint(connection_bp)
+request_metrics.init_app(app)
+startup_profile.mark('crear app')
 
-# Instancia del gestor de ventanas
-window_manager = WindowManagerCore(debug_mode=False)
+# ==========================
+# Subsistemas (se inicializan después de abrir el puerto o en el primer uso)
+# ==========================
+def _init_caches():
+    # Las bases SQLite se crean en el primer uso; aquí se abren en segundo plano tras abrir el puerto
+    media_cache.open()
+    transcript_index.open()
+
+def _init_window_manager():
+    from classes.core_window_manager import WindowManagerCore  # win32gui / psutil
+    window_manager = WindowManagerCore(debug_mode=False)
+    # Avisos al bus (on_window_found no: se dispara por cada ventana en cada enumeración)
+    window_manager.add_callback('on_window_brought_to_front',
+                                lambda hwnd: event_bus.publish(WINDOW_EVENT, {'event': 'brought_to_front', 'hwnd': hwnd}))
+    window_manager.add_callback('on_error',
+                                lambda error, hwnd=None: event_bus.publish(WINDOW_EVENT, {'event': 'error', 'error': error, 'hwnd': hwnd}))
+    return window_manager
+
+def _init_waveform():
+    from waveform_service import waveform_service  # numpy
+    return waveform_service
+
+def _init_rtsp():
+    from rtsp_stream_service import rtsp_service
+    return rtsp_service
+
+def _init_floating_face():
+    from floating_face_manager_tk import FloatingFaceManagerTk  # Tk / PIL
+    # Iniciar carita flotante (versión Tkinter); descarga las imágenes
+    face_manager = FloatingFaceManagerTk(
+        happy_face_url="https://cdn-icons-png.flaticon.com/512/8421/8421363.png",
+        surprised_face_url="https://cdn-icons-png.flaticon.com/512/8421/8421352.png"
+    )
+    face_manager.start()
+    return face_manager
+
+def _init_hotkeys():
+    from classes.core_hotkey_manager import GlobalHotkeyManager  # pynput
+    face_manager = subsystems.get('floating_face')
+
+    # ==========================================
+    # CONFIGURACIÓN GLOBAL DE HOTKEYS
+    # ==========================================
+    hotkey_manager = GlobalHotkeyManager(debug_mode=False)
+
+    # El listener de pynput solo publica en el bus; las acciones corren en el hilo del suscriptor
+    hotkey_actions = {
+        "toggle_face_topmost": face_manager.toggle_always_on_top,
+    }
+
+    def publish_hotkey(name):
+        return lambda: event_bus.publish(HOTKEY_TRIGGERED, {"name": name})
+
+    def run_hotkey_action(event):
+        action = hotkey_actions.get(event.data["name"])
+        if action:
+            action()
+
+    event_bus.subscribe(HOTKEY_TRIGGERED.name, run_hotkey_action, maxsize=16, name="hotkey-actions")
+
+    # Registrar hotkeys globales
+    # CTRL+SHIFT+ALT+U -> Alternar always-on-top (topmost)
+    hotkey_manager.register_hotkey(
+        name="toggle_face_topmost",
+        modifiers=['ctrl', 'shift', 'alt'],
+        key='u',
+        callback=publish_hotkey("toggle_face_topmost"),
+        enabled=True
+    )
+
+    # Iniciar el listener de hotkeys
+    hotkey_manager.start()
+
+    # Mostrar hotkeys registrados
+    print("\n" + "="*60)
+    print("HOTKEYS GLOBALES CONFIGURADOS:")
+    for name, combination in hotkey_manager.get_registered_hotkeys().items():
+        print(f"  • {name}: {combination}")
+    print("="*60 + "\n")
+    return hotkey_manager
+
+# Se inicializan en este orden en segundo plano al arrancar (los perezosos, en su primer uso)
+subsystems.register('caches', _init_caches)
+subsystems.register('window_manager', _init_window_manager)
+subsystems.register('floating_face', _init_floating_face)
+subsystems.register('hotkeys', _init_hotkeys)
+subsystems.register('waveform', _init_waveform)
+subsystems.register('rtsp', _init_rtsp, background=False)
 
 def click_bottom_left_corner():
     """
@@ -58,6 +162,8 @@ def minimize_rdp_and_focus():
     Usada tanto por el endpoint como por el callback de hover.
     """
     try:
+        window_manager = subsystems.get('window_manager')
+
         # Buscar por proceso mstsc.exe (Remote Desktop Connection)
         rdp_windows = window_manager.get_windows_by_process('mstsc.exe')
         rdp_hwnds = set(w['hwnd'] for w in rdp_windows)
@@ -93,8 +199,22 @@ def minimize_rdp_and_focus():
         return {"minimized_count": 0, "focus_transferred": False}
 
 
-# Registrar el callback para cuando el mouse entre al sol con auto activo
-set_on_face_hover_callback(minimize_rdp_and_focus)
+# Minimizar RDP al entrar al sol con auto activo: en un hilo propio (el hilo de Tk no se congela
+# durante las enumeraciones de ventanas y las pausas) y sin repetir por hovers rápidos
+AUTO_HIDE_RDP_DEBOUNCE = 0.5  # segundos desde el último inicio en los que se ignoran nuevos hovers
+AUTO_HIDE_RDP_COOLDOWN = 1.0  # segundos tras terminar en los que se ignoran nuevos hovers
+auto_hide_rdp_worker = DebouncedActionWorker(
+    'auto-hide-rdp', minimize_rdp_and_focus,
+    debounce=AUTO_HIDE_RDP_DEBOUNCE, cooldown=AUTO_HIDE_RDP_COOLDOWN
+)
+
+def _on_face_hover(event):
+    # auto_hide_rdp viaja en el evento: el valor al entrar al sol, no el de cuando se entrega
+    if event.data['hover'] and event.data['auto_hide_rdp']:
+        # published_at: la latencia medida es hover -> minimizado, incluida la entrega del bus
+        auto_hide_rdp_worker.trigger(event.published_at)
+
+event_bus.subscribe(UI_FACE_HOVER.name, _on_face_hover, maxsize=8, name='auto-hide-rdp')
 
 # Rutas de servicio de video
 @app.route('/video/cut', methods=['POST'])
@@ -104,22 +224,317 @@ def cut_video():
     start = data.get('start')
     end = data.get('end')
     output = data.get('output')
+    mode = data.get('mode', 'copy')  # 'copy' (rápido, inicio en keyframe), 'smart' (exacto al frame) o 'reencode' (todo, en paralelo)
     try:
-        result = recortar_video(input_path, start, end, output)
+        result = recortar_video(input_path, start, end, output, mode=mode)
+        # Permitir previsualizar el resultado por /video/file (solo ese archivo, no su carpeta)
+        media_file_service.allow_file(result)
         return jsonify({'status': 'success', 'output': result})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/video/join', methods=['POST'])
+def join_videos():
+    """
+    Une clips en orden sin recodificar (solo se recodifican los que no coinciden).
+    Body JSON: { "inputs": ["C:/a.mp4", "C:/b.mp4"], "output": "C:/unido.mp4" }
+    """
+    try:
+        data = request.get_json() or {}
+        inputs = data.get('inputs') or []
+        output = data.get('output')
+        if not output:
+            return jsonify({"status": "error", "message": "output es requerido"}), 400
+
+        result = unir_videos(inputs, output)
+        media_file_service.allow_file(result['output'])
+        return jsonify({"status": "success", "output": result['output'], "reencoded": result['reencoded']})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except FileNotFoundError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/video/file', methods=['GET', 'HEAD'])
+@cross_origin(origins=APP_ORIGINS)  # sustituye al CORS global (*): solo el frontend puede leer la respuesta
+def video_file():
+    """
+    Sirve un video local para previsualizarlo en la UI.
+    Query: ?path=C:/ruta/video.mp4
+    Soporta Range (206), GET condicional (ETag/Last-Modified -> 304) y envía el archivo con
+    wsgi.file_wrapper cuando el servidor lo ofrece. Solo se sirven archivos de audio/video dentro
+    de los directorios permitidos (Videos, Descargas, Escritorio, Documentos, Música, caché,
+    WORKX_MEDIA_ROOTS) y los archivos generados por /video/cut y /video/join.
+    """
+    try:
+        path = media_file_service.resolve(request.args.get('path', ''))
+        return media_file_service.build_response(path)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except PermissionError as e:
+        return jsonify({"status": "error", "message": str(e)}), 403
+    except FileNotFoundError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/video/thumbnails', methods=['POST'])
+def video_thumbnails():
+    """
+    Genera (o devuelve desde caché) los sprite sheets de miniaturas de un video.
+    Body JSON: {
+        "input": "C:/ruta/video.mp4",
+        "interval": 10,      // segundos entre miniaturas
+        "columns": 10,
+        "rows": 10,
+        "width": 160,        // ancho de cada miniatura
+        "max_tiles": 300     // opcional (1-2000), amplía el intervalo en videos largos
+    }
+    """
+    try:
+        data = request.get_json() or {}
+        input_path = data.get('input')
+        if not input_path:
+            return jsonify({"status": "error", "message": "input es requerido"}), 400
+
+        max_tiles = data.get('max_tiles')
+        if max_tiles is not None:
+            try:
+                max_tiles = int(max_tiles)
+            except (TypeError, ValueError):
+                raise ValueError("max_tiles debe ser un número entero")
+            max_tiles = min(max(max_tiles, 1), thumbnail_service.MAX_TILES)
+
+        thumbnails = thumbnail_service.get_thumbnails(
+            input_path,
+            interval=float(data.get('interval', 10)),
+            columns=int(data.get('columns', 10)),
+            rows=int(data.get('rows', 10)),
+            tile_width=int(data.get('width', 160)),
+            max_tiles=max_tiles
+        )
+        base_url = f"/video/thumbnails/{thumbnails['key']}"
+        return jsonify({"status": "ok", "base_url": base_url, "data": thumbnails})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except FileNotFoundError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/video/thumbnails/<key>/<path:filename>')
+def video_thumbnails_file(key: str, filename: str):
+    """
+    Sirve los sprite sheets (.jpg) y el mapa WebVTT/JSON generados.
+    """
+    from flask import send_from_directory
+
+    sheet_dir = thumbnail_service.get_sheet_directory(key)
+    if sheet_dir is None:
+        return jsonify({"status": "error", "message": f"Miniaturas '{key}' no encontradas"}), 404
+
+    response = send_from_directory(sheet_dir, filename, max_age=31536000)
+    # El contenido es inmutable para una clave dada (depende de la huella del archivo)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
+@app.route('/video/proxy', methods=['POST'])
+def video_proxy():
+    """
+    Devuelve el proxy de baja resolución de un video o encola su generación.
+    Body JSON: { "input": "C:/ruta/video.mp4", "height": 540 }
+    Respuesta: state='ready' con la url del proxy, o state='pending' con el job a consultar en /jobs/<id>.
+    """
+    try:
+        data = request.get_json() or {}
+        input_path = data.get('input')
+        if not input_path:
+            return jsonify({"status": "error", "message": "input es requerido"}), 400
+
+        result = proxy_service.request_proxy(input_path, height=int(data.get('height', 540)))
+        result['url'] = f"/video/proxy/{result['key']}.mp4"
+        return jsonify({"status": "ok", **result})
+    except FileNotFoundError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/video/proxy/<key>.mp4')
+def video_proxy_file(key: str):
+    """
+    Sirve el proxy generado (soporta Range para que el <video> pueda hacer seek).
+    """
+    from flask import send_file
+
+    proxy_path = proxy_service.get_proxy_path(key)
+    if proxy_path is None:
+        return jsonify({"status": "error", "message": f"Proxy '{key}' no encontrado"}), 404
+
+    response = send_file(proxy_path, mimetype='video/mp4', conditional=True, max_age=31536000)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
+@app.route('/video/scenes', methods=['POST'])
+def video_scenes():
+    """
+    Sugiere puntos de corte (cambios de escena) cerca de un tiempo.
+    El índice de escenas se calcula una vez por video en segundo plano y queda cacheado.
+    Body JSON: {
+        "input": "C:/ruta/video.mp4",
+        "time": "00:12:30",   // opcional (segundos o HH:MM:SS); sin él se devuelven todos los cortes
+        "window": 10,         // segundos a cada lado
+        "threshold": 0.3,     // score mínimo de cambio de escena (0..1)
+        "limit": 5
+    }
+    Respuesta: state='ready' con 'suggestions', o state='pending' con el job a consultar en /jobs/<id>.
+    """
+    try:
+        data = request.get_json() or {}
+        input_path = data.get('input')
+        if not input_path:
+            return jsonify({"status": "error", "message": "input es requerido"}), 400
+        if not os.path.exists(input_path):
+            return jsonify({"status": "error", "message": f"El archivo {input_path} no existe"}), 404
+
+        escenas = escenas_en_cache(input_path)
+        if escenas is None:
+            job = job_service.submit('scenes', obtener_escenas, input_path,
+                                     key=f"scenes:{file_fingerprint(input_path)}")
+            return jsonify({"status": "ok", "state": "pending", "job": job})
+
+        tiempo = data.get('time')
+        suggestions = sugerir_puntos_corte(
+            escenas,
+            tiempo=tiempo_a_segundos(tiempo) if tiempo is not None else None,
+            ventana=float(data.get('window', 10)),
+            umbral=float(data.get('threshold', 0.3)),
+            limite=int(data.get('limit', 5))
+        )
+        return jsonify({"status": "ok", "state": "ready", "suggestions": suggestions})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+# ==========================
+# Jobs Endpoints
+# ==========================
+@app.route('/jobs', methods=['GET'])
+def jobs_list():
+    """
+    Lista los trabajos en segundo plano. Query opcional: ?kind=proxy
+    """
+    try:
+        return jsonify({"status": "ok", "jobs": job_service.list_jobs(request.args.get('kind'))})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def jobs_get(job_id: str):
+    """
+    Estado de un trabajo: status ('queued', 'running', 'done', 'error'), progress (0..1), result o error.
+    """
+    job = job_service.get_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": f"Trabajo '{job_id}' no encontrado"}), 404
+    return jsonify({"status": "ok", "job": job})
+
+# ==========================
+# Waveform Endpoints
+# ==========================
+@app.route('/audio/waveform', methods=['POST'])
+def audio_waveform():
+    """
+    Genera (o devuelve desde caché) los picos de audio de un video o WAV.
+    Body JSON: { "input": "C:/ruta/archivo.wav", "bits": 8 }
+    La respuesta describe los niveles de zoom; los datos se descargan de /audio/waveform/<key>.
+    """
+    try:
+        data = request.get_json() or {}
+        input_path = data.get('input')
+        if not input_path:
+            return jsonify({"status": "error", "message": "input es requerido"}), 400
+
+        meta = subsystems.get('waveform').get_waveform(input_path, bits=int(data.get('bits', 8)))
+        return jsonify({"status": "ok", "url": f"/audio/waveform/{meta['key']}", "data": meta})
+    except FileNotFoundError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/audio/waveform/<key>')
+def audio_waveform_file(key: str):
+    """
+    Sirve el archivo binario de picos (cabecera WXPK + niveles min/max).
+    """
+    from flask import send_file
+
+    peaks_path = subsystems.get('waveform').get_peaks_path(key)
+    if peaks_path is None:
+        return jsonify({"status": "error", "message": f"Waveform '{key}' no encontrado"}), 404
+
+    response = send_file(peaks_path, mimetype='application/octet-stream', max_age=31536000)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
 # ==========================
 # UI state para coordinación con Tauri
 # ==========================
+UI_LONG_POLL_MAX = 60.0     # segundos máximos que espera GET /ui/state?since=
+UI_STREAM_HEARTBEAT = 30.0  # comentario SSE para detectar clientes desconectados
+
 @app.route('/ui/state', methods=['GET'])
 def ui_state_get():
+    """
+    Estado UI. Con ?since=<version> hace long-poll: responde en cuanto la versión
+    supera 'since' o al agotarse ?timeout= (por defecto 25s) con el estado sin cambios.
+    """
     try:
-        return jsonify({"status": "ok", "data": get_state()})
+        since = request.args.get('since', type=int)
+        if since is None:
+            return jsonify({"status": "ok", "data": get_state()})
+        timeout = min(max(request.args.get('timeout', 25.0, type=float), 0.0), UI_LONG_POLL_MAX)
+        return jsonify({"status": "ok", "data": wait_for_change(since, timeout)})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/ui/state/stream', methods=['GET'])
+def ui_state_stream():
+    """
+    Server-Sent Events con el estado UI: un evento 'state' por cada cambio de versión.
+    Sin cambios solo se envía un comentario cada UI_STREAM_HEARTBEAT segundos.
+    """
+    import json
+
+    since = request.args.get('since', -1, type=int)
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    if last_event_id is not None:
+        since = last_event_id
+
+    def generator():
+        version = since
+        yield 'retry: 1000\n\n'
+        while True:
+            state = wait_for_change(version, UI_STREAM_HEARTBEAT)
+            if state['version'] == version:
+                yield ': ping\n\n'
+                continue
+            version = state['version']
+            yield f"id: {version}\nevent: state\ndata: {json.dumps(state)}\n\n"
+
+    response = Response(generator(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/ui/popup/hover', methods=['POST'])
 def ui_popup_hover():
     try:
@@ -143,6 +558,60 @@ def ui_auto_hide_rdp():
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/ui/auto-hide-rdp/stats', methods=['GET'])
+def ui_auto_hide_rdp_stats():
+    """
+    Disparos aceptados/descartados (debounce, en curso, enfriamiento) del modo automático y
+    latencias en ms: wait_ms (hover -> inicio), action_ms (minimizar) y total_ms (hover -> minimizado).
+    """
+    return jsonify({"status": "ok", "data": auto_hide_rdp_worker.stats()})
+
+# ==========================
+# Event Bus Endpoints
+# ==========================
+EVENTS_STREAM_HEARTBEAT = 15.0  # comentario SSE cuando no hay eventos
+EVENTS_STREAM_QUEUE = 512       # eventos pendientes por cliente antes de descartar los más antiguos
+
+@app.route('/events/stream', methods=['GET'])
+def events_stream():
+    """
+    Server-Sent Events con los eventos del bus. ?topics=ui.,stream.,job.update
+    (nombres exactos, prefijos terminados en punto o *; por defecto todos).
+    Los tópicos de alta frecuencia llegan coalescidos: solo el último valor pendiente por clave.
+    """
+    import json
+
+    topics = [t for t in request.args.get('topics', '*').split(',') if t.strip()]
+    try:
+        subscription = event_bus.subscribe(topics or '*', maxsize=EVENTS_STREAM_QUEUE, name=f"sse:{request.remote_addr}")
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    def generator():
+        try:
+            yield 'retry: 1000\n\n'
+            while True:
+                event = subscription.get(timeout=EVENTS_STREAM_HEARTBEAT)
+                if event is None:
+                    if subscription.closed:
+                        return
+                    yield ': ping\n\n'
+                    continue
+                payload = json.dumps(event.to_dict(), default=str)
+                yield f"id: {event.seq}\nevent: {event.topic}\ndata: {payload}\n\n"
+        finally:
+            subscription.close()
+
+    response = Response(generator(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/events/stats', methods=['GET'])
+def events_stats():
+    """Eventos publicados por tópico y, por suscriptor: entregados, descartados, coalescidos y latencia."""
+    return jsonify({"status": "ok", "data": event_bus.stats()})
+
 # ==========================
 # Window Management Endpoints
 # ==========================
@@ -185,9 +654,9 @@ def stream_start():
         if not rtsp_url:
             return jsonify({"status": "error", "message": "rtsp_url es requerido"}), 400
         
-        success = rtsp_service.start_stream(stream_id, rtsp_url, with_audio=with_audio)
+        success = subsystems.get('rtsp').start_stream(stream_id, rtsp_url, with_audio=with_audio)
         if success:
-            mode = rtsp_service.get_stream_mode(stream_id)
+            mode = subsystems.get('rtsp').get_stream_mode(stream_id)
             if mode == 'hls':
                 stream_url = f"/stream/hls/{stream_id}/stream.m3u8"
             else:
@@ -214,7 +683,7 @@ def stream_stop():
         data = request.get_json() or {}
         stream_id = data.get('stream_id', 'default')
         
-        success = rtsp_service.stop_stream(stream_id)
+        success = subsystems.get('rtsp').stop_stream(stream_id)
         return jsonify({
             "status": "ok",
             "message": f"Stream '{stream_id}' detenido" if success else f"Stream '{stream_id}' no encontrado"
@@ -228,7 +697,7 @@ def stream_feed(stream_id: str):
     Endpoint que sirve el stream MJPEG.
     Usar como src de un tag <img> para visualizar.
     """
-    generator = rtsp_service.get_frame_generator(stream_id)
+    generator = subsystems.get('rtsp').get_frame_generator(stream_id)
     if generator is None:
         return jsonify({"status": "error", "message": f"Stream '{stream_id}' no encontrado o no es MJPEG"}), 404
     
@@ -244,7 +713,7 @@ def stream_hls(stream_id: str, filename: str):
     """
     from flask import send_from_directory
     
-    stream_dir = rtsp_service.get_hls_directory(stream_id)
+    stream_dir = subsystems.get('rtsp').get_hls_directory(stream_id)
     if stream_dir is None:
         return jsonify({"status": "error", "message": f"Stream HLS '{stream_id}' no encontrado"}), 404
     
@@ -268,10 +737,10 @@ def stream_status():
     Retorna el estado de los streams activos.
     """
     try:
-        active_streams = rtsp_service.get_active_streams()
+        active_streams = subsystems.get('rtsp').get_active_streams()
         streams_info = []
         for sid in active_streams:
-            mode = rtsp_service.get_stream_mode(sid)
+            mode = subsystems.get('rtsp').get_stream_mode(sid)
             streams_info.append({"id": sid, "mode": mode})
         return jsonify({
             "status": "ok",
@@ -280,50 +749,203 @@ def stream_status():
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+# ==========================
+# Transcripción (FileToText / wav_monitor en proceso)
+# ==========================
+@app.route('/transcription/submit', methods=['POST'])
+def transcription_submit():
+    """
+    Encola la transcripción de un archivo de audio.
+    Body JSON: { "path": "C:/audio.wav", "language": "en", "prompt": "...", "model": null, "output": null }
+    Sin "model" se transcribe con todos los modelos y se optimiza el resultado.
+    """
+    try:
+        data = request.get_json() or {}
+        path = data.get('path')
+        if not path:
+            raise ValueError("Falta 'path'")
+        job = transcription_service.submit(
+            path,
+            language=data.get('language'),
+            prompt=data.get('prompt'),
+            model=data.get('model'),
+            output=data.get('output')
+        )
+        return jsonify({"status": "ok", "job": job})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except FileNotFoundError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/transcription/jobs', methods=['GET'])
+def transcription_jobs():
+    kind = request.args.get('kind')
+    return jsonify({"status": "ok", "jobs": transcription_service.jobs.list_jobs(kind)})
+
+@app.route('/transcription/jobs/<job_id>', methods=['GET'])
+def transcription_job(job_id: str):
+    job = transcription_service.jobs.get_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": f"Trabajo '{job_id}' no encontrado"}), 404
+    return jsonify({"status": "ok", "job": job})
+
+@app.route('/transcription/monitor/start', methods=['POST'])
+def transcription_monitor_start():
+    """
+    Monitorea un directorio de WAVs (equivalente a wav_monitor.py --monitor-dir).
+    Body JSON: { "directory": "C:/grabaciones", "check_interval": 5 }
+    """
+    try:
+        data = request.get_json() or {}
+        directory = data.get('directory')
+        if not directory:
+            raise ValueError("Falta 'directory'")
+        monitor = transcription_service.start_monitor(directory, int(data.get('check_interval', 5)))
+        return jsonify({"status": "ok", "monitor": monitor})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/transcription/monitor/stop', methods=['POST'])
+def transcription_monitor_stop():
+    """Body JSON: { "directory": "C:/grabaciones" }"""
+    try:
+        data = request.get_json() or {}
+        directory = data.get('directory')
+        if not directory:
+            raise ValueError("Falta 'directory'")
+        stopped = transcription_service.stop_monitor(directory)
+        if not stopped:
+            return jsonify({"status": "error", "message": f"No hay monitor activo en '{directory}'"}), 404
+        return jsonify({"status": "ok"})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/transcription/monitors', methods=['GET'])
+def transcription_monitors():
+    return jsonify({"status": "ok", "monitors": transcription_service.list_monitors()})
+
+@app.route('/transcripts/search', methods=['GET'])
+def transcripts_search():
+    """
+    Búsqueda de texto completo en las transcripciones indexadas, por relevancia y con snippet.
+    Query: ?q=texto&directory=C:/grabaciones&limit=20&offset=0&silence=0
+           &before=<next_before> para ordenar las coincidencias más antiguas cuando truncated es true
+    """
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            raise ValueError("Falta 'q'")
+        directory = request.args.get('directory')
+        if directory and transcription_service.is_monitored(directory):
+            # Solo se leen TXT de directorios monitoreados; cualquier otro se consulta en el índice tal cual
+            transcript_index.sync_directory(directory)
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 200)
+        page = transcript_index.search(
+            query,
+            directory=directory,
+            limit=limit,
+            offset=max(request.args.get('offset', 0, type=int), 0),
+            include_silence=request.args.get('silence', '0') == '1',
+            before=request.args.get('before', type=int)
+        )
+        return jsonify({"status": "ok", **page})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/transcripts/latest', methods=['GET'])
+def transcripts_latest():
+    """
+    Últimas transcripciones (más recientes primero).
+    Query: ?directory=C:/grabaciones&limit=50&offset=0 o &before=<recorded_at del último de la página>
+           &silence=0 para omitir silencios, &models=1 para incluir el texto de cada modelo
+    """
+    try:
+        directory = request.args.get('directory')
+        if directory and transcription_service.is_monitored(directory):
+            # Solo se leen TXT de directorios monitoreados; cualquier otro se consulta en el índice tal cual
+            transcript_index.sync_directory(directory)
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+        items = transcript_index.latest(
+            directory=directory,
+            limit=limit,
+            offset=max(request.args.get('offset', 0, type=int), 0),
+            before=request.args.get('before', type=float),
+            include_silence=request.args.get('silence', '1') == '1',
+            with_models=request.args.get('models', '0') == '1'
+        )
+        next_before = items[-1]['recorded_at'] if len(items) == limit else None
+        return jsonify({"status": "ok", "items": items, "next_before": next_before})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+# ==========================
+# Arranque
+# ==========================
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    """
+    Disponibilidad por subsistema. /api/health responde en cuanto el puerto está abierto;
+    este endpoint devuelve 503 hasta que terminan los inits en segundo plano.
+    """
+    is_ready = subsystems.is_ready()
+    return jsonify({
+        "status": "ok",
+        "ready": is_ready,
+        "uptime_ms": round(startup_profile.elapsed() * 1000, 1),
+        "subsystems": subsystems.status()
+    }), 200 if is_ready else 503
+
+# ==========================
+# Métricas
+# ==========================
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Latencia por ruta, peticiones en curso, códigos de estado y bytes en formato Prometheus."""
+    return Response(request_metrics.render_prometheus(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
 # Set console title (Windows)
 if sys.platform == 'win32':
     import ctypes
     ctypes.windll.kernel32.SetConsoleTitleW("WorkXFlaskServer")
 
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="WorkX Flask Server")
+    add_server_arguments(parser)
+    parser.add_argument('--slow-request-ms', type=float, default=request_metrics.slow_threshold * 1000,
+                        help="Registrar en consola las peticiones que tarden más de estos milisegundos")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Imprimir el desglose de tiempos de imports e inicialización de subsistemas")
+    args = parser.parse_args()
+    request_metrics.set_slow_threshold(args.slow_request_ms)
+
     app.debug = False  # Disable debug in prod
-    port = find_free_port(default_port=8080)
+    config = config_from_args(args)
+    # Un solo bind: el mismo socket pasa al servidor WSGI, así nadie puede ocupar el puerto entre medias
+    sock = bind_server_socket(default_port=8080, host='127.0.0.1', backlog=config.backlog)
+    port = sock.getsockname()[1]
     print(f"Starting on port: {port}")
+    try:
+        # Estado UI compartido en memoria (lectura sin HTTP desde Tauri); su ruta va en server-port.json
+        port_extra = {"ui_state_shm": enable_shared_memory()}
+    except OSError as e:
+        print(f"Estado UI compartido no disponible: {e}")
+        port_extra = None
 
-    save_port_info(port)
-
-    # ==========================================
-    # CONFIGURACIÓN GLOBAL DE HOTKEYS
-    # ==========================================
-    hotkey_manager = GlobalHotkeyManager(debug_mode=False)
-    
-    # Iniciar carita flotante (versión Tkinter)
-    face_manager = FloatingFaceManagerTk(
-        happy_face_url="https://cdn-icons-png.flaticon.com/512/8421/8421363.png",
-        surprised_face_url="https://cdn-icons-png.flaticon.com/512/8421/8421352.png"
-    )
-    face_manager.start()
-    
-    # Registrar hotkeys globales
-    # CTRL+SHIFT+ALT+U -> Alternar always-on-top (topmost)
-    hotkey_manager.register_hotkey(
-        name="toggle_face_topmost",
-        modifiers=['ctrl', 'shift', 'alt'],
-        key='u',
-        callback=face_manager.toggle_always_on_top,
-        enabled=True
-    )
-    
-    # Iniciar el listener de hotkeys
-    hotkey_manager.start()
-    
-    # Mostrar hotkeys registrados
-    print("\n" + "="*60)
-    print("HOTKEYS GLOBALES CONFIGURADOS:")
-    for name, combination in hotkey_manager.get_registered_hotkeys().items():
-        print(f"  • {name}: {combination}")
-    print("="*60 + "\n")
-
-    extra_files = []
+    def on_listening():
+        # Tauri espera el archivo de puerto y /api/health: se escriben antes de iniciar los subsistemas
+        save_port_info(port, port_extra)
+        startup_profile.mark('puerto abierto y server-port.json escrito')
+        on_done = (lambda: print(startup_profile.report())) if args.profile_startup else None
+        subsystems.start_background(on_done=on_done)
 
-    app.run(host='127.0.0.1', port=port, extra_files=extra_files)
+    # waitress por defecto; --server dev usa app.run (Werkzeug) como respaldo para desarrollo
+    serve(app, sock, config=config, on_listening=on_listening)
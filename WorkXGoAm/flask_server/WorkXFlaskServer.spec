@@ -3,7 +3,7 @@
 
 a = Analysis(
     ['WorkXFlaskServer.py'],
-    pathex=[],
+    pathex=['../src-python'],
     binaries=[],
     datas=[],
     hiddenimports=[],
@@ -0,0 +1,120 @@
+"""
+Action Worker - Ejecuta una acción lenta (p. ej. minimizar RDP) en un hilo dedicado, disparada
+desde hilos que no pueden esperar (Tk, bus de eventos), con debounce de flanco de subida,
+protección contra ejecuciones simultáneas, enfriamiento y latencias medidas
+"""
+
+import time
+import threading
+import traceback
+from collections import deque
+from typing import Any, Callable, Optional
+
+
+def _percentiles(samples) -> Optional[dict]:
+    if not samples:
+        return None
+    values = sorted(samples)
+    p50 = values[len(values) // 2]
+    p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+    return {'p50': round(p50, 1), 'p99': round(p99, 1), 'max': round(values[-1], 1), 'samples': len(values)}
+
+
+class DebouncedActionWorker:
+    """
+    trigger() nunca bloquea: decide al instante si el disparo se ejecuta o se descarta.
+    - Flanco de subida: el primer disparo se ejecuta enseguida; los siguientes dentro de
+      'debounce' segundos desde ese inicio se descartan (hover que entra y sale rápido).
+    - En curso: mientras la acción corre, cualquier disparo se descarta.
+    - Enfriamiento: tras terminar, se descartan los disparos durante 'cooldown' segundos.
+    Latencias (ms): espera (disparo -> inicio), duración de la acción y total (disparo -> fin).
+    """
+
+    SAMPLES = 256
+
+    def __init__(self, name: str, action: Callable[[], Any], debounce: float = 0.5, cooldown: float = 1.0):
+        self.name = name
+        self._action = action
+        self.debounce = debounce
+        self.cooldown = cooldown
+        self._cond = threading.Condition()
+        self._pending: Optional[float] = None   # perf_counter del disparo aceptado y aún no iniciado
+        self._running = False
+        self._last_start = float('-inf')
+        self._last_end = float('-inf')
+        self._last_result: Any = None
+        self._counts = {'triggered': 0, 'executed': 0, 'skipped_debounce': 0, 'skipped_in_flight': 0,
+                        'skipped_cooldown': 0, 'errors': 0}
+        self._wait_ms: deque = deque(maxlen=self.SAMPLES)
+        self._run_ms: deque = deque(maxlen=self.SAMPLES)
+        self._total_ms: deque = deque(maxlen=self.SAMPLES)
+        self._thread = threading.Thread(target=self._worker, name=f'action:{name}', daemon=True)
+        self._thread.start()
+
+    def trigger(self, triggered_at: Optional[float] = None) -> bool:
+        """
+        Pide ejecutar la acción.
+
+        Args:
+            triggered_at: perf_counter del origen (p. ej. cuando se publicó el hover); por defecto ahora
+
+        Returns:
+            True si el disparo se aceptó, False si se descartó
+        """
+        now = time.perf_counter()
+        triggered_at = now if triggered_at is None else triggered_at
+        with self._cond:
+            self._counts['triggered'] += 1
+            if self._running or self._pending is not None:
+                self._counts['skipped_in_flight'] += 1
+                return False
+            if now - self._last_start < self.debounce:
+                self._counts['skipped_debounce'] += 1
+                return False
+            if now - self._last_end < self.cooldown:
+                self._counts['skipped_cooldown'] += 1
+                return False
+            self._pending = triggered_at
+            self._cond.notify()
+            return True
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None)
+                triggered_at = self._pending
+                self._pending = None
+                self._running = True
+                self._last_start = time.perf_counter()
+            start = self._last_start
+            result = None
+            try:
+                result = self._action()
+            except Exception as e:
+                print(f"[ActionWorker] Error en '{self.name}': {e}")
+                traceback.print_exc()
+                with self._cond:
+                    self._counts['errors'] += 1
+            end = time.perf_counter()
+            with self._cond:
+                self._running = False
+                self._last_end = end
+                self._last_result = result
+                self._counts['executed'] += 1
+                self._wait_ms.append((start - triggered_at) * 1000)
+                self._run_ms.append((end - start) * 1000)
+                self._total_ms.append((end - triggered_at) * 1000)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return dict(
+                self._counts,
+                name=self.name,
+                debounce=self.debounce,
+                cooldown=self.cooldown,
+                running=self._running,
+                last_result=self._last_result,
+                wait_ms=_percentiles(self._wait_ms),
+                action_ms=_percentiles(self._run_ms),
+                total_ms=_percentiles(self._total_ms),
+            )
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recorte por lotes a partir de una lista de edición (CSV o JSON) con varios archivos de entrada.
+
+Formato CSV (con cabecera):
+    input,start,end,output,mode
+    C:/videos/a.mp4,00:01:00,00:02:00,,copy
+    C:/videos/a.mp4,00:10:00,00:10:30,clip_b.mp4,smart
+
+Formato JSON: lista de objetos con las mismas claves, o {"cuts": [...]}.
+'output' y 'mode' son opcionales; las rutas relativas se resuelven respecto a la lista.
+
+Uso:
+    python batch_cut.py edits.csv --output-dir C:/clips --jobs 4 --per-disk 1
+"""
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from media_cache import media_cache
+from video_service import MODO_COPY, generar_nombre_salida, recortar_varios, tiempo_a_segundos
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Recorta muchos rangos de muchos videos a partir de una lista de edición CSV/JSON.'
+    )
+    parser.add_argument(
+        'edit_list', help='Ruta a la lista de edición (.csv o .json)'
+    )
+    parser.add_argument(
+        '-o', '--output-dir', help='Carpeta de salida (por defecto, junto a cada video de entrada)', default=None
+    )
+    parser.add_argument(
+        '-m', '--mode', help="Modo por defecto: copy, smart o reencode", default=MODO_COPY
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=min(4, os.cpu_count() or 1),
+        help='Archivos de entrada procesados a la vez en total'
+    )
+    parser.add_argument(
+        '--per-disk', type=int, default=1,
+        help='Archivos de entrada procesados a la vez por disco (1 evita saltos del cabezal en HDD; subir en SSD)'
+    )
+    parser.add_argument(
+        '--force', action='store_true', help='Recortar aunque la salida ya exista y sea válida'
+    )
+    return parser.parse_args()
+
+
+def cargar_lista(path):
+    """Lee la lista de edición y devuelve una lista de dicts con input, start, end, output y mode."""
+    if path.lower().endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        filas = data.get('cuts', []) if isinstance(data, dict) else data
+    else:
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            filas = list(csv.DictReader(f))
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    cortes = []
+    for num, fila in enumerate(filas, start=1):
+        fila = {k.strip().lower(): (str(v).strip() if v is not None else '') for k, v in fila.items() if k}
+        if not fila.get('input') or not fila.get('start') or not fila.get('end'):
+            raise ValueError(f"Fila {num}: input, start y end son obligatorios")
+        if tiempo_a_segundos(fila['end']) <= tiempo_a_segundos(fila['start']):
+            raise ValueError(f"Fila {num}: el tiempo de fin debe ser mayor que el de inicio")
+        cortes.append({
+            'input': os.path.join(base_dir, fila['input']),
+            'start': fila['start'],
+            'end': fila['end'],
+            'output': os.path.join(base_dir, fila['output']) if fila.get('output') else None,
+            'mode': fila.get('mode') or None,
+        })
+    return cortes
+
+
+def ruta_salida(corte, output_dir):
+    if corte['output']:
+        return corte['output']
+    nombre = generar_nombre_salida(corte['input'], corte['start'], corte['end'])
+    return os.path.join(output_dir or os.path.dirname(corte['input']), nombre)
+
+
+def ruta_parcial(salida):
+    # Se escribe con otro nombre y se renombra al terminar: una salida a medias nunca parece válida
+    name, ext = os.path.splitext(salida)
+    return f"{name}.partial{ext}"
+
+
+def salida_valida(salida, duracion_esperada):
+    """Una salida es válida si ffprobe la lee, tiene video y dura al menos lo pedido."""
+    if not os.path.exists(salida) or os.path.getsize(salida) == 0:
+        return False
+    try:
+        info = media_cache.probe(salida)
+    except Exception:
+        return False
+    if not any(s.get('codec_type') == 'video' for s in info.get('streams', [])):
+        return False
+    duracion = float(info.get('format', {}).get('duration') or 0)
+    return duracion >= duracion_esperada - 0.5
+
+
+class Progreso:
+    """Progreso agregado de todos los grupos, con throughput en MB/s y en segundos de video por segundo."""
+
+    def __init__(self, total):
+        self.total = total
+        self.hechos = 0
+        self.omitidos = 0
+        self.fallidos = 0
+        self.bytes = 0
+        self.segundos_video = 0.0
+        self.inicio = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def registrar(self, salida=None, duracion=0.0, omitido=False, fallido=False):
+        with self._lock:
+            if fallido:
+                self.fallidos += 1
+            elif omitido:
+                self.omitidos += 1
+            else:
+                self.hechos += 1
+                self.bytes += os.path.getsize(salida)
+                self.segundos_video += duracion
+            self._imprimir()
+
+    def _imprimir(self):
+        transcurrido = max(time.perf_counter() - self.inicio, 1e-6)
+        completados = self.hechos + self.omitidos + self.fallidos
+        print(
+            f"[{completados}/{self.total}] "
+            f"{self.bytes / (1024 * 1024):.1f} MB | "
+            f"{self.bytes / (1024 * 1024) / transcurrido:.1f} MB/s | "
+            f"{self.segundos_video / transcurrido:.1f}x tiempo real | "
+            f"omitidos {self.omitidos} | fallidos {self.fallidos}",
+            flush=True
+        )
+
+
+def procesar_grupo(input_path, mode, cortes, semaforo, progreso, force):
+    """Recorta todos los rangos de un archivo de entrada (una sola lectura en modo copy)."""
+    pendientes = []
+    for corte in cortes:
+        duracion = tiempo_a_segundos(corte['end']) - tiempo_a_segundos(corte['start'])
+        if not force and salida_valida(corte['salida'], duracion):
+            progreso.registrar(omitido=True)
+        else:
+            pendientes.append((corte, duracion))
+    if not pendientes:
+        return
+
+    completados = set()
+
+    def al_terminar(idx, parcial):
+        corte, duracion = pendientes[idx]
+        os.replace(parcial, corte['salida'])
+        completados.add(idx)
+        progreso.registrar(corte['salida'], duracion)
+
+    with semaforo:
+        try:
+            for corte, _ in pendientes:
+                os.makedirs(os.path.dirname(os.path.abspath(corte['salida'])), exist_ok=True)
+            recortar_varios(
+                input_path,
+                [(c['start'], c['end'], ruta_parcial(c['salida'])) for c, _ in pendientes],
+                mode=mode,
+                al_terminar=al_terminar
+            )
+        except Exception as e:
+            print(f"Error recortando {input_path}: {e}", file=sys.stderr)
+            for idx, (corte, _) in enumerate(pendientes):
+                if idx in completados:
+                    continue
+                progreso.registrar(fallido=True)
+                parcial = ruta_parcial(corte['salida'])
+                if os.path.exists(parcial):
+                    os.remove(parcial)
+
+
+def main():
+    args = parse_args()
+    cortes = cargar_lista(args.edit_list)
+
+    # Agrupar por (entrada, modo) conservando el orden de la lista
+    grupos = OrderedDict()
+    for corte in cortes:
+        if not os.path.exists(corte['input']):
+            print(f"El archivo {corte['input']} no existe", file=sys.stderr)
+            return 1
+        corte['salida'] = ruta_salida(corte, args.output_dir)
+        grupos.setdefault((corte['input'], corte['mode'] or args.mode), []).append(corte)
+
+    # Un semáforo por disco físico: limita lecturas simultáneas del mismo dispositivo
+    semaforos = {}
+    for input_path, _ in grupos:
+        dispositivo = os.stat(input_path).st_dev
+        semaforos.setdefault(dispositivo, threading.Semaphore(max(1, args.per_disk)))
+
+    print(f"{len(cortes)} cortes de {len(grupos)} grupo(s) en {len(semaforos)} disco(s)")
+    progreso = Progreso(len(cortes))
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = [
+            pool.submit(
+                procesar_grupo, input_path, mode, grupo,
+                semaforos[os.stat(input_path).st_dev], progreso, args.force
+            )
+            for (input_path, mode), grupo in grupos.items()
+        ]
+        for future in as_completed(futures):
+            future.result()
+
+    transcurrido = time.perf_counter() - progreso.inicio
+    print(f"Terminado en {transcurrido:.1f}s: {progreso.hechos} recortados, "
+          f"{progreso.omitidos} omitidos, {progreso.fallidos} fallidos")
+    return 1 if progreso.fallidos else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
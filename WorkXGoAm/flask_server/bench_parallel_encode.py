@@ -0,0 +1,95 @@
+"""
+Benchmark: recodificación en un solo proceso ffmpeg vs recodificar_paralelo (tramos entre keyframes).
+
+Uso:
+    python bench_parallel_encode.py                     # genera un video sintético 1080p de 60 s
+    python bench_parallel_encode.py C:/ruta/video.mp4   # usa un video real
+    python bench_parallel_encode.py --duration 120 --workers 4
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+from video_service import (
+    ejecutar_ffmpeg, obtener_info_media, recodificar_paralelo, _parametros_video, _parametros_audio
+)
+
+
+def generar_video_sintetico(path: str, duracion: int):
+    print(f"Generando video sintético de {duracion}s en {path} ...")
+    ejecutar_ffmpeg([
+        'ffmpeg', '-y',
+        '-f', 'lavfi', '-i', f"testsrc2=size=1920x1080:rate=30:duration={duracion}",
+        '-f', 'lavfi', '-i', f"sine=frequency=440:duration={duracion}",
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-g', '60',
+        '-c:a', 'aac', '-b:a', '128k',
+        path
+    ])
+
+
+def recodificar_un_proceso(input_path: str, output_path: str):
+    """Referencia: un solo ffmpeg con los mismos parámetros de encoder que usa el modo paralelo."""
+    streams = obtener_info_media(input_path).get('streams', [])
+    video = next(s for s in streams if s.get('codec_type') == 'video')
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+    ejecutar_ffmpeg([
+        'ffmpeg', '-y',
+        '-i', input_path,
+        '-map', '0:v:0',
+        *_parametros_video(video, encoder_defecto='libx264'),
+        *_parametros_audio(audio),
+        output_path
+    ])
+
+
+def medir(nombre: str, func, *args) -> float:
+    inicio = time.perf_counter()
+    func(*args)
+    segundos = time.perf_counter() - inicio
+    print(f"  {nombre:<14} {segundos:8.2f} s")
+    return segundos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de recodificación paralela por tramos")
+    parser.add_argument('input', nargs='?', help="Video de entrada (por defecto se genera uno sintético)")
+    parser.add_argument('--duration', type=int, default=60, help="Duración del video sintético en segundos")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos ffmpeg simultáneos (por defecto, núcleos)")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='workx_bench_encode_')
+    try:
+        input_path = args.input
+        if not input_path:
+            input_path = os.path.join(work_dir, 'input.mp4')
+            generar_video_sintetico(input_path, args.duration)
+
+        duracion = float(obtener_info_media(input_path).get('format', {}).get('duration') or 0)
+        print(f"\nEntrada: {input_path} ({duracion:.1f}s), núcleos: {os.cpu_count()}")
+
+        t_single = medir('un proceso', recodificar_un_proceso, input_path, os.path.join(work_dir, 'single.mp4'))
+
+        resultado = {}
+
+        def paralelo():
+            resultado.update(recodificar_paralelo(
+                input_path, os.path.join(work_dir, 'parallel.mp4'), workers=args.workers
+            ))
+
+        t_parallel = medir('paralelo', paralelo)
+        print(f"\n  tramos: {resultado['chunks']}, workers: {resultado['workers']}")
+        print(f"  speedup: {t_single / t_parallel:.2f}x")
+        if duracion > 0:
+            print(f"  velocidad: {duracion / t_single:.2f}x tiempo real (un proceso) / "
+                  f"{duracion / t_parallel:.2f}x tiempo real (paralelo)")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
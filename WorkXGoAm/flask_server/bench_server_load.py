@@ -0,0 +1,193 @@
+"""
+Benchmark de carga: throughput y latencia (p50/p99) de /ui/state y /api/health con visores MJPEG
+abiertos, comparando waitress con el servidor de desarrollo de Werkzeug.
+
+Cada servidor corre en un proceso aparte con una app que usa los mismos blueprints/estado que
+WorkXFlaskServer y un feed MJPEG sintético (WorkXFlaskServer no se puede importar fuera de Windows).
+
+Uso:
+    python bench_server_load.py
+    python bench_server_load.py --viewers 8 --clients 16 --duration 10
+    python bench_server_load.py --servers waitress
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+import threading
+import subprocess
+import http.client
+
+from flask import Flask, Response, jsonify
+
+from connection import bind_server_socket, connection_bp
+from ui_state import get_state
+from wsgi_server import SERVER_DEV, SERVER_WAITRESS, ServerConfig, serve
+
+
+MJPEG_FPS = 15
+MJPEG_FRAME_BYTES = 60 * 1024  # tamaño típico de un frame JPEG 720p
+
+
+def crear_app() -> Flask:
+    app = Flask(__name__)
+    app.register_blueprint(connection_bp)
+
+    @app.route('/ui/state', methods=['GET'])
+    def ui_state_get():
+        return jsonify({"status": "ok", "data": get_state()})
+
+    @app.route('/stream/feed/bench')
+    def stream_feed():
+        frame = os.urandom(MJPEG_FRAME_BYTES)
+
+        def generator():
+            while True:
+                yield b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + frame + b'\r\n'
+                time.sleep(1.0 / MJPEG_FPS)
+
+        return Response(generator(), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+    return app
+
+
+def puerto_libre() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def esperar_servidor(port: int, timeout: float = 15.0):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/api/health')
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"El servidor no respondió en el puerto {port}")
+
+
+def visor_mjpeg(port: int, stop: threading.Event, bytes_leidos: list):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    try:
+        conn.request('GET', '/stream/feed/bench')
+        response = conn.getresponse()
+        while not stop.is_set():
+            chunk = response.read1(65536)
+            if not chunk:
+                break
+            bytes_leidos.append(len(chunk))
+    except (OSError, http.client.HTTPException):
+        pass  # el servidor se cerró al terminar la medición
+    finally:
+        conn.close()
+
+
+def cliente(port: int, path: str, stop: threading.Event, latencias: list, errores: list):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    while not stop.is_set():
+        inicio = time.perf_counter()
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errores.append(response.status)
+                continue
+            latencias.append(time.perf_counter() - inicio)
+        except (OSError, http.client.HTTPException) as e:
+            errores.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    conn.close()
+
+
+def percentil(valores: list, p: float) -> float:
+    if not valores:
+        return float('nan')
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def medir_servidor(server: str, args) -> list:
+    port = puerto_libre()
+    proceso = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve', server, '--port', str(port),
+         '--threads', str(args.threads)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        esperar_servidor(port)
+        stop_visores = threading.Event()
+        bytes_mjpeg = []
+        visores = [threading.Thread(target=visor_mjpeg, args=(port, stop_visores, bytes_mjpeg), daemon=True)
+                   for _ in range(args.viewers)]
+        for v in visores:
+            v.start()
+        time.sleep(1.0)  # que los feeds estén abiertos antes de medir
+
+        filas = []
+        for path in ('/ui/state', '/api/health'):
+            stop = threading.Event()
+            latencias, errores = [], []
+            clientes = [threading.Thread(target=cliente, args=(port, path, stop, latencias, errores), daemon=True)
+                        for _ in range(args.clients)]
+            inicio = time.perf_counter()
+            for c in clientes:
+                c.start()
+            time.sleep(args.duration)
+            stop.set()
+            for c in clientes:
+                c.join(timeout=15)
+            transcurrido = time.perf_counter() - inicio
+            filas.append((server, path, len(latencias) / transcurrido,
+                          percentil(latencias, 0.50) * 1000, percentil(latencias, 0.99) * 1000, len(errores)))
+
+        stop_visores.set()
+        for v in visores:
+            v.join(timeout=2)
+        mb_mjpeg = sum(bytes_mjpeg) / (1024 * 1024)
+        print(f"  {server}: {args.viewers} visores MJPEG recibieron {mb_mjpeg:.1f} MB")
+        return filas
+    finally:
+        proceso.kill()
+        proceso.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga de waitress vs servidor de desarrollo")
+    parser.add_argument('--servers', nargs='+', default=[SERVER_WAITRESS, SERVER_DEV],
+                        choices=[SERVER_WAITRESS, SERVER_DEV])
+    parser.add_argument('--viewers', type=int, default=4, help="Visores MJPEG abiertos durante la medición")
+    parser.add_argument('--clients', type=int, default=16, help="Clientes concurrentes por endpoint")
+    parser.add_argument('--duration', type=float, default=5.0, help="Segundos de medición por endpoint")
+    parser.add_argument('--threads', type=int, default=ServerConfig.threads, help="Hilos de waitress")
+    # Modo interno: levantar el servidor en este proceso
+    parser.add_argument('--serve', choices=[SERVER_WAITRESS, SERVER_DEV], help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        sock = bind_server_socket(default_port=args.port)
+        serve(crear_app(), sock, ServerConfig(server=args.serve, threads=args.threads))
+        return 0
+
+    print(f"Visores MJPEG: {args.viewers}, clientes: {args.clients}, duración: {args.duration}s\n")
+    filas = []
+    for server in args.servers:
+        filas.extend(medir_servidor(server, args))
+
+    print(f"\n{'servidor':<10} {'endpoint':<12} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errores':>8}")
+    for server, path, rps, p50, p99, errores in filas:
+        print(f"{server:<10} {path:<12} {rps:9.1f} {p50:8.2f} {p99:8.2f} {errores:8d}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Benchmark de arranque: tiempo hasta server-port.json, hasta /api/health y hasta /api/ready,
+medido desde fuera del proceso (como lo ve Tauri).
+
+Uso:
+    python bench_startup.py                                   # WorkXFlaskServer.py con este intérprete
+    python bench_startup.py --exe dist/WorkXFlaskServer.exe   # build de PyInstaller
+    python bench_startup.py --runs 10
+    python bench_startup.py -- --server dev                   # argumentos para el servidor tras --
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import http.client
+
+
+def esperar_archivo_puerto(path: str, limite: float) -> int:
+    while time.perf_counter() < limite:
+        try:
+            with open(path, 'r') as f:
+                return int(json.load(f)['port'])
+        except (OSError, ValueError, KeyError):
+            time.sleep(0.002)
+    raise TimeoutError("server-port.json no apareció")
+
+
+def esperar_endpoint(port: int, path: str, limite: float):
+    while time.perf_counter() < limite:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', path)
+            status = conn.getresponse().status
+            conn.close()
+            if status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.002)
+    raise TimeoutError(f"{path} no respondió 200")
+
+
+def medir_arranque(cmd: list, timeout: float) -> tuple:
+    # LOCALAPPDATA propio: el archivo de puerto no se confunde con el de otra instancia
+    app_data = tempfile.mkdtemp(prefix='workx_bench_startup_')
+    port_file = os.path.join(app_data, 'WorkXGoAm', 'server-port.json')
+    env = dict(os.environ, LOCALAPPDATA=app_data)
+    inicio = time.perf_counter()
+    limite = inicio + timeout
+    proceso = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        port = esperar_archivo_puerto(port_file, limite)
+        t_port = time.perf_counter() - inicio
+        esperar_endpoint(port, '/api/health', limite)
+        t_health = time.perf_counter() - inicio
+        esperar_endpoint(port, '/api/ready', limite)
+        t_ready = time.perf_counter() - inicio
+        return t_port, t_health, t_ready
+    finally:
+        proceso.kill()
+        proceso.wait()
+        shutil.rmtree(app_data, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque de WorkXFlaskServer")
+    parser.add_argument('--exe', help="Ejecutable a medir (por defecto WorkXFlaskServer.py con este intérprete)")
+    parser.add_argument('--runs', type=int, default=5, help="Arranques a medir")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Segundos máximos por arranque")
+    parser.add_argument('server_args', nargs=argparse.REMAINDER, help="Argumentos extra para el servidor")
+    args = parser.parse_args()
+
+    if args.exe:
+        cmd = [os.path.abspath(args.exe)]
+    else:
+        cmd = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'WorkXFlaskServer.py')]
+    cmd += [a for a in args.server_args if a != '--']
+    print(f"Comando: {' '.join(cmd)}\n")
+
+    filas = []
+    for i in range(args.runs):
+        fila = medir_arranque(cmd, args.timeout)
+        filas.append(fila)
+        print(f"  arranque {i + 1}: puerto {fila[0] * 1000:7.1f} ms | health {fila[1] * 1000:7.1f} ms | "
+              f"ready {fila[2] * 1000:7.1f} ms")
+
+    print(f"\n{'medida':<22} {'mediana ms':>11} {'mín ms':>9} {'máx ms':>9}")
+    for idx, nombre in enumerate(('server-port.json', '/api/health', '/api/ready')):
+        valores = sorted(f[idx] * 1000 for f in filas)
+        print(f"{nombre:<22} {valores[len(valores) // 2]:11.1f} {valores[0]:9.1f} {valores[-1]:9.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Benchmark del índice de transcripciones: latencia de search y latest con N transcripciones sintéticas.
+
+Uso:
+    python bench_transcript_index.py                 # 100k transcripciones en una base temporal
+    python bench_transcript_index.py --count 20000
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+from transcript_index import TranscriptIndex
+
+
+PALABRAS = (
+    "reunión proyecto cliente entrega presupuesto servidor video corte audio transcripción "
+    "equipo revisión sprint diseño error despliegue base datos usuario pantalla carpeta archivo "
+    "meeting deadline release budget feedback review camera stream latency network backup"
+).split()
+
+
+def poblar(index: TranscriptIndex, directory: str, count: int):
+    """Inserta filas sintéticas directamente (sin archivos en disco) en lotes de una transacción."""
+    conn = index._connect()
+    rnd = random.Random(42)
+    inicio = time.perf_counter()
+    base_ts = time.time() - count * 30
+    lote = []
+    for i in range(count):
+        silence = rnd.random() < 0.1
+        texto = "[silence]" if silence else " ".join(rnd.choice(PALABRAS) for _ in range(rnd.randint(20, 120)))
+        path = os.path.normcase(os.path.join(directory, f"rec_{i:06d}.txt"))
+        lote.append((path, directory, f"rec_{i:06d}", None, base_ts + i * 30, time.time(), len(texto), i,
+                     5.0, int(silence), texto, None))
+        if len(lote) == 5000:
+            conn.executemany(INSERT, lote)
+            conn.commit()
+            lote.clear()
+    if lote:
+        conn.executemany(INSERT, lote)
+        conn.commit()
+    print(f"Insertadas {count} transcripciones en {time.perf_counter() - inicio:.1f}s")
+
+
+INSERT = """
+    INSERT INTO transcripts (path, directory, name, audio_path, recorded_at, indexed_at, size, mtime_ns,
+                             duration, silence, text, models)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def medir(nombre: str, func, repeticiones: int = 50):
+    func()  # calentar caché de páginas
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = func()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    print(f"  {nombre:<38} p50 {tiempos[len(tiempos) // 2]:7.2f} ms   p95 {tiempos[int(len(tiempos) * 0.95)]:7.2f} ms"
+          f"   ({len(resultado)} filas)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del índice FTS5 de transcripciones")
+    parser.add_argument('--count', type=int, default=100_000, help="Transcripciones sintéticas")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='workx_bench_index_')
+    try:
+        index = TranscriptIndex(db_path=os.path.join(work_dir, 'transcripts.sqlite3'))
+        directory = os.path.normcase(os.path.abspath(work_dir))
+        poblar(index, directory, args.count)
+        print(f"Tamaño de la base: {os.path.getsize(os.path.join(work_dir, 'transcripts.sqlite3')) / 1e6:.1f} MB\n")
+
+        medir("search 'presupuesto' (común)", lambda: index.search('presupuesto', limit=20)['results'])
+        medir("search 'reunión cliente' (2 términos)", lambda: index.search('reunión cliente', limit=20)['results'])
+        medir("search 'despl' (prefijo)", lambda: index.search('despl', directory=directory, limit=20)['results'])
+        medir("search 'inexistente'", lambda: index.search('inexistente', limit=20)['results'])
+        medir("latest 50", lambda: index.latest(directory, limit=50))
+        medir("latest 50 sin silencios", lambda: index.latest(directory, limit=50, include_silence=False))
+        pagina = index.latest(directory, limit=50, offset=args.count // 2)
+        medir("latest 50 con cursor a mitad", lambda: index.latest(directory, limit=50, before=pagina[0]['recorded_at']))
+        medir("latest 50 con offset a mitad", lambda: index.latest(directory, limit=50, offset=args.count // 2),
+              repeticiones=10)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Benchmark del estado UI compartido: coste de leer el archivo mapeado (seqlock) frente a
+serializar/parsear JSON y a GET /ui/state, y comprobación de lecturas sin estados a medias
+con un escritor en otro proceso.
+
+Uso:
+    python bench_ui_state_shm.py
+    python bench_ui_state_shm.py --url http://127.0.0.1:8080   # añade GET /ui/state del servidor
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+import urllib.request
+
+from ui_state_shm import UiStateShmWriter, UiStateShmReader
+
+
+def medir(nombre: str, func, repeticiones: int):
+    func()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        func()
+    por_llamada = (time.perf_counter() - inicio) / repeticiones
+    print(f"  {nombre:<40} {por_llamada * 1e9:12.0f} ns")
+
+
+def estado(i: int) -> dict:
+    # Invariante para detectar lecturas mezcladas: todos los campos derivan de i
+    return {
+        'face_hover': i % 2 == 0,
+        'popup_hover': i % 2 == 0,
+        'face_rect': (i % 100000, i % 100000, i % 100000 + 75, i % 100000 + 75),
+        'auto_hide_rdp': i % 2 == 0,
+        'version': i,
+    }
+
+
+def escritor(path: str, segundos: float, contador):
+    writer = UiStateShmWriter()
+    writer.open(path)
+    limite = time.perf_counter() + segundos
+    i = 0
+    while time.perf_counter() < limite:
+        i += 1
+        writer.write(estado(i))
+    contador.value = i
+    writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del estado UI en memoria compartida")
+    parser.add_argument('--url', help="URL base del servidor para comparar con GET /ui/state")
+    parser.add_argument('--reads', type=int, default=200_000, help="Lecturas por medida")
+    parser.add_argument('--seconds', type=float, default=2.0, help="Duración de la prueba con escritor concurrente")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='workx_bench_shm_')
+    try:
+        path = os.path.join(work_dir, 'ui-state.bin')
+        writer = UiStateShmWriter()
+        writer.open(path)
+        writer.write(estado(1))
+        reader = UiStateShmReader(path)
+        texto = json.dumps(estado(1))
+
+        print("Lectura del estado (una llamada):")
+        medir("shm seq() (¿cambió algo?)", reader.seq, args.reads)
+        medir("shm read() (estado completo)", reader.read, args.reads)
+        medir("json.loads del mismo estado", lambda: json.loads(texto), args.reads)
+        medir("escritura shm (writer.write)", lambda: writer.write(estado(2)), args.reads)
+        if args.url:
+            url = args.url.rstrip('/') + '/ui/state'
+            medir("GET /ui/state (HTTP + JSON)", lambda: json.load(urllib.request.urlopen(url)), 500)
+
+        # Escritor en otro proceso escribiendo sin pausa; el lector valida cada lectura
+        writer.close()
+        contador = multiprocessing.Value('q', 0)
+        proceso = multiprocessing.Process(target=escritor, args=(path, args.seconds, contador))
+        proceso.start()
+        time.sleep(0.2)
+        lecturas = inconsistentes = 0
+        reader.retries = 0
+        while proceso.is_alive():
+            s = reader.read()
+            lecturas += 1
+            if s['version'] and s != dict(estado(s['version']), seq=s['seq'], pid=s['pid'], updated_at=s['updated_at']):
+                inconsistentes += 1
+        proceso.join()
+        print(f"\nCon escritor concurrente ({contador.value} escrituras en {args.seconds:.1f}s): "
+              f"{lecturas} lecturas, {reader.retries} reintentos, {inconsistentes} inconsistentes")
+        reader.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
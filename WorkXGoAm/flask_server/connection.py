@@ -2,32 +2,54 @@ from flask import Blueprint, jsonify
 import json
 import os
 import socket
+import time
 
 connection_bp = Blueprint('connection', __name__, url_prefix='/api')
 
-def find_free_port(default_port=8080):
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.bind(('localhost', default_port))
-        s.close()
-        return default_port
-    except OSError:
+def bind_server_socket(default_port=8080, host='127.0.0.1', backlog=1024):
+    """
+    Abre el socket de escucha una sola vez (puerto preferido y, si está ocupado, uno libre)
+    y lo devuelve ya escuchando, para pasárselo al servidor WSGI sin volver a hacer bind.
+
+    Returns:
+        Socket en estado listen
+    """
+    for port in (default_port, 0):
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.bind(('localhost', 0))  # Auto-asignación de puerto
-        port = s.getsockname()[1]
-        s.close()
-        return port
+        try:
+            if hasattr(socket, 'SO_EXCLUSIVEADDRUSE'):
+                # Windows: impide que otro proceso se enganche al mismo puerto con SO_REUSEADDR
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+            else:
+                # POSIX: permite reutilizar el puerto en TIME_WAIT tras reiniciar (no permite dos listeners)
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            s.bind((host, port))
+            s.listen(backlog)
+            return s
+        except OSError:
+            s.close()
+            if port == 0:
+                raise
 
-def save_port_info(port):
+def save_port_info(port, extra=None):
+    """
+    Escribe server-port.json con el puerto, el pid, la hora de inicio y los campos de 'extra'
+    (p. ej. la ruta del estado UI compartido).
+    Se escribe en un temporal y se renombra: nunca se lee un archivo a medias.
+    Llamar solo cuando el socket ya está escuchando.
+    """
     local_app_data = os.environ.get('LOCALAPPDATA')
     if not local_app_data:
         print("LOCALAPPDATA no encontrado")
         return
     app_data_dir = os.path.join(local_app_data, "WorkXGoAm")
     os.makedirs(app_data_dir, exist_ok=True)
-    port_info = {"port": port}
-    with open(os.path.join(app_data_dir, "server-port.json"), 'w') as f:
+    port_info = {"port": port, "pid": os.getpid(), "started_at": time.time(), **(extra or {})}
+    path = os.path.join(app_data_dir, "server-port.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
         json.dump(port_info, f)
+    os.replace(tmp_path, path)
     print(f"Port info saved in {app_data_dir}/server-port.json")
 
 @connection_bp.route('/health', methods=['GET'])
@@ -0,0 +1,260 @@
+"""
+Event Bus - Publicación/suscripción entre componentes (Tk, hotkeys, streams, trabajos, UI)
+con colas acotadas por suscriptor, coalescencia de tópicos frecuentes y latencia de entrega medible
+"""
+
+import time
+import threading
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+
+@dataclass(frozen=True)
+class Topic:
+    """
+    Tipo de evento. Los tópicos con coalesce=True son de alta frecuencia y cada evento es un estado
+    completo (estado UI, estadísticas, trabajos): si el suscriptor aún no consumió el evento anterior
+    con la misma (tópico, key), se reemplaza por el nuevo en lugar de encolar otro. Los tópicos de
+    transición (hover entra/sale) no coalescen: reemplazar un flanco perdería el anterior.
+    """
+    name: str
+    coalesce: bool = False
+    description: str = ''
+
+
+@dataclass
+class Event:
+    topic: str
+    data: Any
+    key: Optional[str]
+    seq: int
+    timestamp: float                                       # hora (epoch) de publicación
+    published_at: float = field(default_factory=time.perf_counter)  # reloj para medir latencia
+
+    def to_dict(self) -> dict:
+        return {'topic': self.topic, 'key': self.key, 'seq': self.seq, 'timestamp': self.timestamp, 'data': self.data}
+
+
+# ==========================
+# Tópicos conocidos
+# ==========================
+UI_STATE = Topic('ui.state', coalesce=True, description="Estado UI completo (ui_state.get_state())")
+UI_FACE_HOVER = Topic('ui.face_hover', description="{'hover': bool, 'auto_hide_rdp': bool} el mouse entra/sale del sol")
+UI_POPUP_HOVER = Topic('ui.popup_hover', description="{'hover': bool} el mouse entra/sale del popup")
+HOTKEY_TRIGGERED = Topic('hotkey.triggered', description="{'name': str} combinación global detectada")
+WINDOW_EVENT = Topic('window.event', description="{'event': str, ...} avisos de WindowManagerCore")
+STREAM_STATE = Topic('stream.state', description="{'state': 'started'|'stopped'|'ended', 'mode': str} por stream_id")
+STREAM_STATS = Topic('stream.stats', coalesce=True, description="{'frames', 'fps', 'bytes'} por stream_id")
+JOB_UPDATE = Topic('job.update', coalesce=True, description="Estado de un trabajo (job_service) por id")
+
+TOPICS: Dict[str, Topic] = {
+    t.name: t for t in (
+        UI_STATE, UI_FACE_HOVER, UI_POPUP_HOVER, HOTKEY_TRIGGERED, WINDOW_EVENT,
+        STREAM_STATE, STREAM_STATS, JOB_UPDATE,
+    )
+}
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class Subscription:
+    """
+    Cola de un suscriptor. publish solo toma el lock un instante para encolar:
+    - Si la cola está llena se descarta el evento más antiguo (cuenta en 'dropped').
+    - Los tópicos coalescentes reemplazan el evento pendiente de la misma (tópico, key).
+    Con handler, un hilo propio consume la cola; sin handler se consume con get() (p. ej. SSE).
+    """
+
+    LATENCY_SAMPLES = 1024
+
+    def __init__(self, bus: 'EventBus', patterns: Tuple[str, ...], handler: Optional[Callable[[Event], None]],
+                 maxsize: int, name: str):
+        self._bus = bus
+        self.patterns = patterns
+        self.name = name
+        self._handler = handler
+        self._maxsize = maxsize
+        # Cada entrada es [evento]; la lista permite reemplazar el evento sin mover su posición
+        self._queue: deque = deque()
+        self._pending: Dict[Tuple[str, Optional[str]], list] = {}
+        self._cond = threading.Condition(threading.Lock())
+        self._closed = False
+        self._latencies: deque = deque(maxlen=self.LATENCY_SAMPLES)
+        self._counts = {'delivered': 0, 'dropped': 0, 'coalesced': 0, 'errors': 0}
+        self._thread: Optional[threading.Thread] = None
+        if handler is not None:
+            self._thread = threading.Thread(target=self._worker, name=f'event-bus:{name}', daemon=True)
+            self._thread.start()
+
+    def matches(self, topic_name: str) -> bool:
+        for pattern in self.patterns:
+            if pattern == '*' or pattern == topic_name or (pattern.endswith('.') and topic_name.startswith(pattern)):
+                return True
+        return False
+
+    def _offer(self, event: Event, coalesce: bool):
+        with self._cond:
+            if self._closed:
+                return
+            if coalesce:
+                entry = self._pending.get((event.topic, event.key))
+                if entry is not None:
+                    entry[0] = event
+                    self._counts['coalesced'] += 1
+                    return
+            if len(self._queue) >= self._maxsize:
+                self._forget_locked(self._queue.popleft())
+                self._counts['dropped'] += 1
+            entry = [event]
+            self._queue.append(entry)
+            if coalesce:
+                self._pending[(event.topic, event.key)] = entry
+            self._cond.notify()
+
+    def _forget_locked(self, entry: list):
+        event = entry[0]
+        if self._pending.get((event.topic, event.key)) is entry:
+            del self._pending[(event.topic, event.key)]
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Siguiente evento, o None si se agota el timeout o la suscripción se cerró."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._queue or self._closed, timeout=timeout):
+                return None
+            if not self._queue:
+                return None
+            entry = self._queue.popleft()
+            self._forget_locked(entry)
+            event = entry[0]
+            self._latencies.append((time.perf_counter() - event.published_at) * 1000)
+            self._counts['delivered'] += 1
+            return event
+
+    def _worker(self):
+        while True:
+            event = self.get()
+            if event is None:
+                return
+            try:
+                self._handler(event)
+            except Exception as e:
+                self._counts['errors'] += 1
+                print(f"[EventBus] Error en suscriptor '{self.name}' ({event.topic}): {e}")
+                traceback.print_exc()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self):
+        """Deja de recibir eventos; el hilo del handler termina al vaciar su espera."""
+        self._bus.unsubscribe(self)
+        with self._cond:
+            self._closed = True
+            self._queue.clear()
+            self._pending.clear()
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            latencies = sorted(self._latencies)
+            stats = dict(self._counts, name=self.name, patterns=list(self.patterns),
+                         queued=len(self._queue), maxsize=self._maxsize)
+        if latencies:
+            stats['latency_ms'] = {
+                'p50': round(_percentile(latencies, 0.5), 3),
+                'p99': round(_percentile(latencies, 0.99), 3),
+                'max': round(latencies[-1], 3),
+                'samples': len(latencies),
+            }
+        else:
+            stats['latency_ms'] = None
+        return stats
+
+
+class EventBus:
+    """
+    Bus de eventos en proceso. publish nunca espera a los consumidores: recorre una tupla
+    inmutable de suscripciones (sin lock) y cada una encola en O(1). Los handlers corren en el
+    hilo de su suscripción, así un consumidor lento no frena al productor (bucle Tk, listener
+    de pynput) ni a los demás suscriptores.
+    """
+
+    DEFAULT_MAXSIZE = 256
+
+    def __init__(self):
+        self._subscriptions: Tuple[Subscription, ...] = ()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._published: Dict[str, int] = {}
+
+    def publish(self, topic: Union[Topic, str], data: Any = None, key: Optional[str] = None) -> Event:
+        """
+        Publica un evento.
+
+        Args:
+            topic: Topic (o su nombre, que debe estar en TOPICS)
+            data: Carga del evento (debe ser serializable a JSON si llega a la UI)
+            key: Clave de coalescencia dentro del tópico (p. ej. id del stream o del trabajo)
+
+        Returns:
+            El evento publicado
+        """
+        if isinstance(topic, str):
+            if topic not in TOPICS:
+                raise ValueError(f"Tópico desconocido: {topic}")
+            topic = TOPICS[topic]
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self._published[topic.name] = self._published.get(topic.name, 0) + 1
+        event = Event(topic.name, data, key, seq, time.time())
+        for subscription in self._subscriptions:
+            if subscription.matches(topic.name):
+                subscription._offer(event, topic.coalesce)
+        return event
+
+    def subscribe(self, patterns: Union[str, Iterable[str]], handler: Optional[Callable[[Event], None]] = None,
+                  maxsize: int = DEFAULT_MAXSIZE, name: Optional[str] = None) -> Subscription:
+        """
+        Crea una suscripción.
+
+        Args:
+            patterns: Nombre exacto ('ui.state'), prefijo terminado en punto ('stream.') o '*'
+            handler: Función llamada con cada Event en un hilo propio; sin handler, consumir con get()
+            maxsize: Eventos pendientes máximos antes de descartar los más antiguos
+            name: Nombre para estadísticas y logs
+        """
+        if isinstance(patterns, str):
+            patterns = (patterns,)
+        patterns = tuple(p.strip() for p in patterns if p and p.strip())
+        if not patterns:
+            raise ValueError("Se requiere al menos un tópico o prefijo")
+        name = name or getattr(handler, '__name__', None) or 'subscriber'
+        subscription = Subscription(self, patterns, handler, max(1, maxsize), name)
+        with self._lock:
+            self._subscriptions = self._subscriptions + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+
+    def stats(self) -> dict:
+        with self._lock:
+            published = dict(self._published)
+            seq = self._seq
+        return {
+            'seq': seq,
+            'published': published,
+            'topics': {t.name: {'coalesce': t.coalesce, 'description': t.description} for t in TOPICS.values()},
+            'subscriptions': [s.stats() for s in self._subscriptions],
+        }
+
+
+# Instancia global del servicio
+event_bus = EventBus()
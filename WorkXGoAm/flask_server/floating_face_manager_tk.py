@@ -1,6 +1,7 @@
 import signal
 import os
 import time
+import threading
 from typing import Optional
 
 from floating_face_tk import FloatingFaceTk
@@ -51,7 +52,9 @@ class FloatingFaceManagerTk:
         os._exit(0)
 
     def start(self):
-        self._original_sigint_handler = signal.signal(signal.SIGINT, self._signal_handler)
+        # signal.signal solo se puede llamar desde el hilo principal; el servidor inicia la carita en segundo plano
+        if threading.current_thread() is threading.main_thread():
+            self._original_sigint_handler = signal.signal(signal.SIGINT, self._signal_handler)
         self.face = FloatingFaceTk(size=75, happy_face_url=self.happy_face_url, surprised_face_url=self.surprised_face_url)
         self.face.start()
         time.sleep(0.4)
@@ -0,0 +1,133 @@
+"""
+Job Service - Ejecuta tareas largas (proxies, índices, lotes) en segundo plano con estado consultable
+"""
+
+import time
+import uuid
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from event_bus import event_bus, JOB_UPDATE
+
+
+class JobService:
+    """
+    Cola de trabajos en segundo plano sobre un ThreadPoolExecutor.
+    - Cada trabajo tiene un id, tipo, estado ('queued', 'running', 'done', 'error') y progreso 0..1.
+    - Si se envía un trabajo con la misma clave que otro aún activo, se devuelve el existente
+      (abrir dos veces el mismo video no genera dos proxies).
+    - La función del trabajo recibe un callback progress(fraccion) para informar avance.
+    - Cada cambio de estado o progreso se publica en el bus como 'job.update' (coalescente por id).
+    """
+
+    MAX_FINISHED = 200  # trabajos terminados que se conservan para consulta
+
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='workx-job')
+        self._jobs: dict[str, dict] = {}
+        self._active_by_key: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, func: Callable, *args, key: Optional[str] = None, **kwargs) -> dict:
+        """
+        Encola un trabajo.
+
+        Args:
+            kind: Tipo de trabajo ('proxy', 'scenes', ...)
+            func: Función a ejecutar; se llama como func(*args, progress=callback, **kwargs)
+            key: Clave de deduplicación opcional
+
+        Returns:
+            Copia del estado del trabajo
+        """
+        with self._lock:
+            if key is not None and key in self._active_by_key:
+                return dict(self._jobs[self._active_by_key[key]])
+
+            job_id = uuid.uuid4().hex
+            job = {
+                'id': job_id,
+                'kind': kind,
+                'key': key,
+                'status': 'queued',
+                'progress': 0.0,
+                'result': None,
+                'error': None,
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+            }
+            self._jobs[job_id] = job
+            if key is not None:
+                self._active_by_key[key] = job_id
+            self._prune_locked()
+            snapshot = dict(job)
+
+        event_bus.publish(JOB_UPDATE, snapshot, key=job_id)
+        self._executor.submit(self._run, job_id, func, args, kwargs)
+        return snapshot
+
+    def _publish(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            snapshot = dict(job) if job else None
+        if snapshot:
+            event_bus.publish(JOB_UPDATE, snapshot, key=job_id)
+
+    def _run(self, job_id: str, func: Callable, args: tuple, kwargs: dict):
+        def progress(fraction: float):
+            with self._lock:
+                self._jobs[job_id]['progress'] = max(0.0, min(1.0, float(fraction)))
+            self._publish(job_id)
+
+        with self._lock:
+            job = self._jobs[job_id]
+            job['status'] = 'running'
+            job['started_at'] = time.time()
+        self._publish(job_id)
+
+        try:
+            result = func(*args, progress=progress, **kwargs)
+            with self._lock:
+                job['result'] = result
+                job['progress'] = 1.0
+                job['status'] = 'done'
+        except Exception as e:
+            print(f"[JobService] Error en trabajo {job['kind']} ({job_id}): {e}")
+            traceback.print_exc()
+            with self._lock:
+                job['error'] = str(e)
+                job['status'] = 'error'
+        finally:
+            with self._lock:
+                job['finished_at'] = time.time()
+                if job['key'] is not None and self._active_by_key.get(job['key']) == job_id:
+                    del self._active_by_key[job['key']]
+            self._publish(job_id)
+
+    def _prune_locked(self):
+        finished = [j for j in self._jobs.values() if j['status'] in ('done', 'error')]
+        if len(finished) <= self.MAX_FINISHED:
+            return
+        finished.sort(key=lambda j: j['finished_at'] or 0)
+        for job in finished[:len(finished) - self.MAX_FINISHED]:
+            del self._jobs[job['id']]
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """Retorna una copia del estado del trabajo o None si no existe."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list_jobs(self, kind: Optional[str] = None) -> list:
+        """Lista los trabajos conocidos (opcionalmente filtrados por tipo), más recientes primero."""
+        with self._lock:
+            jobs = [dict(j) for j in self._jobs.values() if kind is None or j['kind'] == kind]
+        jobs.sort(key=lambda j: j['created_at'], reverse=True)
+        return jobs
+
+
+# Instancia global del servicio
+job_service = JobService()
@@ -0,0 +1,333 @@
+"""
+Media Metadata Cache - Caché persistente (SQLite) de metadatos de archivos multimedia
+
+Guarda el JSON de ffprobe, el índice de keyframes y campos derivados (duración, canales, etc.)
+indexados por (ruta, tamaño, mtime). Lo usan video_service, FileToText y el monitor de WAVs.
+"""
+
+import os
+import json
+import time
+import struct
+import sqlite3
+import hashlib
+import tempfile
+import threading
+import subprocess
+from typing import Callable, List, Optional
+
+
+def cache_base_path() -> str:
+    """
+    Ruta del directorio raíz de cachés, sin crearlo: %LOCALAPPDATA%/WorkXGoAm/cache
+    (igual que server-port.json) o el directorio temporal si LOCALAPPDATA no existe.
+    """
+    local_app_data = os.environ.get('LOCALAPPDATA')
+    if local_app_data:
+        return os.path.join(local_app_data, "WorkXGoAm", "cache")
+    return os.path.join(tempfile.gettempdir(), 'workx_cache')
+
+
+def get_cache_base_dir() -> str:
+    """Devuelve (y crea) el directorio raíz de cachés."""
+    base_dir = cache_base_path()
+    os.makedirs(base_dir, exist_ok=True)
+    return base_dir
+
+
+def get_cache_dir(nombre: str) -> str:
+    """Devuelve (y crea) el subdirectorio de caché para un tipo de dato."""
+    cache_dir = os.path.join(get_cache_base_dir(), nombre)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def file_fingerprint(path: str) -> str:
+    """
+    Huella del archivo basada en (ruta absoluta, tamaño, mtime).
+    Cambia si el archivo se modifica o se reemplaza, sin tener que leer su contenido.
+    """
+    abs_path = os.path.abspath(path)
+    st = os.stat(abs_path)
+    key = f"{os.path.normcase(abs_path)}|{st.st_size}|{st.st_mtime_ns}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _run_ffprobe(args: List[str]) -> str:
+    cmd = ['ffprobe', '-v', 'error', *args]
+    proceso = subprocess.run(
+        cmd,
+        check=True,
+        capture_output=True,
+        text=True,
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+    )
+    return proceso.stdout
+
+
+def probe_media(path: str) -> dict:
+    """Ejecuta ffprobe y devuelve format + streams en JSON."""
+    salida = _run_ffprobe(['-show_format', '-show_streams', '-of', 'json', path])
+    return json.loads(salida or '{}')
+
+
+def probe_keyframes(path: str) -> List[float]:
+    """
+    Lee los tiempos de los keyframes del primer stream de video.
+    Solo demultiplexa paquetes (sin decodificar), por lo que es rápido incluso en archivos largos.
+    """
+    salida = _run_ffprobe([
+        '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time,flags',
+        '-of', 'csv=p=0',
+        path
+    ])
+    keyframes = []
+    for linea in salida.splitlines():
+        partes = linea.strip().split(',')
+        if len(partes) < 2 or 'K' not in partes[1]:
+            continue
+        try:
+            keyframes.append(float(partes[0]))
+        except ValueError:
+            continue  # pts_time=N/A
+    keyframes.sort()
+    return keyframes
+
+
+# Formatos WAV: 1 = PCM entero, 3 = IEEE float, 0xFFFE = WAVE_FORMAT_EXTENSIBLE
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def read_wav_header(path: str) -> dict:
+    """
+    Lee la cabecera RIFF/WAVE sin decodificar el audio (soporta PCM entero, float y extensible).
+    Devuelve formato, canales, frecuencia, bits, offset y tamaño del chunk de datos.
+    """
+    with open(path, 'rb') as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+            raise ValueError(f"{path} no es un archivo WAV válido")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                data = f.read(chunk_size)
+                format_tag, channels, sample_rate, _, block_align, bits = struct.unpack('<HHIIHH', data[:16])
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and len(data) >= 26:
+                    # Los dos primeros bytes del SubFormat GUID son el formato real
+                    format_tag = struct.unpack('<H', data[24:26])[0]
+                fmt = {
+                    'format_tag': format_tag,
+                    'channels': channels,
+                    'sample_rate': sample_rate,
+                    'bits_per_sample': bits,
+                    'block_align': block_align,
+                }
+                if chunk_size % 2:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"{path}: chunk 'data' antes de 'fmt '")
+                data_offset = f.tell()
+                file_size = os.fstat(f.fileno()).st_size
+                # Grabaciones interrumpidas pueden declarar un tamaño mayor al real
+                data_size = min(chunk_size, file_size - data_offset)
+                frames = data_size // fmt['block_align'] if fmt['block_align'] else 0
+                return {
+                    **fmt,
+                    'data_offset': data_offset,
+                    'data_size': data_size,
+                    'frames': frames,
+                    'duration': frames / fmt['sample_rate'] if fmt['sample_rate'] else 0.0,
+                }
+            else:
+                f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+    raise ValueError(f"{path}: no se encontró el chunk de datos")
+
+
+class MediaMetadataCache:
+    """
+    Caché de metadatos en dos niveles:
+    - Memoria: dict por (tipo, ruta) validado con os.stat -> búsquedas en microsegundos.
+    - SQLite: persiste entre ejecuciones; una fila por (ruta, tipo) con tamaño y mtime.
+    Si el archivo cambia (tamaño o mtime distintos), la entrada se recalcula.
+    La base de datos se crea en el primer uso: importar el módulo no toca el disco.
+    """
+
+    DB_FILE = 'media_metadata.sqlite3'
+
+    def __init__(self, db_path: Optional[str] = None):
+        self._db_path = db_path
+        self._db_lock = threading.Lock()
+        self._db_ready = False
+        self._memory: dict = {}
+        self._memory_lock = threading.Lock()
+        self._local = threading.local()
+
+    def open(self):
+        """Crea la base de datos si hace falta y abre la conexión del hilo actual."""
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Una conexión por hilo: sqlite3 no permite compartirlas entre hilos por defecto
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if self._db_path is None:
+                self._db_path = os.path.join(get_cache_base_dir(), self.DB_FILE)
+            conn = sqlite3.connect(self._db_path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._init_db(conn)
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self, conn: sqlite3.Connection):
+        with self._db_lock:
+            if self._db_ready:
+                return
+            self._create_tables(conn)
+            self._db_ready = True
+
+    def _create_tables(self, conn: sqlite3.Connection):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS media_metadata (
+                path TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (path, kind)
+            )
+        """)
+        conn.commit()
+
+    def get(self, path: str, kind: str, loader: Callable[[str], object]):
+        """
+        Devuelve loader(path) cacheado para el tipo 'kind'.
+
+        Args:
+            path: Ruta al archivo
+            kind: Tipo de metadato ('probe', 'keyframes', 'audio_info', ...)
+            loader: Función que calcula el dato si no está en caché (debe devolver algo serializable a JSON)
+        """
+        abs_path = os.path.normcase(os.path.abspath(path))
+        st = os.stat(abs_path)
+        found, data = self._lookup(abs_path, kind, st)
+        if found:
+            return data
+
+        data = loader(abs_path)
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO media_metadata (path, kind, size, mtime_ns, data, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (abs_path, kind, st.st_size, st.st_mtime_ns, json.dumps(data), time.time())
+        )
+        conn.commit()
+
+        with self._memory_lock:
+            self._memory[(kind, abs_path)] = (st.st_size, st.st_mtime_ns, data)
+        return data
+
+    def peek(self, path: str, kind: str):
+        """
+        Devuelve el dato cacheado sin calcularlo (None si no existe o el archivo cambió).
+        Útil para metadatos caros que se calculan en un trabajo en segundo plano.
+        """
+        abs_path = os.path.normcase(os.path.abspath(path))
+        found, data = self._lookup(abs_path, kind, os.stat(abs_path))
+        return data if found else None
+
+    def _lookup(self, abs_path: str, kind: str, st: os.stat_result) -> tuple:
+        mem_key = (kind, abs_path)
+        with self._memory_lock:
+            entry = self._memory.get(mem_key)
+        if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return True, entry[2]
+
+        row = self._connect().execute(
+            "SELECT data FROM media_metadata WHERE path = ? AND kind = ? AND size = ? AND mtime_ns = ?",
+            (abs_path, kind, st.st_size, st.st_mtime_ns)
+        ).fetchone()
+        if row is None:
+            return False, None
+        data = json.loads(row[0])
+        with self._memory_lock:
+            self._memory[mem_key] = (st.st_size, st.st_mtime_ns, data)
+        return True, data
+
+    def probe(self, path: str) -> dict:
+        """JSON de ffprobe (format + streams)."""
+        return self.get(path, 'probe', probe_media)
+
+    def keyframes(self, path: str) -> List[float]:
+        """
+        Tiempos de los keyframes del primer stream de video, relativos al inicio del archivo.
+        Los pts de los paquetes empiezan en format.start_time (no 0 en MPEG-TS, grabaciones de OBS,
+        remuxes...), mientras que -ss de entrada cuenta desde el inicio: se resta para que todos
+        los planificadores trabajen en la misma base de tiempo que ffmpeg.
+        """
+        keyframes = self.get(path, 'keyframes', probe_keyframes)
+        start_time = float(self.probe(path).get('format', {}).get('start_time') or 0)
+        if not start_time:
+            return keyframes
+        return [round(k - start_time, 6) for k in keyframes]
+
+    def wav_header(self, path: str) -> dict:
+        """Cabecera WAV (formato, canales, offset del chunk de datos...)."""
+        return self.get(path, 'wav_header', read_wav_header)
+
+    def audio_info(self, path: str) -> dict:
+        """
+        Campos derivados del primer stream de audio: duración, canales, frecuencia y bytes por muestra.
+        Para WAV se lee la cabecera directamente; para el resto se deriva de ffprobe.
+        """
+        return self.get(path, 'audio_info', self._load_audio_info)
+
+    def _load_audio_info(self, path: str) -> dict:
+        if path.lower().endswith('.wav'):
+            try:
+                header = self.wav_header(path)
+                bits = header['bits_per_sample']
+                if header['format_tag'] == WAVE_FORMAT_IEEE_FLOAT:
+                    codec = f"pcm_f{bits}le"
+                else:
+                    codec = 'pcm_u8' if bits == 8 else f"pcm_s{bits}le"
+                return {
+                    'duration': header['duration'],
+                    'channels': header['channels'],
+                    'sample_rate': header['sample_rate'],
+                    'sample_width': bits // 8,
+                    'codec': codec,
+                }
+            except ValueError:
+                pass  # Cabecera no estándar: que la resuelva ffprobe
+
+        info = self.probe(path)
+        audio = next((s for s in info.get('streams', []) if s.get('codec_type') == 'audio'), None)
+        if audio is None:
+            raise ValueError(f"{path} no tiene stream de audio")
+        duration = audio.get('duration') or info.get('format', {}).get('duration') or 0
+        bits = audio.get('bits_per_raw_sample') or audio.get('bits_per_sample') or 16
+        return {
+            'duration': float(duration),
+            'channels': int(audio.get('channels') or 0),
+            'sample_rate': int(audio.get('sample_rate') or 0),
+            'sample_width': max(1, int(bits) // 8),
+            'codec': audio.get('codec_name'),
+        }
+
+    def clear_memory(self):
+        """Vacía el nivel en memoria (el nivel SQLite se mantiene)."""
+        with self._memory_lock:
+            self._memory.clear()
+
+
+# Instancia global de la caché
+media_cache = MediaMetadataCache()
@@ -0,0 +1,195 @@
+"""
+Media File Service - Sirve videos locales al frontend con Range, GET condicional y sendfile
+"""
+
+import os
+import mimetypes
+import threading
+from email.utils import formatdate
+from typing import List, Set
+
+from flask import Response, request
+
+from media_cache import cache_base_path
+
+# Orígenes del frontend (Tauri en Windows / macOS-Linux y el servidor de desarrollo) que pueden
+# leer las respuestas; un <video src> no necesita CORS, así que cualquier otra página queda fuera
+APP_ORIGINS = ['http://tauri.localhost', 'https://tauri.localhost', 'tauri://localhost', 'http://localhost:1420']
+
+# Solo se sirven archivos de audio/video, aunque estén dentro de un directorio permitido
+MEDIA_EXTENSIONS = {
+    '.mp4', '.m4v', '.mov', '.mkv', '.webm', '.avi', '.wmv', '.flv', '.mpg', '.mpeg', '.ts', '.m2ts', '.3gp',
+    '.mp3', '.wav', '.m4a', '.aac', '.flac', '.ogg', '.opus', '.wma',
+}
+
+
+class MediaFileService:
+    """
+    Sirve archivos multimedia locales (solo MEDIA_EXTENSIONS) restringidos a un conjunto de
+    directorios permitidos fijado al arrancar, más los archivos concretos que genera el servidor.
+    - Range: responde 206 con solo los bytes pedidos (el <video> pide bytes=N- al hacer seek).
+    - GET condicional: ETag/Last-Modified con 304 e If-Range.
+    - Si el servidor WSGI expone wsgi.file_wrapper (waitress, etc.), el cuerpo se envía con él
+      para que use sendfile/transmisión directa del archivo sin copiarlo por Python.
+    """
+
+    CHUNK_SIZE = 1 << 20
+    ENV_ROOTS = 'WORKX_MEDIA_ROOTS'  # rutas adicionales separadas por os.pathsep
+
+    def __init__(self):
+        self._roots: List[str] = []
+        self._files: Set[str] = set()  # salidas generadas por el servidor (cortes, uniones)
+        self._lock = threading.Lock()
+        home = os.path.expanduser('~')
+        for folder in ('Videos', 'Downloads', 'Desktop', 'Documents', 'Music'):
+            self.allow_root(os.path.join(home, folder))
+        self.allow_root(cache_base_path())  # sin crearlo: lo crean las cachés al usarse
+        for root in os.environ.get(self.ENV_ROOTS, '').split(os.pathsep):
+            if root.strip():
+                self.allow_root(root.strip())
+
+    @staticmethod
+    def _normalize(path: str) -> str:
+        return os.path.normcase(os.path.realpath(os.path.abspath(path)))
+
+    def allow_root(self, root: str):
+        """Agrega un directorio (y sus subdirectorios) a la lista de permitidos."""
+        if not root:
+            return
+        normalized = self._normalize(root)
+        with self._lock:
+            if normalized not in self._roots:
+                self._roots.append(normalized)
+
+    def allow_file(self, path: str):
+        """Permite un archivo concreto generado por el servidor (no su directorio)."""
+        if not path:
+            return
+        normalized = self._normalize(path)
+        with self._lock:
+            self._files.add(normalized)
+
+    def get_roots(self) -> List[str]:
+        with self._lock:
+            return list(self._roots)
+
+    @staticmethod
+    def _is_within(path: str, root: str) -> bool:
+        try:
+            return os.path.commonpath([path, root]) == root
+        except ValueError:
+            return False  # distinta unidad en Windows
+
+    def resolve(self, path: str) -> str:
+        """
+        Valida que el archivo sea de audio/video, exista y esté dentro de un directorio permitido
+        (o sea una salida generada por el servidor). Los symlinks se resuelven antes de comparar,
+        así no se puede salir de la raíz con ellos.
+
+        Raises:
+            PermissionError: Si no es un archivo multimedia o está fuera de los directorios permitidos
+            FileNotFoundError: Si el archivo no existe
+        """
+        if not path:
+            raise ValueError("path es requerido")
+        real = self._normalize(path)
+        mimetype = mimetypes.guess_type(real)[0] or ''
+        if os.path.splitext(real)[1].lower() not in MEDIA_EXTENSIONS and not mimetype.startswith(('video/', 'audio/')):
+            raise PermissionError(f"Acceso denegado: {path} no es un archivo de audio o video")
+        with self._lock:
+            allowed = real in self._files
+        if not allowed and not any(self._is_within(real, root) for root in self.get_roots()):
+            raise PermissionError(f"Acceso denegado: {path} está fuera de los directorios permitidos")
+        if not os.path.isfile(real):
+            raise FileNotFoundError(f"El archivo {path} no existe")
+        return real
+
+    def build_response(self, path: str) -> Response:
+        """
+        Construye la respuesta para el request actual (200, 206, 304 o 416).
+
+        Args:
+            path: Ruta ya validada con resolve()
+        """
+        st = os.stat(path)
+        size = st.st_size
+        etag = f"{size:x}-{st.st_mtime_ns:x}"
+        last_modified = formatdate(st.st_mtime, usegmt=True)
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+        headers = {
+            'Accept-Ranges': 'bytes',
+            'Last-Modified': last_modified,
+            'Cache-Control': 'no-cache',  # el archivo puede cambiar: siempre revalidar con ETag
+        }
+
+        # GET condicional
+        if request.if_none_match:
+            if request.if_none_match.contains(etag):
+                return self._not_modified(headers, etag)
+        elif request.if_modified_since and int(st.st_mtime) <= request.if_modified_since.timestamp():
+            return self._not_modified(headers, etag)
+
+        start, stop = 0, size
+        status = 200
+        range_header = request.range
+        # If-Range: solo se respeta el Range si el cliente tiene la misma versión del archivo
+        if_range = request.if_range
+        if range_header is not None and (if_range.etag or if_range.date):
+            if if_range.etag:
+                same_version = if_range.etag == etag
+            else:
+                same_version = int(st.st_mtime) <= if_range.date.timestamp()
+            if not same_version:
+                range_header = None
+        if range_header is not None and len(range_header.ranges) == 1:
+            bounds = range_header.range_for_length(size)
+            if bounds is None:
+                headers['Content-Range'] = f"bytes */{size}"
+                response = Response(status=416, headers=headers)
+                response.set_etag(etag)
+                return response
+            start, stop = bounds
+            status = 206
+            headers['Content-Range'] = f"bytes {start}-{stop - 1}/{size}"
+
+        headers['Content-Length'] = str(stop - start)
+        if request.method == 'HEAD':
+            body = []
+        else:
+            body = self._body(path, start, stop, size)
+
+        response = Response(body, status=status, headers=headers, mimetype=mimetype, direct_passthrough=True)
+        response.set_etag(etag)
+        return response
+
+    @staticmethod
+    def _not_modified(headers: dict, etag: str) -> Response:
+        response = Response(status=304, headers=headers)
+        response.set_etag(etag)
+        return response
+
+    def _body(self, path: str, start: int, stop: int, size: int):
+        f = open(path, 'rb')
+        f.seek(start)
+        file_wrapper = request.environ.get('wsgi.file_wrapper')
+        # file_wrapper envía hasta EOF; solo se usa cuando el rango llega al final del archivo
+        # (el caso normal del <video>: bytes=N-). Los rangos cerrados se leen por bloques.
+        if file_wrapper is not None and stop == size:
+            return file_wrapper(f, self.CHUNK_SIZE)
+        return self._iter_range(f, stop - start)
+
+    def _iter_range(self, f, remaining: int):
+        try:
+            while remaining > 0:
+                chunk = f.read(min(self.CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
+
+
+# Instancia global del servicio
+media_file_service = MediaFileService()
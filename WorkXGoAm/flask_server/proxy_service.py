@@ -0,0 +1,132 @@
+"""
+Proxy Service - Genera copias de baja resolución de videos grandes para previsualizar con fluidez
+"""
+
+import os
+import hashlib
+import subprocess
+import threading
+from functools import cached_property
+from typing import Callable, Optional
+
+from job_service import job_service
+from media_cache import file_fingerprint, get_cache_dir
+from video_service import obtener_info_media
+
+
+class ProxyService:
+    """
+    Genera un proxy H.264 de baja resolución con GOP corto por cada video abierto.
+    - El proxy conserva los timestamps del original (sin duplicar ni descartar frames),
+      así el frontend navega sobre el proxy y los cortes se hacen sobre el original con los mismos tiempos.
+    - Se genera como trabajo en segundo plano (job_service) y se cachea por huella de archivo.
+    """
+
+    VERSION = 1
+    GOP = 10  # keyframe cada 10 frames: el seek en el navegador decodifica como máximo 9 frames
+
+    @cached_property
+    def _cache_dir(self) -> str:
+        # Se crea en el primer uso: importar el servicio no toca el disco
+        return get_cache_dir('proxies')
+
+    def _key(self, input_path: str, height: int) -> str:
+        return hashlib.sha1(f"{file_fingerprint(input_path)}|{height}|{self.VERSION}".encode('utf-8')).hexdigest()
+
+    def get_proxy_path(self, key: str) -> Optional[str]:
+        """Retorna la ruta de un proxy ya generado."""
+        if not key or not all(c in '0123456789abcdef' for c in key):
+            return None
+        path = os.path.join(self._cache_dir, f"{key}.mp4")
+        return path if os.path.exists(path) else None
+
+    def request_proxy(self, input_path: str, height: int = 540) -> dict:
+        """
+        Devuelve el proxy si ya existe; si no, encola su generación.
+
+        Args:
+            input_path: Ruta al video original
+            height: Alto del proxy en píxeles (el ancho respeta el aspecto)
+
+        Returns:
+            {'state': 'ready', 'key': ...} o {'state': 'pending', 'key': ..., 'job': {...}}
+        """
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"El archivo {input_path} no existe")
+        if height < 64 or height > 2160:
+            raise ValueError("height debe estar entre 64 y 2160")
+
+        key = self._key(input_path, height)
+        if self.get_proxy_path(key):
+            return {'state': 'ready', 'key': key}
+
+        job = job_service.submit('proxy', self._generate, input_path, key, height, key=f"proxy:{key}")
+        return {'state': 'pending', 'key': key, 'job': job}
+
+    def _generate(self, input_path: str, key: str, height: int, progress: Callable[[float], None]) -> dict:
+        output_path = os.path.join(self._cache_dir, f"{key}.mp4")
+        if os.path.exists(output_path):
+            return {'key': key}
+
+        try:
+            info = obtener_info_media(input_path)
+            duration = float(info.get('format', {}).get('duration') or 0)
+        except Exception:
+            duration = 0.0  # sin ffprobe no hay progreso, pero el proxy se genera igual
+
+        tmp_path = f"{output_path}.{os.getpid()}.tmp.mp4"
+        cmd = [
+            'ffmpeg', '-y',
+            '-v', 'error',
+            '-i', input_path,
+            '-map', '0:v:0',
+            '-map', '0:a:0?',
+            '-vf', f"scale=-2:'min({height},ih)'",
+            '-fps_mode', 'passthrough',
+            '-c:v', 'libx264',
+            '-preset', 'veryfast',
+            '-tune', 'fastdecode',
+            '-crf', '28',
+            '-g', str(self.GOP),
+            '-bf', '0',
+            '-pix_fmt', 'yuv420p',
+            '-c:a', 'aac',
+            '-b:a', '96k',
+            '-ac', '2',
+            '-movflags', '+faststart',
+            '-progress', 'pipe:1',
+            '-nostats',
+            tmp_path
+        ]
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+        )
+        # stderr en un hilo aparte para que no se llene el pipe mientras leemos el progreso
+        stderr_lines = []
+        stderr_thread = threading.Thread(target=lambda: stderr_lines.extend(process.stderr), daemon=True)
+        stderr_thread.start()
+        try:
+            for line in process.stdout:
+                name, _, value = line.strip().partition('=')
+                if name == 'out_time_us' and duration > 0 and value.isdigit():
+                    progress(int(value) / 1e6 / duration)
+            if process.wait() != 0:
+                stderr_thread.join(timeout=5)
+                raise RuntimeError(f"ffmpeg falló generando el proxy: {''.join(stderr_lines).strip()}")
+            os.replace(tmp_path, output_path)
+        finally:
+            if process.poll() is None:
+                process.kill()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        print(f"[ProxyService] Proxy {height}p generado: {input_path}")
+        return {'key': key}
+
+
+# Instancia global del servicio
+proxy_service = ProxyService()
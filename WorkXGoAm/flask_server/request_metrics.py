@@ -0,0 +1,158 @@
+"""
+Request Metrics - Latencia por ruta, peticiones en curso, códigos de estado y tamaño de respuesta,
+expuestos en formato de texto de Prometheus
+"""
+
+import os
+import time
+import threading
+from bisect import bisect_left
+
+from flask import Flask, request
+
+
+# Límites superiores (segundos) de los buckets del histograma de latencia
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_START_KEY = 'workx.request_start'
+
+
+class _RouteStats:
+    """Contadores de una combinación (método, ruta). Se actualizan bajo el lock de RequestMetrics."""
+
+    __slots__ = ('buckets', 'count', 'total', 'statuses', 'bytes')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # el último es +Inf
+        self.count = 0
+        self.total = 0.0
+        self.statuses: dict[int, int] = {}
+        self.bytes = 0
+
+
+class RequestMetrics:
+    """
+    Middleware before/after_request que registra por ruta (la regla de Flask, no la URL,
+    para no crear una serie por cada id o ruta de archivo):
+    - histograma de latencia hasta que la vista devuelve la respuesta
+      (en MJPEG/SSE no incluye el tiempo de streaming)
+    - peticiones en curso, códigos de estado y bytes de respuesta (cuando se conoce Content-Length)
+    Las peticiones más lentas que slow_threshold_ms se registran en consola.
+    """
+
+    def __init__(self, slow_threshold_ms: float = None):
+        if slow_threshold_ms is None:
+            slow_threshold_ms = float(os.environ.get('WORKX_SLOW_REQUEST_MS', 1000))
+        self.slow_threshold = slow_threshold_ms / 1000.0
+        self._routes: dict[tuple, _RouteStats] = {}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+
+    def init_app(self, app: Flask):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def set_slow_threshold(self, slow_threshold_ms: float):
+        self.slow_threshold = slow_threshold_ms / 1000.0
+
+    def _before_request(self):
+        request.environ[_START_KEY] = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+
+    def _after_request(self, response):
+        req = request._get_current_object()  # una sola resolución del proxy (~1 µs cada una)
+        inicio = req.environ.get(_START_KEY)
+        if inicio is None:
+            return response
+        duracion = time.perf_counter() - inicio
+        rule = req.url_rule.rule if req.url_rule is not None else '<unmatched>'
+        key = (req.method, rule)
+        size = response.content_length or 0
+
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = _RouteStats()
+            stats.buckets[bisect_left(LATENCY_BUCKETS, duracion)] += 1
+            stats.count += 1
+            stats.total += duracion
+            stats.statuses[response.status_code] = stats.statuses.get(response.status_code, 0) + 1
+            stats.bytes += size
+
+        if duracion >= self.slow_threshold:
+            print(f"[RequestMetrics] Petición lenta: {req.method} {req.full_path.rstrip('?')} "
+                  f"-> {response.status_code} en {duracion * 1000:.1f} ms")
+        return response
+
+    def _teardown_request(self, exc=None):
+        # teardown se ejecuta también cuando la vista lanza excepción, así el contador no se desajusta
+        if request.environ.pop(_START_KEY, None) is not None:
+            with self._lock:
+                self._in_flight -= 1
+
+    def snapshot(self) -> dict:
+        """Copia de los contadores actuales: {(método, ruta): dict}"""
+        with self._lock:
+            routes = {
+                key: {
+                    'buckets': list(s.buckets),
+                    'count': s.count,
+                    'total': s.total,
+                    'statuses': dict(s.statuses),
+                    'bytes': s.bytes,
+                }
+                for key, s in self._routes.items()
+            }
+            return {'in_flight': self._in_flight, 'routes': routes}
+
+    def render_prometheus(self) -> str:
+        """Serializa las métricas en el formato de exposición de texto de Prometheus (0.0.4)."""
+        snap = self.snapshot()
+        lines = [
+            '# HELP workx_process_start_time_seconds Inicio del proceso en segundos desde epoch.',
+            '# TYPE workx_process_start_time_seconds gauge',
+            f'workx_process_start_time_seconds {self._started_at:.3f}',
+            '# HELP workx_http_requests_in_flight Peticiones HTTP en curso.',
+            '# TYPE workx_http_requests_in_flight gauge',
+            f'workx_http_requests_in_flight {snap["in_flight"]}',
+            '# HELP workx_http_request_duration_seconds Latencia de las peticiones HTTP por ruta.',
+            '# TYPE workx_http_request_duration_seconds histogram',
+        ]
+        items = sorted(snap['routes'].items())
+        for (method, rule), s in items:
+            labels = f'method="{method}",route="{_escape(rule)}"'
+            acumulado = 0
+            for limite, n in zip(LATENCY_BUCKETS, s['buckets']):
+                acumulado += n
+                lines.append(f'workx_http_request_duration_seconds_bucket{{{labels},le="{limite}"}} {acumulado}')
+            lines.append(f'workx_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {s["count"]}')
+            lines.append(f'workx_http_request_duration_seconds_sum{{{labels}}} {s["total"]:.6f}')
+            lines.append(f'workx_http_request_duration_seconds_count{{{labels}}} {s["count"]}')
+
+        lines.append('# HELP workx_http_requests_total Peticiones HTTP por ruta y código de estado.')
+        lines.append('# TYPE workx_http_requests_total counter')
+        for (method, rule), s in items:
+            for status, n in sorted(s['statuses'].items()):
+                lines.append(
+                    f'workx_http_requests_total{{method="{method}",route="{_escape(rule)}",status="{status}"}} {n}'
+                )
+
+        lines.append('# HELP workx_http_response_size_bytes_total Bytes de respuesta por ruta '
+                     '(solo respuestas con Content-Length).')
+        lines.append('# TYPE workx_http_response_size_bytes_total counter')
+        for (method, rule), s in items:
+            lines.append(
+                f'workx_http_response_size_bytes_total{{method="{method}",route="{_escape(rule)}"}} {s["bytes"]}'
+            )
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Instancia global del servicio
+request_metrics = RequestMetrics()
@@ -11,6 +11,8 @@ from typing import Optional, Generator
 from queue import Queue, Empty
 import time
 
+from event_bus import event_bus, STREAM_STATE, STREAM_STATS
+
 
 class RTSPStreamService:
     """
@@ -18,7 +20,10 @@ class RTSPStreamService:
     Soporta dos modos:
     - MJPEG: Solo video, baja latencia
     - HLS: Video + Audio, mayor latencia pero con sonido
+    Publica 'stream.state' al iniciar/detener/terminar y, en MJPEG, 'stream.stats' cada STATS_INTERVAL.
     """
+
+    STATS_INTERVAL = 1.0  # segundos entre publicaciones de estadísticas de un stream MJPEG
     
     def __init__(self):
         self._streams: dict[str, dict] = {}
@@ -104,6 +109,7 @@ class RTSPStreamService:
         }
         
         print(f"[RTSPStreamService] Stream HLS '{stream_id}' iniciado: {rtsp_url}")
+        event_bus.publish(STREAM_STATE, {'state': 'started', 'mode': 'hls'}, key=stream_id)
         return True
     
     def _start_mjpeg_stream(self, stream_id: str, rtsp_url: str) -> bool:
@@ -132,7 +138,7 @@ class RTSPStreamService:
         stop_event = threading.Event()
         reader_thread = threading.Thread(
             target=self._frame_reader,
-            args=(process, frame_queue, stop_event),
+            args=(process, frame_queue, stop_event, stream_id),
             daemon=True
         )
         reader_thread.start()
@@ -147,6 +153,7 @@ class RTSPStreamService:
         }
         
         print(f"[RTSPStreamService] Stream MJPEG '{stream_id}' iniciado: {rtsp_url}")
+        event_bus.publish(STREAM_STATE, {'state': 'started', 'mode': 'mjpeg'}, key=stream_id)
         return True
     
     def stop_stream(self, stream_id: str) -> bool:
@@ -174,7 +181,8 @@ class RTSPStreamService:
                     pass
             
             print(f"[RTSPStreamService] Stream '{stream_id}' detenido")
-            return True
+        event_bus.publish(STREAM_STATE, {'state': 'stopped', 'mode': stream_data.get('mode')}, key=stream_id)
+        return True
     
     def get_stream_mode(self, stream_id: str) -> Optional[str]:
         """Retorna el modo del stream ('hls' o 'mjpeg')."""
@@ -221,11 +229,15 @@ class RTSPStreamService:
         
         return generate()
     
-    def _frame_reader(self, process: subprocess.Popen, queue: Queue, stop_event: threading.Event):
+    def _frame_reader(self, process: subprocess.Popen, queue: Queue, stop_event: threading.Event, stream_id: str):
         """Lee frames JPEG del proceso FFmpeg y los pone en la cola."""
         buffer = b''
         jpeg_start = b'\xff\xd8'
         jpeg_end = b'\xff\xd9'
+        frames = 0
+        total_bytes = 0
+        window_frames = 0
+        window_start = time.perf_counter()
         
         try:
             while not stop_event.is_set() and process.poll() is None:
@@ -248,6 +260,9 @@ class RTSPStreamService:
                     
                     frame = buffer[start_idx:end_idx + 2]
                     buffer = buffer[end_idx + 2:]
+                    frames += 1
+                    window_frames += 1
+                    total_bytes += len(frame)
                     
                     try:
                         queue.put_nowait(frame)
@@ -257,6 +272,16 @@ class RTSPStreamService:
                             queue.put_nowait(frame)
                         except:
                             pass
+
+                now = time.perf_counter()
+                if now - window_start >= self.STATS_INTERVAL:
+                    event_bus.publish(STREAM_STATS, {
+                        'frames': frames,
+                        'fps': round(window_frames / (now - window_start), 2),
+                        'bytes': total_bytes,
+                    }, key=stream_id)
+                    window_frames = 0
+                    window_start = now
         except Exception as e:
             print(f"[RTSPStreamService] Error en frame_reader: {e}")
         finally:
@@ -264,6 +289,9 @@ class RTSPStreamService:
                 queue.put_nowait(None)
             except:
                 pass
+            if not stop_event.is_set():
+                # FFmpeg terminó solo (cámara caída, URL inválida...)
+                event_bus.publish(STREAM_STATE, {'state': 'ended', 'mode': 'mjpeg', 'frames': frames}, key=stream_id)
     
     def is_stream_active(self, stream_id: str) -> bool:
         """Verifica si un stream está activo."""
@@ -0,0 +1,167 @@
+"""
+Startup - Arranque rápido del servidor: subsistemas con inicialización perezosa o en segundo plano,
+estado de disponibilidad por subsistema y perfil de tiempos de arranque
+"""
+
+import os
+import sys
+import time
+import threading
+import traceback
+from typing import Any, Callable, Optional
+
+# Referencia del perfil: lo antes posible dentro del proceso (este módulo se importa primero)
+_T0 = time.perf_counter()
+_T0_WALL = time.time()
+
+
+def _process_start_time() -> Optional[float]:
+    """Hora (epoch) de creación del proceso, para medir lo que pasa antes de ejecutar Python."""
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+            creation, exit_, kernel, user = (wintypes.FILETIME() for _ in range(4))
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if not ctypes.windll.kernel32.GetProcessTimes(
+                handle, ctypes.byref(creation), ctypes.byref(exit_), ctypes.byref(kernel), ctypes.byref(user)
+            ):
+                return None
+            filetime = (creation.dwHighDateTime << 32) | creation.dwLowDateTime
+            return (filetime - 116444736000000000) / 1e7  # FILETIME: 100 ns desde 1601
+        with open('/proc/self/stat', 'r') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime', 'r') as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - uptime + start_ticks / os.sysconf('SC_CLK_TCK')
+    except Exception:
+        return None
+
+
+class StartupProfile:
+    """
+    Marcas de tiempo del arranque. mark(nombre) registra lo transcurrido desde la marca anterior,
+    así las marcas entre bloques de imports dan el desglose de cada bloque.
+    """
+
+    def __init__(self):
+        self._marks: list[tuple[str, float, float]] = []  # (nombre, duración, desde T0)
+        self._last = _T0
+        self._lock = threading.Lock()
+
+    def mark(self, name: str):
+        now = time.perf_counter()
+        with self._lock:
+            self._marks.append((name, now - self._last, now - _T0))
+            self._last = now
+
+    def record(self, name: str, seconds: float):
+        """Registra una fase medida aparte (p. ej. el init de un subsistema en otro hilo)."""
+        with self._lock:
+            self._marks.append((name, seconds, time.perf_counter() - _T0))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - _T0
+
+    def report(self) -> str:
+        lines = ["", "=" * 60, "PERFIL DE ARRANQUE"]
+        process_start = _process_start_time()
+        if process_start is not None:
+            lines.append(f"  {'proceso -> primer import (intérprete/bootloader)':<44} {(_T0_WALL - process_start) * 1000:8.1f} ms")
+        with self._lock:
+            marks = list(self._marks)
+        for name, seconds, since_t0 in marks:
+            lines.append(f"  {name:<44} {seconds * 1000:8.1f} ms   (t={since_t0 * 1000:7.1f} ms)")
+        lines.append("=" * 60)
+        return "\n".join(lines)
+
+
+class SubsystemRegistry:
+    """
+    Subsistemas opcionales del servidor (ventanas, carita, hotkeys, RTSP...).
+    - Los que se registran con background=True se inicializan en un hilo después de abrir el puerto.
+    - get(nombre) inicializa bajo demanda (o espera al hilo de fondo) si todavía no está listo.
+    Estados: 'pending', 'starting', 'ready', 'error'.
+    """
+
+    def __init__(self, profile: StartupProfile):
+        self._profile = profile
+        self._subsystems: dict[str, dict] = {}
+        self._order: list[str] = []
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, init: Callable[[], Any], background: bool = True):
+        self._subsystems[name] = {
+            'init': init,
+            'background': background,
+            'state': 'pending',
+            'value': None,
+            'error': None,
+            'seconds': None,
+            'lock': threading.Lock(),
+        }
+        self._order.append(name)
+
+    def get(self, name: str) -> Any:
+        """Devuelve el subsistema inicializándolo si hace falta. Lanza RuntimeError si falló."""
+        sub = self._subsystems[name]
+        if sub['state'] != 'ready':
+            self._initialize(name)
+        if sub['state'] == 'error':
+            raise RuntimeError(f"Subsistema '{name}' no disponible: {sub['error']}")
+        return sub['value']
+
+    def _initialize(self, name: str):
+        sub = self._subsystems[name]
+        with sub['lock']:
+            if sub['state'] in ('ready', 'error'):
+                return
+            sub['state'] = 'starting'
+            inicio = time.perf_counter()
+            try:
+                sub['value'] = sub['init']()
+                sub['state'] = 'ready'
+            except Exception as e:
+                sub['error'] = str(e)
+                sub['state'] = 'error'
+                print(f"[Startup] Error iniciando '{name}': {e}")
+                traceback.print_exc()
+            finally:
+                sub['seconds'] = time.perf_counter() - inicio
+                self._profile.record(f"init {name}", sub['seconds'])
+
+    def start_background(self, on_done: Callable[[], None] = None):
+        """Inicializa en un hilo, en orden de registro, los subsistemas marcados como background."""
+        def run():
+            for name in self._order:
+                if self._subsystems[name]['background']:
+                    self._initialize(name)
+            self._profile.mark('subsistemas en segundo plano listos')
+            if on_done:
+                on_done()
+
+        self._thread = threading.Thread(target=run, name='workx-startup', daemon=True)
+        self._thread.start()
+
+    def is_ready(self) -> bool:
+        """Listo cuando todos los subsistemas de fondo terminaron su init (aunque alguno haya fallado)."""
+        return all(
+            sub['state'] in ('ready', 'error')
+            for sub in self._subsystems.values() if sub['background']
+        )
+
+    def status(self) -> dict:
+        return {
+            name: {
+                'state': sub['state'],
+                'background': sub['background'],
+                'init_ms': round(sub['seconds'] * 1000, 1) if sub['seconds'] is not None else None,
+                'error': sub['error'],
+            }
+            for name, sub in ((n, self._subsystems[n]) for n in self._order)
+        }
+
+
+# Instancias globales del servicio
+startup_profile = StartupProfile()
+subsystems = SubsystemRegistry(startup_profile)
@@ -0,0 +1,186 @@
+"""
+Thumbnail Service - Genera sprite sheets de miniaturas para la línea de tiempo del Video Cutter
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from functools import cached_property
+from typing import Optional, List
+
+from media_cache import file_fingerprint, get_cache_dir
+from video_service import ejecutar_ffmpeg, obtener_info_media, obtener_keyframes
+
+
+class ThumbnailService:
+    """
+    Genera sprite sheets (rejillas de miniaturas) y un mapa de tiles a timestamps (WebVTT + JSON).
+    - Solo decodifica keyframes (-skip_frame nokey), por lo que es barato incluso en videos largos.
+    - Los resultados se cachean por huella de archivo: la segunda apertura del mismo video es inmediata.
+    """
+
+    MAP_FILE = 'thumbnails.json'
+    VTT_FILE = 'thumbnails.vtt'
+    MAX_TILES = 2000  # tope de miniaturas por video (cada valor distinto genera su propia caché)
+
+    def __init__(self):
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    @cached_property
+    def _cache_dir(self) -> str:
+        # Se crea en el primer uso, no al importar el módulo (antes de abrir el puerto)
+        return get_cache_dir('thumbnails')
+
+    def _get_lock(self, key: str) -> threading.Lock:
+        with self._locks_lock:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def get_sheet_directory(self, key: str) -> Optional[str]:
+        """Retorna el directorio de un conjunto de sprites ya generado."""
+        # La clave es un hash hexadecimal; cualquier otra cosa se rechaza para evitar path traversal
+        if not key or not all(c in '0123456789abcdef' for c in key):
+            return None
+        sheet_dir = os.path.join(self._cache_dir, key)
+        if not os.path.exists(os.path.join(sheet_dir, self.MAP_FILE)):
+            return None
+        return sheet_dir
+
+    def get_thumbnails(self, input_path: str, interval: float = 10.0, columns: int = 10,
+                       rows: int = 10, tile_width: int = 160, max_tiles: Optional[int] = None) -> dict:
+        """
+        Devuelve el mapa de miniaturas de un video, generándolo si no está en caché.
+
+        Args:
+            input_path: Ruta al video
+            interval: Segundos mínimos entre miniaturas
+            columns: Columnas por sprite sheet
+            rows: Filas por sprite sheet
+            tile_width: Ancho de cada miniatura en píxeles (el alto respeta el aspecto)
+            max_tiles: Si se indica, amplía el intervalo para no superar este número de miniaturas
+
+        Returns:
+            Diccionario con las dimensiones, sprite sheets y la lista de tiles con su timestamp
+        """
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"El archivo {input_path} no existe")
+
+        params = f"{interval}|{columns}|{rows}|{tile_width}|{max_tiles}"
+        key = hashlib.sha1(f"{file_fingerprint(input_path)}|{params}".encode('utf-8')).hexdigest()
+        sheet_dir = os.path.join(self._cache_dir, key)
+        map_path = os.path.join(sheet_dir, self.MAP_FILE)
+
+        with self._get_lock(key):
+            if not os.path.exists(map_path):
+                self._generate(input_path, key, interval, columns, rows, tile_width, max_tiles)
+            with open(map_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+    def _select_tiles(self, keyframes: List[float], interval: float) -> List[float]:
+        """
+        Reproduce la selección del filtro select='isnan(prev_selected_t)+gte(t-prev_selected_t,interval)'
+        sobre el índice de keyframes, para conocer el timestamp exacto de cada tile sin leer la salida.
+        """
+        selected = []
+        for t in keyframes:
+            if not selected or t - selected[-1] >= interval:
+                selected.append(t)
+        return selected
+
+    def _generate(self, input_path: str, key: str, interval: float, columns: int,
+                  rows: int, tile_width: int, max_tiles: Optional[int]):
+        info = obtener_info_media(input_path)
+        video = next((s for s in info.get('streams', []) if s.get('codec_type') == 'video'), None)
+        if video is None:
+            raise ValueError("El archivo no tiene stream de video")
+
+        duration = float(info.get('format', {}).get('duration') or 0)
+        if max_tiles and duration > 0:
+            interval = max(interval, duration / max_tiles)
+
+        width = int(video.get('width') or 16)
+        height = int(video.get('height') or 9)
+        tile_height = max(2, int(round(tile_width * height / width / 2.0)) * 2)
+
+        tiles_times = self._select_tiles(obtener_keyframes(input_path), interval)
+        if not tiles_times:
+            raise ValueError("No se encontraron keyframes en el video")
+
+        # Generar en un directorio temporal y renombrar al final (no se publica un caché a medias)
+        sheet_dir = os.path.join(self._cache_dir, key)
+        tmp_dir = f"{sheet_dir}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        try:
+            vf = (
+                f"select='isnan(prev_selected_t)+gte(t-prev_selected_t\\,{interval})',"
+                f"scale={tile_width}:{tile_height},"
+                f"tile={columns}x{rows}"
+            )
+            cmd = [
+                'ffmpeg', '-y',
+                '-skip_frame', 'nokey',    # el decoder descarta todo lo que no sea keyframe
+                '-i', input_path,
+                '-an', '-sn',
+                '-vf', vf,
+                '-fps_mode', 'vfr',
+                '-q:v', '5',
+                os.path.join(tmp_dir, 'sprite_%03d.jpg')
+            ]
+            ejecutar_ffmpeg(cmd)
+
+            per_sheet = columns * rows
+            sheets = sorted(f for f in os.listdir(tmp_dir) if f.startswith('sprite_'))
+            tiles = []
+            vtt_lines = ['WEBVTT', '']
+            for idx, t in enumerate(tiles_times):
+                sheet_idx = idx // per_sheet
+                if sheet_idx >= len(sheets):
+                    break
+                pos = idx % per_sheet
+                x = (pos % columns) * tile_width
+                y = (pos // columns) * tile_height
+                end = tiles_times[idx + 1] if idx + 1 < len(tiles_times) else max(duration, t + interval)
+                tiles.append({'time': round(t, 3), 'sheet': sheets[sheet_idx], 'x': x, 'y': y})
+                vtt_lines.append(f"{self._vtt_time(t)} --> {self._vtt_time(end)}")
+                vtt_lines.append(f"{sheets[sheet_idx]}#xywh={x},{y},{tile_width},{tile_height}")
+                vtt_lines.append('')
+
+            data = {
+                'key': key,
+                'duration': duration,
+                'interval': interval,
+                'tile_width': tile_width,
+                'tile_height': tile_height,
+                'columns': columns,
+                'rows': rows,
+                'sheets': sheets,
+                'vtt': self.VTT_FILE,
+                'tiles': tiles,
+            }
+            with open(os.path.join(tmp_dir, self.VTT_FILE), 'w', encoding='utf-8') as f:
+                f.write('\n'.join(vtt_lines))
+            with open(os.path.join(tmp_dir, self.MAP_FILE), 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+
+            shutil.rmtree(sheet_dir, ignore_errors=True)
+            os.replace(tmp_dir, sheet_dir)
+            print(f"[ThumbnailService] {len(tiles)} miniaturas en {len(sheets)} sprite(s): {input_path}")
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _vtt_time(seconds: float) -> str:
+        ms = int(round(seconds * 1000))
+        h, ms = divmod(ms, 3600000)
+        m, ms = divmod(ms, 60000)
+        s, ms = divmod(ms, 1000)
+        return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
+
+
+# Instancia global del servicio
+thumbnail_service = ThumbnailService()
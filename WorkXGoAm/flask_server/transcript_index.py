@@ -0,0 +1,327 @@
+"""
+Transcript Index - Índice persistente (SQLite + FTS5) de las transcripciones del monitor de WAVs
+
+Guarda nombre, fechas, marca de silencio, texto optimizado y texto crudo de cada modelo.
+WavProcessor lo actualiza al escribir cada TXT; sync_directory recoge lo que se haya escrito por fuera.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from media_cache import get_cache_base_dir
+
+
+SILENCE_TAG = "[silence]"
+CONTEXT_FILE = "contexto.txt"  # lo escribe ContextGenerator; no es una transcripción
+
+
+def _fts_query(query: str) -> str:
+    """
+    Convierte texto libre en una consulta FTS5 segura: cada palabra entre comillas (sin operadores
+    ni errores de sintaxis) y la última como prefijo, para buscar mientras se escribe.
+    """
+    terms = [t.replace('"', '""') for t in query.split()]
+    if not terms:
+        return ''
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+class TranscriptIndex:
+    """
+    Una fila por TXT (ruta normalizada) en 'transcripts' y su espejo en la tabla FTS5
+    'transcripts_fts' (contenido externo, mantenido con triggers).
+    - search: ranking bm25 con snippet del texto.
+    - latest: listado por fecha de grabación, paginado por offset o por cursor 'before'.
+    """
+
+    DB_FILE = 'transcripts.sqlite3'
+    SEARCH_WINDOW = 2000  # coincidencias (las más recientes) que se ordenan por relevancia
+
+    def __init__(self, db_path: Optional[str] = None):
+        self._db_path = db_path  # None: se resuelve (y se crea la base) en el primer uso
+        self._db_lock = threading.Lock()
+        self._db_ready = False
+        self._local = threading.local()
+        self._dir_mtimes: Dict[str, int] = {}  # mtime del directorio en la última sincronización
+        self._sync_lock = threading.Lock()
+
+    def open(self):
+        """Crea la base de datos si hace falta y abre la conexión del hilo actual."""
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Una conexión por hilo: sqlite3 no permite compartirlas entre hilos por defecto
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if self._db_path is None:
+                self._db_path = os.path.join(get_cache_base_dir(), self.DB_FILE)
+            conn = sqlite3.connect(self._db_path, timeout=5)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._init_db(conn)
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self, conn: sqlite3.Connection):
+        with self._db_lock:
+            if self._db_ready:
+                return
+            self._create_tables(conn)
+            self._db_ready = True
+
+    def _create_tables(self, conn: sqlite3.Connection):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS transcripts (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL UNIQUE,
+                directory TEXT NOT NULL,
+                name TEXT NOT NULL,
+                audio_path TEXT,
+                recorded_at REAL NOT NULL,
+                indexed_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                duration REAL,
+                silence INTEGER NOT NULL DEFAULT 0,
+                text TEXT NOT NULL,
+                models TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_transcripts_recent ON transcripts (directory, recorded_at DESC);
+            CREATE INDEX IF NOT EXISTS idx_transcripts_recent_all ON transcripts (recorded_at DESC);
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS transcripts_fts USING fts5(
+                name, text,
+                content='transcripts', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS transcripts_ai AFTER INSERT ON transcripts BEGIN
+                INSERT INTO transcripts_fts (rowid, name, text) VALUES (new.id, new.name, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS transcripts_ad AFTER DELETE ON transcripts BEGIN
+                INSERT INTO transcripts_fts (transcripts_fts, rowid, name, text) VALUES ('delete', old.id, old.name, old.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS transcripts_au AFTER UPDATE ON transcripts BEGIN
+                INSERT INTO transcripts_fts (transcripts_fts, rowid, name, text) VALUES ('delete', old.id, old.name, old.text);
+                INSERT INTO transcripts_fts (rowid, name, text) VALUES (new.id, new.name, new.text);
+            END;
+        """)
+        conn.commit()
+
+    @staticmethod
+    def _norm(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    # ==========================
+    # Escritura
+    # ==========================
+    def add(self, txt_path: str, text: Optional[str] = None, silence: Optional[bool] = None,
+            models: Optional[Dict[str, str]] = None, audio_path: Optional[str] = None,
+            duration: Optional[float] = None, commit: bool = True):
+        """
+        Indexa (o actualiza) una transcripción ya escrita en disco.
+
+        Args:
+            txt_path: Ruta del TXT
+            text: Texto optimizado (si se omite se lee del archivo)
+            silence: Si el audio era silencio (si se omite se deduce del texto)
+            models: Texto crudo de cada modelo {modelo: texto}
+            audio_path: WAV de origen; su mtime se usa como fecha de grabación
+            duration: Duración del audio en segundos
+        """
+        path = self._norm(txt_path)
+        st = os.stat(path)
+        if text is None:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                text = f.read()
+        text = text.strip()
+        if silence is None:
+            silence = text.startswith(SILENCE_TAG)
+        if audio_path is None:
+            candidate = os.path.splitext(path)[0] + '.wav'
+            audio_path = candidate if os.path.exists(candidate) else None
+        recorded_at = os.path.getmtime(audio_path) if audio_path and os.path.exists(audio_path) else st.st_mtime
+
+        conn = self._connect()
+        conn.execute(
+            """
+            INSERT INTO transcripts (path, directory, name, audio_path, recorded_at, indexed_at, size, mtime_ns,
+                                     duration, silence, text, models)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET
+                audio_path = excluded.audio_path, recorded_at = excluded.recorded_at,
+                indexed_at = excluded.indexed_at, size = excluded.size, mtime_ns = excluded.mtime_ns,
+                duration = COALESCE(excluded.duration, transcripts.duration), silence = excluded.silence,
+                text = excluded.text, models = COALESCE(excluded.models, transcripts.models)
+            """,
+            (path, os.path.dirname(path), os.path.splitext(os.path.basename(path))[0], audio_path, recorded_at,
+             time.time(), st.st_size, st.st_mtime_ns, duration, int(bool(silence)), text,
+             json.dumps(models, ensure_ascii=False) if models else None)
+        )
+        if commit:
+            conn.commit()
+
+    def sync_directory(self, directory: str, force: bool = False) -> dict:
+        """
+        Sincroniza el índice con los TXT de un directorio: indexa nuevos/modificados y quita borrados.
+        Si el mtime del directorio no cambió desde la última vez, no recorre nada.
+
+        Returns:
+            {'added': n, 'removed': n, 'skipped': bool}
+        """
+        directory = self._norm(directory)
+        try:
+            dir_mtime = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            return {'added': 0, 'removed': 0, 'skipped': True}
+
+        with self._sync_lock:
+            if not force and self._dir_mtimes.get(directory) == dir_mtime:
+                return {'added': 0, 'removed': 0, 'skipped': True}
+
+            conn = self._connect()
+            known = {
+                row['path']: row['mtime_ns']
+                for row in conn.execute("SELECT path, mtime_ns FROM transcripts WHERE directory = ?", (directory,))
+            }
+            added = 0
+            seen = set()
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if not name.lower().endswith('.txt') or name.startswith('.') or name == CONTEXT_FILE:
+                        continue
+                    path = self._norm(entry.path)
+                    seen.add(path)
+                    if known.get(path) == entry.stat().st_mtime_ns:
+                        continue
+                    try:
+                        self.add(path, commit=False)
+                        added += 1
+                    except OSError:
+                        continue  # borrado o aún bloqueado mientras se escribe
+            removed = [p for p in known if p not in seen]
+            conn.executemany("DELETE FROM transcripts WHERE path = ?", [(p,) for p in removed])
+            conn.commit()
+            self._dir_mtimes[directory] = dir_mtime
+            return {'added': added, 'removed': len(removed), 'skipped': False}
+
+    # ==========================
+    # Consultas
+    # ==========================
+    @staticmethod
+    def _row(row: sqlite3.Row, with_models: bool = False) -> dict:
+        item = {
+            'path': row['path'],
+            'name': row['name'],
+            'audio_path': row['audio_path'],
+            'recorded_at': row['recorded_at'],
+            'duration': row['duration'],
+            'silence': bool(row['silence']),
+        }
+        if 'snippet' in row.keys():
+            item['snippet'] = row['snippet']
+            item['rank'] = row['rank']
+        else:
+            item['text'] = row['text']
+        if with_models:
+            item['models'] = json.loads(row['models']) if row['models'] else None
+        return item
+
+    def search(self, query: str, directory: Optional[str] = None, limit: int = 20, offset: int = 0,
+               include_silence: bool = False, before: Optional[int] = None) -> dict:
+        """
+        Búsqueda de texto completo ordenada por relevancia (bm25, el nombre pesa menos que el texto).
+        Con términos muy comunes, bm25 sobre todas las coincidencias costaría decenas de ms con 100k
+        transcripciones: se ordenan por relevancia solo las SEARCH_WINDOW coincidencias indexadas más
+        recientes (con términos poco frecuentes son todas). Si quedan coincidencias más antiguas,
+        'truncated' es True y 'next_before' es el cursor para ordenar la siguiente ventana.
+
+        Args:
+            before: Cursor: solo coincidencias con id menor (el 'next_before' de la respuesta anterior)
+
+        Returns:
+            {'results': resultados con snippet ([coincidencia] resaltada), 'truncated': bool,
+             'next_before': int o None}
+        """
+        match = _fts_query(query)
+        if not match:
+            return {'results': [], 'truncated': False, 'next_before': None}
+        filtros = ""
+        params = {'match': match, 'limit': limit, 'offset': offset, 'window': self.SEARCH_WINDOW}
+        if directory:
+            filtros += " AND t.directory = :directory"
+            params['directory'] = self._norm(directory)
+        if not include_silence:
+            filtros += " AND t.silence = 0"
+        if before is not None:
+            filtros += " AND transcripts_fts.rowid < :before"
+            params['before'] = before
+        conn = self._connect()
+        # Primera coincidencia que queda fuera de la ventana (None si caben todas)
+        row = conn.execute(f"""
+            SELECT transcripts_fts.rowid FROM transcripts_fts
+            JOIN transcripts t ON t.id = transcripts_fts.rowid
+            WHERE transcripts_fts MATCH :match {filtros}
+            ORDER BY transcripts_fts.rowid DESC LIMIT 1 OFFSET :window
+        """, params).fetchone()
+        cutoff = row[0] if row else None
+        if cutoff is not None:
+            filtros += " AND transcripts_fts.rowid > :cutoff"
+            params['cutoff'] = cutoff
+        sql = f"""
+            SELECT t.path, t.name, t.audio_path, t.recorded_at, t.duration, t.silence,
+                   snippet(transcripts_fts, 1, '[', ']', '…', 16) AS snippet,
+                   bm25(transcripts_fts, 0.5, 1.0) AS rank
+            FROM transcripts_fts
+            JOIN transcripts t ON t.id = transcripts_fts.rowid
+            WHERE transcripts_fts MATCH :match {filtros}
+            ORDER BY rank LIMIT :limit OFFSET :offset
+        """
+        return {
+            'results': [self._row(r) for r in conn.execute(sql, params)],
+            'truncated': cutoff is not None,
+            'next_before': cutoff + 1 if cutoff is not None else None,
+        }
+
+    def latest(self, directory: Optional[str] = None, limit: int = 20, offset: int = 0,
+               before: Optional[float] = None, include_silence: bool = True,
+               with_models: bool = False) -> List[dict]:
+        """
+        Transcripciones más recientes primero.
+
+        Args:
+            before: Cursor: solo las grabadas antes de este timestamp (más rápido que offset en páginas lejanas)
+        """
+        sql = "SELECT * FROM transcripts WHERE 1 = 1"
+        params: list = []
+        if directory:
+            sql += " AND directory = ?"
+            params.append(self._norm(directory))
+        if before is not None:
+            sql += " AND recorded_at < ?"
+            params.append(before)
+        if not include_silence:
+            sql += " AND silence = 0"
+        sql += " ORDER BY recorded_at DESC LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        return [self._row(r, with_models) for r in self._connect().execute(sql, params)]
+
+    def count(self, directory: Optional[str] = None) -> int:
+        if directory:
+            row = self._connect().execute(
+                "SELECT COUNT(*) FROM transcripts WHERE directory = ?", (self._norm(directory),)
+            ).fetchone()
+        else:
+            row = self._connect().execute("SELECT COUNT(*) FROM transcripts").fetchone()
+        return row[0]
+
+
+# Instancia global del servicio
+transcript_index = TranscriptIndex()
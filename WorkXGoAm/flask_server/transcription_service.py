@@ -0,0 +1,179 @@
+"""
+Transcription Service - Motor de transcripción (FileToText / wav_monitor) alojado en el servidor,
+con un solo cliente de OpenAI (pool de conexiones caliente) y un solo pool de trabajo para todo
+"""
+
+import os
+import sys
+import threading
+from typing import Optional
+
+from job_service import JobService
+from transcript_index import transcript_index
+
+# Scripts de transcripción (src-python)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src-python'))
+
+
+class TranscriptionService:
+    """
+    Aloja AudioTranscriber, WavProcessor y ContextGenerator dentro del proceso del servidor.
+    - openai/pydub se importan y el cliente se crea en el primer uso; después todas las
+      transcripciones y monitores reutilizan el mismo cliente y sus conexiones keep-alive.
+    - Las transcripciones enviadas y los WAV detectados por los monitores comparten un pool de trabajo.
+    - Cada monitor de directorio corre su bucle en un hilo propio que solo encola trabajo.
+    """
+
+    MAX_WORKERS = 4        # archivos transcritos a la vez (cada uno lanza hasta 3 modelos en paralelo)
+    MAX_CONNECTIONS = 16   # conexiones HTTP simultáneas del cliente compartido
+
+    def __init__(self):
+        self.jobs = JobService(max_workers=self.MAX_WORKERS)
+        self._client = None
+        self._transcriber = None
+        self._monitors: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                import httpx
+                import openai
+                from dotenv import load_dotenv
+                load_dotenv()
+                api_key = os.getenv('OPENAI_API_KEY')
+                if not api_key:
+                    raise ValueError("OPENAI_API_KEY no está configurada")
+                # Mismos timeouts/redirects que el cliente por defecto, con más conexiones keep-alive
+                http_client = openai.DefaultHttpxClient(
+                    limits=httpx.Limits(max_connections=self.MAX_CONNECTIONS,
+                                        max_keepalive_connections=self.MAX_CONNECTIONS)
+                )
+                self._client = openai.OpenAI(api_key=api_key, http_client=http_client)
+                print(f"[TranscriptionService] Cliente OpenAI creado (pool de {self.MAX_CONNECTIONS} conexiones)")
+            return self._client
+
+    def _get_transcriber(self):
+        client = self._get_client()
+        with self._lock:
+            if self._transcriber is None:
+                from FileToText import AudioTranscriber
+                self._transcriber = AudioTranscriber(client=client)
+            return self._transcriber
+
+    # ==========================
+    # Transcripción de archivos
+    # ==========================
+    def submit(self, audio_path: str, language: Optional[str] = None, prompt: Optional[str] = None,
+               model: Optional[str] = None, output: Optional[str] = None) -> dict:
+        """
+        Encola la transcripción de un archivo de audio.
+
+        Args:
+            audio_path: Ruta al audio (WAV se codifica a Opus 16 kHz mono en memoria antes de subir)
+            language: Código de idioma opcional
+            prompt: Texto opcional para guiar la transcripción
+            model: Modelo concreto; si se omite se usan todos y se optimiza el resultado
+            output: Ruta opcional donde guardar el texto
+
+        Returns:
+            Estado del trabajo
+        """
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"El archivo {audio_path} no existe")
+        key = f"transcribe:{os.path.normcase(os.path.abspath(audio_path))}|{language}|{prompt}|{model}|{output}"
+        return self.jobs.submit('transcribe', self._transcribe, audio_path, language, prompt, model, output, key=key)
+
+    def _transcribe(self, audio_path: str, language: Optional[str], prompt: Optional[str],
+                    model: Optional[str], output: Optional[str], progress=None) -> dict:
+        transcriber = self._get_transcriber()
+        # Un asset por archivo: se lee una vez y un WAV se sube codificado a Opus 16 kHz mono en memoria
+        asset = transcriber.audio_asset(audio_path)
+        if progress:
+            progress(0.2)
+
+        results = None
+        if model:
+            text = transcriber.transcribe_audio(asset, language=language, prompt=prompt, model=model)
+        else:
+            results = transcriber.transcribe_with_all_models(asset, language=language, prompt=prompt)
+        asset.release()  # la optimización con GPT-4o ya no necesita el audio en memoria
+        if results is not None:
+            text = transcriber.optimize_transcription(results)
+
+        silence = text == transcriber.SILENCE_TAG
+        if output:
+            with open(output, 'w', encoding='utf-8') as f:
+                f.write(text or '')
+            try:
+                transcript_index.add(output, text=text or '', silence=silence, models=results, audio_path=audio_path)
+            except Exception as e:
+                # El TXT ya está escrito: un fallo del índice no invalida la transcripción
+                print(f"[TranscriptionService] No se pudo indexar {output}: {str(e)}")
+        return {'input': audio_path, 'text': text, 'silence': silence, 'output': output}
+
+    # ==========================
+    # Monitoreo de directorios
+    # ==========================
+    def start_monitor(self, directory: str, check_interval: int = 5) -> dict:
+        """
+        Empieza a monitorear un directorio: cada WAV sin TXT se transcribe en el pool compartido
+        y el archivo de contexto se actualiza periódicamente.
+        """
+        directory = os.path.abspath(directory)
+        os.makedirs(directory, exist_ok=True)
+        client = self._get_client()
+        with self._lock:
+            existing = self._monitors.get(directory)
+            if existing and existing['thread'].is_alive():
+                return self._monitor_info(directory, existing)
+
+            from wav_monitor import WavProcessor
+            processor = WavProcessor(directory, check_interval, client=client, submit=self._submit_monitored)
+            thread = threading.Thread(target=processor.start_monitoring, name=f"wav-monitor:{directory}", daemon=True)
+            monitor = {'processor': processor, 'thread': thread, 'check_interval': check_interval}
+            self._monitors[directory] = monitor
+            thread.start()
+            print(f"[TranscriptionService] Monitoreando {directory}")
+            return self._monitor_info(directory, monitor)
+
+    def _submit_monitored(self, func, wav_file: str):
+        self.jobs.submit('monitor', lambda path, progress=None: func(path), wav_file, key=f"monitor:{wav_file}")
+
+    def stop_monitor(self, directory: str) -> bool:
+        """Detiene el monitor de un directorio. Retorna False si no existía."""
+        directory = os.path.abspath(directory)
+        with self._lock:
+            monitor = self._monitors.pop(directory, None)
+        if monitor is None:
+            return False
+        monitor['processor'].stop_monitoring()
+        monitor['thread'].join(timeout=10)
+        print(f"[TranscriptionService] Monitor detenido: {directory}")
+        return True
+
+    def is_monitored(self, directory: str) -> bool:
+        """True si el directorio es la salida de un monitor registrado (los únicos que se sincronizan con el índice)."""
+        directory = os.path.normcase(os.path.abspath(directory))
+        with self._lock:
+            return any(os.path.normcase(d) == directory for d in self._monitors)
+
+    def list_monitors(self) -> list:
+        with self._lock:
+            return [self._monitor_info(d, m) for d, m in self._monitors.items()]
+
+    @staticmethod
+    def _monitor_info(directory: str, monitor: dict) -> dict:
+        processor = monitor['processor']
+        with processor.lock:
+            processing = sorted(processor.processing_files)
+        return {
+            'directory': directory,
+            'running': monitor['thread'].is_alive(),
+            'check_interval': monitor['check_interval'],
+            'processing': processing,
+        }
+
+
+# Instancia global del servicio
+transcription_service = TranscriptionService()
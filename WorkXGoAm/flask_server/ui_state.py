@@ -1,58 +1,123 @@
-from typing import Optional, Tuple, Callable
+import threading
+from typing import Optional, Tuple
+
+from event_bus import event_bus, UI_STATE, UI_FACE_HOVER, UI_POPUP_HOVER
+from ui_state_shm import UiStateShmWriter
 
 # Estado UI compartido entre Flask, Tk y Tauri
+# Cada cambio incrementa _version y despierta a quien espera (long-poll / SSE),
+# así la UI recibe los cambios al instante sin tener que hacer polling.
+# Además se publica en el bus de eventos dentro del lock, así las versiones de 'ui.state' se encolan
+# en orden (publish solo encola, nunca espera a los suscriptores, que corren en sus propios hilos);
+# las reacciones (p. ej. minimizar RDP al pasar sobre el sol) se suscriben allí.
+# Con enable_shared_memory(), cada versión se copia también a un archivo mapeado en memoria
+# que otros procesos (Tauri) leen sin HTTP (ver ui_state_shm).
 
 _face_hover: bool = False
 _popup_hover: bool = False
 _face_rect: Optional[Tuple[int, int, int, int]] = None
 _auto_hide_rdp: bool = False
+_version: int = 0
+_changed = threading.Condition()
+_shm = UiStateShmWriter()
+
+
+def _bump_locked() -> None:
+    """Incrementa la versión y notifica a los que esperan (llamar con _changed adquirido)."""
+    global _version
+    _version += 1
+    _shm.write(_state_locked())
+    _changed.notify_all()
+
 
-# Callback para ejecutar cuando face_hover se activa con auto_hide_rdp
-_on_face_hover_with_auto: Optional[Callable[[], None]] = None
+def _publish_locked(topic=None, data=None) -> None:
+    """Publica el cambio y el estado completo (llamar con _changed adquirido, tras _bump_locked)."""
+    state = _state_locked()
+    if topic is not None:
+        event_bus.publish(topic, data)
+    event_bus.publish(UI_STATE, state)
 
 
 def set_face_hover(value: bool) -> None:
     global _face_hover
-    _face_hover = bool(value)
-    # Si el mouse entra al sol y auto_hide_rdp está activo, ejecutar callback
-    if _face_hover and _auto_hide_rdp and _on_face_hover_with_auto:
-        try:
-            _on_face_hover_with_auto()
-        except Exception:
-            pass
+    value = bool(value)
+    with _changed:
+        if _face_hover != value:
+            _face_hover = value
+            _bump_locked()
+            # auto_hide_rdp del momento del hover: el suscriptor lo recibe más tarde, en su hilo
+            _publish_locked(UI_FACE_HOVER, {"hover": value, "auto_hide_rdp": _auto_hide_rdp})
 
 
 def set_popup_hover(value: bool) -> None:
     global _popup_hover
-    _popup_hover = bool(value)
+    value = bool(value)
+    with _changed:
+        if _popup_hover != value:
+            _popup_hover = value
+            _bump_locked()
+            _publish_locked(UI_POPUP_HOVER, {"hover": value})
 
 
 def set_face_rect(rect: Optional[Tuple[int, int, int, int]]) -> None:
     global _face_rect
-    _face_rect = rect
+    rect = tuple(rect) if rect is not None else None
+    with _changed:
+        if _face_rect != rect:
+            _face_rect = rect
+            _bump_locked()
+            _publish_locked()
 
 
 def set_auto_hide_rdp(value: bool) -> None:
     global _auto_hide_rdp
-    _auto_hide_rdp = bool(value)
+    value = bool(value)
+    with _changed:
+        if _auto_hide_rdp != value:
+            _auto_hide_rdp = value
+            _bump_locked()
+            _publish_locked()
 
 
 def get_auto_hide_rdp() -> bool:
     return _auto_hide_rdp
 
 
-def set_on_face_hover_callback(callback: Optional[Callable[[], None]]) -> None:
-    """Registra un callback que se ejecutará cuando el mouse entre al sol con auto activo."""
-    global _on_face_hover_with_auto
-    _on_face_hover_with_auto = callback
+def enable_shared_memory(path: Optional[str] = None) -> str:
+    """Crea/abre el archivo de estado compartido y escribe el estado actual. Retorna su ruta."""
+    with _changed:
+        path = _shm.open(path)
+        _shm.write(_state_locked())
+    return path
 
 
-def get_state() -> dict:
+def get_version() -> int:
+    return _version
+
+
+def _state_locked() -> dict:
     return {
         "face_hover": _face_hover,
         "popup_hover": _popup_hover,
         "face_rect": _face_rect,
         "auto_hide_rdp": _auto_hide_rdp,
+        "version": _version,
     }
 
 
+def get_state() -> dict:
+    with _changed:
+        return _state_locked()
+
+
+def wait_for_change(since: int, timeout: float) -> dict:
+    """
+    Espera hasta que la versión sea mayor que 'since' o se agote el timeout.
+    Devuelve el estado actual (si no hubo cambios, con la misma versión).
+    Un 'since' mayor que la versión actual viene de antes de reiniciar el servidor (la versión
+    vuelve a 0): se responde al instante con el estado actual para que el cliente se resincronice.
+    """
+    with _changed:
+        if since <= _version:
+            _changed.wait_for(lambda: _version > since, timeout=timeout)
+        return _state_locked()
@@ -0,0 +1,178 @@
+"""
+UI State Shm - Estado UI en un archivo mapeado en memoria de tamaño fijo, para que Tauri o
+cualquier proceso local lo lea sin pedirlo por HTTP (seqlock: el escritor nunca espera a los lectores)
+
+Disposición (little-endian, 64 bytes):
+    offset  tipo     campo
+    0       4s       magic b'WXUI'
+    4       u16      versión de la disposición (LAYOUT_VERSION)
+    6       u16      tamaño total (SIZE)
+    8       u64      seq: impar mientras se escribe, par cuando el contenido es consistente
+    16      u64      versión del estado (ui_state.get_version())
+    24      u8       flags: bit0 face_hover, bit1 popup_hover, bit2 auto_hide_rdp, bit3 hay face_rect
+    28      i32[4]   face_rect (left, top, right, bottom); ceros si no hay
+    44      u32      pid del escritor
+    48      f64      hora (epoch) de la última escritura
+    56      8 bytes  reservados
+
+Lectura: leer seq (si es impar, reintentar), copiar los bytes 16..56, volver a leer seq;
+si cambió, reintentar. En Rust/C, cargar seq con ordenamiento acquire antes y después de la copia.
+"""
+
+import os
+import mmap
+import time
+import struct
+import tempfile
+from typing import Optional
+
+
+MAGIC = b'WXUI'
+LAYOUT_VERSION = 1
+SIZE = 64
+SHM_FILE = 'ui-state.bin'
+
+_HEADER = struct.Struct('<4sHH')
+_SEQ = struct.Struct('<Q')
+_SEQ_OFFSET = 8
+_PAYLOAD = struct.Struct('<QB3x4iId')
+_PAYLOAD_OFFSET = 16
+
+FLAG_FACE_HOVER = 1
+FLAG_POPUP_HOVER = 2
+FLAG_AUTO_HIDE_RDP = 4
+FLAG_HAS_RECT = 8
+
+
+def default_shm_path() -> str:
+    """%LOCALAPPDATA%/WorkXGoAm/ui-state.bin (junto a server-port.json) o el directorio temporal."""
+    local_app_data = os.environ.get('LOCALAPPDATA')
+    base_dir = os.path.join(local_app_data, "WorkXGoAm") if local_app_data else tempfile.gettempdir()
+    os.makedirs(base_dir, exist_ok=True)
+    return os.path.join(base_dir, SHM_FILE)
+
+
+class UiStateShmWriter:
+    """
+    Escritor único del archivo. write() debe llamarse con las escrituras serializadas
+    (ui_state lo llama con su lock tomado); antes de open() no hace nada.
+    """
+
+    def __init__(self):
+        self.path: Optional[str] = None
+        self._file = None
+        self._mm: Optional[mmap.mmap] = None
+        self._seq = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self._mm is not None
+
+    def open(self, path: Optional[str] = None) -> str:
+        if self._mm is not None:
+            return self.path
+        path = path or default_shm_path()
+        # r+b sin truncar si ya existe: un lector que lo tenga mapeado sigue viendo el mismo archivo
+        self._file = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+        if os.fstat(self._file.fileno()).st_size != SIZE:
+            self._file.truncate(SIZE)
+        self._mm = mmap.mmap(self._file.fileno(), SIZE, access=mmap.ACCESS_WRITE)
+        # Continuar la secuencia anterior (par) para que un lector abierto no vea retrocesos
+        previous = _SEQ.unpack_from(self._mm, _SEQ_OFFSET)[0] if self._mm[:4] == MAGIC else 0
+        self._seq = previous + (previous & 1)
+        _HEADER.pack_into(self._mm, 0, MAGIC, LAYOUT_VERSION, SIZE)
+        self.path = path
+        return path
+
+    def write(self, state: dict):
+        mm = self._mm
+        if mm is None:
+            return
+        rect = state.get('face_rect')
+        flags = ((FLAG_FACE_HOVER if state.get('face_hover') else 0)
+                 | (FLAG_POPUP_HOVER if state.get('popup_hover') else 0)
+                 | (FLAG_AUTO_HIDE_RDP if state.get('auto_hide_rdp') else 0)
+                 | (FLAG_HAS_RECT if rect else 0))
+        left, top, right, bottom = rect if rect else (0, 0, 0, 0)
+        self._seq += 1  # impar: escritura en curso
+        _SEQ.pack_into(mm, _SEQ_OFFSET, self._seq)
+        _PAYLOAD.pack_into(mm, _PAYLOAD_OFFSET, state.get('version', 0), flags,
+                           left, top, right, bottom, os.getpid(), time.time())
+        self._seq += 1  # par: contenido consistente
+        _SEQ.pack_into(mm, _SEQ_OFFSET, self._seq)
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+            self._file = None
+
+
+class UiStateShmReader:
+    """Lector del archivo (desde cualquier proceso). read() reintenta mientras haya una escritura en curso."""
+
+    READ_TIMEOUT = 0.1  # segundos reintentando antes de asumir que el escritor murió a mitad de escritura
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_shm_path()
+        with open(self.path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), SIZE, access=mmap.ACCESS_READ)
+        magic, layout, size = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or layout != LAYOUT_VERSION or size != SIZE:
+            self._mm.close()
+            raise ValueError(f"{self.path} no es un estado UI compatible (magic={magic!r}, layout={layout})")
+        self.retries = 0  # lecturas repetidas por coincidir con una escritura
+
+    def seq(self) -> int:
+        """Contador de escrituras: si no cambió desde la última lectura, el estado tampoco."""
+        return _SEQ.unpack_from(self._mm, _SEQ_OFFSET)[0]
+
+    def read(self) -> dict:
+        """
+        Returns:
+            {'face_hover', 'popup_hover', 'face_rect', 'auto_hide_rdp', 'version', 'seq', 'pid', 'updated_at'}
+        """
+        mm = self._mm
+        deadline = None
+        while True:
+            before = _SEQ.unpack_from(mm, _SEQ_OFFSET)[0]
+            if not before & 1:
+                version, flags, left, top, right, bottom, pid, updated_at = _PAYLOAD.unpack_from(mm, _PAYLOAD_OFFSET)
+                if _SEQ.unpack_from(mm, _SEQ_OFFSET)[0] == before:
+                    break
+            self.retries += 1
+            now = time.perf_counter()
+            if deadline is None:
+                deadline = now + self.READ_TIMEOUT
+            elif now > deadline:
+                raise TimeoutError("El escritor no terminó la escritura del estado UI")
+            time.sleep(0)  # ceder el procesador al escritor
+        return {
+            'face_hover': bool(flags & FLAG_FACE_HOVER),
+            'popup_hover': bool(flags & FLAG_POPUP_HOVER),
+            'face_rect': (left, top, right, bottom) if flags & FLAG_HAS_RECT else None,
+            'auto_hide_rdp': bool(flags & FLAG_AUTO_HIDE_RDP),
+            'version': version,
+            'seq': before,
+            'pid': pid,
+            'updated_at': updated_at,
+        }
+
+    def close(self):
+        self._mm.close()
+
+
+def read_ui_state(path: Optional[str] = None) -> dict:
+    """Lectura puntual (abre, lee y cierra). Para lecturas repetidas, conservar un UiStateShmReader."""
+    reader = UiStateShmReader(path)
+    try:
+        return reader.read()
+    finally:
+        reader.close()
+
+
+if __name__ == '__main__':
+    import sys
+    import json
+    print(json.dumps(read_ui_state(sys.argv[1] if len(sys.argv) > 1 else None), indent=2))
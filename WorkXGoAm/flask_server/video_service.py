@@ -1,7 +1,57 @@
 # -*- coding: utf-8 -*-
 import os
 import sys
+import shutil
+import tempfile
 import subprocess
+import threading
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from media_cache import media_cache
+
+# Modos de corte soportados por recortar_video
+MODO_COPY = 'copy'    # Copia de streams, el inicio cae en el keyframe anterior
+MODO_SMART = 'smart'  # Recodifica solo los GOP parciales de los extremos
+MODO_REENCODE = 'reencode'  # Recodifica todo el tramo, en paralelo por bloques entre keyframes
+
+# Encoders equivalentes a cada codec de entrada para recodificar los extremos
+_ENCODERS_VIDEO = {
+    'h264': 'libx264',
+    'hevc': 'libx265',
+    'mpeg4': 'mpeg4',
+    'vp9': 'libvpx-vp9',
+}
+_PERFILES_X264 = {
+    'constrained baseline': 'baseline',
+    'baseline': 'baseline',
+    'main': 'main',
+    'high': 'high',
+    'high 10': 'high10',
+    'high 4:2:2': 'high422',
+    'high 4:4:4 predictive': 'high444',
+}
+_ENCODERS_AUDIO = {
+    'aac': 'aac',
+    'mp3': 'libmp3lame',
+    'opus': 'libopus',
+    'ac3': 'ac3',
+}
+
+# Tolerancia (segundos) para considerar que un tiempo coincide con un keyframe
+_TOLERANCIA_KEYFRAME = 0.001
+
+# Índice de cambios de escena: se guardan los frames con score >= este mínimo
+# (el umbral de sugerencia se aplica al consultar, sin recalcular)
+ESCENA_SCORE_MINIMO = 0.08
+_ESCENA_ANCHO_ANALISIS = 160
+
+# Recodificación paralela: duración mínima de cada tramo (el arranque de ffmpeg y el
+# lookahead del encoder no compensan en tramos más cortos) y tramos por worker para balancear carga
+_TRAMO_MINIMO = 4.0
+_TRAMOS_POR_WORKER = 2
+
 
 def generar_nombre_salida(input_path, start, end):
     """
@@ -12,16 +62,599 @@ def generar_nombre_salida(input_path, start, end):
     end_fmt = end.replace(':', '')
     return f"{name}_from{start_fmt}_to{end_fmt}{ext}"
 
-def recortar_video(input_path, start, end, output_path=None):
+
+def tiempo_a_segundos(valor) -> float:
+    """
+    Convierte 'HH:MM:SS(.ms)', 'MM:SS' o un número de segundos a float.
+    """
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    segundos = 0.0
+    for parte in str(valor).strip().split(':'):
+        segundos = segundos * 60 + float(parte)
+    return segundos
+
+
+def _formatear_segundos(segundos: float) -> str:
+    return f"{segundos:.6f}"
+
+
+def ejecutar_ffmpeg(cmd: List[str]) -> subprocess.CompletedProcess:
+    """Ejecuta ffmpeg/ffprobe mostrando stderr solo si falla."""
+    try:
+        return subprocess.run(cmd, check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        print(f"Error ejecutando {cmd[0]}. Código de retorno: {e.returncode}", file=sys.stderr)
+        print(f"Command: {' '.join(cmd)}", file=sys.stderr)
+        print(f"{cmd[0]} stderr:", e.stderr, file=sys.stderr)
+        raise
+    except FileNotFoundError:
+        print(f"Error: Comando '{cmd[0]}' no encontrado. Asegúrate de que esté instalado y en el PATH.", file=sys.stderr)
+        raise
+
+
+def obtener_info_media(input_path: str) -> dict:
+    """
+    Devuelve el JSON de ffprobe (format + streams) del archivo desde la caché de metadatos.
+    """
+    return media_cache.probe(input_path)
+
+
+def obtener_keyframes(input_path: str) -> List[float]:
+    """
+    Devuelve los keyframes del video desde la caché de metadatos, en segundos desde el inicio
+    del archivo (la misma base que -ss), aunque el contenedor tenga start_time distinto de 0.
+    """
+    return media_cache.keyframes(input_path)
+
+
+def _parametros_encoder(info: dict) -> List[str]:
+    """
+    Construye los argumentos de codificación que reproducen los parámetros del original
+    (codec, perfil, formato de píxel, resolución, audio) para que los extremos recodificados
+    se puedan concatenar con la parte copiada.
+    """
+    streams = info.get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video'), None)
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+    if video is None:
+        raise ValueError("El archivo no tiene stream de video")
+    if _ENCODERS_VIDEO.get(video.get('codec_name')) is None:
+        raise ValueError(f"Codec de video '{video.get('codec_name')}' no soportado en modo smart")
+    return ['-map', '0:v:0', *_parametros_video(video), *_parametros_audio(audio)]
+
+
+def _parametros_video(video: dict, encoder_defecto: Optional[str] = None) -> List[str]:
+    """Argumentos del encoder de video equivalentes al stream original."""
+    codec_video = video.get('codec_name')
+    encoder_video = _ENCODERS_VIDEO.get(codec_video, encoder_defecto)
+    if encoder_video is None:
+        raise ValueError(f"Codec de video '{codec_video}' no soportado")
+
+    args = ['-c:v', encoder_video]
+    if encoder_video in ('libx264', 'libx265'):
+        args += ['-preset', 'fast', '-crf', '18']
+        perfil = _PERFILES_X264.get((video.get('profile') or '').lower())
+        if encoder_video == 'libx264' and perfil and codec_video == 'h264':
+            args += ['-profile:v', perfil]
+    if video.get('pix_fmt'):
+        args += ['-pix_fmt', video['pix_fmt']]
+    if video.get('width') and video.get('height'):
+        args += ['-s', f"{video['width']}x{video['height']}"]
+    return args
+
+
+def _parametros_audio(audio: Optional[dict]) -> List[str]:
+    """Argumentos (con -map) del encoder de audio equivalente; vacío si no hay audio soportado."""
+    if audio is None:
+        return []
+    encoder_audio = _ENCODERS_AUDIO.get(audio.get('codec_name'))
+    if encoder_audio is None:
+        return []
+    args = ['-map', '0:a:0', '-c:a', encoder_audio]
+    if audio.get('sample_rate'):
+        args += ['-ar', str(audio['sample_rate'])]
+    if audio.get('channels'):
+        args += ['-ac', str(audio['channels'])]
+    if audio.get('bit_rate'):
+        args += ['-b:a', str(audio['bit_rate'])]
+    return args
+
+
+def _segmento_recodificado(input_path: str, inicio: float, duracion: float, encoder_args: List[str], salida: str):
+    """Recodifica [inicio, inicio+duracion) con seek preciso (-ss antes de -i con decodificación)."""
+    cmd = [
+        'ffmpeg', '-y',
+        '-ss', _formatear_segundos(inicio),
+        '-i', input_path,
+        '-t', _formatear_segundos(duracion),
+        *encoder_args,
+        '-f', 'mpegts',
+        salida
+    ]
+    ejecutar_ffmpeg(cmd)
+
+
+def _segmento_copiado(input_path: str, inicio: float, duracion: float, con_audio: bool, salida: str):
+    """Copia [inicio, inicio+duracion) sin recodificar; inicio debe ser un keyframe."""
+    cmd = [
+        'ffmpeg', '-y',
+        '-ss', _formatear_segundos(inicio),
+        '-i', input_path,
+        '-t', _formatear_segundos(duracion),
+        '-map', '0:v:0',
+        *(['-map', '0:a:0'] if con_audio else []),
+        '-c', 'copy',
+        '-f', 'mpegts',
+        salida
+    ]
+    ejecutar_ffmpeg(cmd)
+
+
+def concatenar_segmentos(segmentos: List[str], output_path: str, work_dir: str, audio_path: Optional[str] = None):
+    """
+    Une segmentos con el demuxer concat y copia de streams.
+    Si se indica audio_path, los segmentos aportan solo el video y el audio se toma de ese archivo.
+    """
+    lista_path = os.path.join(work_dir, 'concat.txt')
+    with open(lista_path, 'w', encoding='utf-8') as f:
+        for segmento in segmentos:
+            ruta = os.path.abspath(segmento).replace('\\', '/').replace("'", "'\\''")
+            f.write(f"file '{ruta}'\n")
+    cmd = [
+        'ffmpeg', '-y',
+        '-f', 'concat',
+        '-safe', '0',
+        '-i', lista_path,
+        *(['-i', audio_path, '-map', '0:v', '-map', '1:a'] if audio_path else ['-map', '0']),
+        '-c', 'copy',
+        output_path
+    ]
+    ejecutar_ffmpeg(cmd)
+
+
+def planificar_corte_smart(keyframes: List[float], inicio: float, fin: float) -> List[tuple]:
+    """
+    Divide [inicio, fin) en partes: ('encode', a, b) para los GOP parciales de los extremos
+    y ('copy', a, b) para el tramo entre el primer y el último keyframe del rango.
+    """
+    i = bisect_left(keyframes, inicio - _TOLERANCIA_KEYFRAME)
+    j = bisect_right(keyframes, fin + _TOLERANCIA_KEYFRAME) - 1
+    if i >= len(keyframes) or j < 0 or keyframes[i] >= keyframes[j]:
+        # No hay dos keyframes dentro del rango: todo el rango es un GOP parcial
+        return [('encode', inicio, fin)]
+
+    k_inicio = keyframes[i]
+    k_fin = keyframes[j]
+    partes = []
+    if k_inicio - inicio > _TOLERANCIA_KEYFRAME:
+        partes.append(('encode', inicio, k_inicio))
+    partes.append(('copy', k_inicio, k_fin))
+    if fin - k_fin > _TOLERANCIA_KEYFRAME:
+        partes.append(('encode', k_fin, fin))
+    return partes
+
+
+def _recortar_smart(input_path: str, inicio: float, fin: float, output_path: str):
+    keyframes = obtener_keyframes(input_path)
+    partes = planificar_corte_smart(keyframes, inicio, fin)
+    print(f"Plan de corte smart: {partes}")
+
+    encoder_args = _parametros_encoder(obtener_info_media(input_path))
+    # El tramo copiado debe llevar los mismos streams que los extremos recodificados
+    con_audio = '0:a:0' in encoder_args
+
+    work_dir = tempfile.mkdtemp(prefix='workx_smartcut_')
+    try:
+        segmentos = []
+        for idx, (tipo, a, b) in enumerate(partes):
+            segmento = os.path.join(work_dir, f"part{idx:03d}.ts")
+            if tipo == 'copy':
+                _segmento_copiado(input_path, a, b - a, con_audio, segmento)
+            else:
+                _segmento_recodificado(input_path, a, b - a, encoder_args, segmento)
+            segmentos.append(segmento)
+        concatenar_segmentos(segmentos, output_path, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def planificar_tramos(keyframes: List[float], inicio: float, fin: float, num_tramos: int) -> List[tuple]:
+    """
+    Divide [inicio, fin) en hasta num_tramos tramos de duración similar, con los cortes
+    internos ajustados al keyframe más cercano (así cada tramo decodifica desde su propio keyframe).
+    keyframes debe venir de obtener_keyframes (relativos al inicio del archivo): los cortes van
+    tal cual a -ss/-t, y con pts absolutos cada unión ganaría o perdería start_time segundos.
+
+    Returns:
+        Lista de (a, b) contiguos que cubren [inicio, fin)
+    """
+    duracion = fin - inicio
+    num_tramos = max(1, min(num_tramos, int(duracion // _TRAMO_MINIMO) or 1))
+    internos = [k for k in keyframes if inicio + _TOLERANCIA_KEYFRAME < k < fin - _TOLERANCIA_KEYFRAME]
+
+    cortes = [inicio]
+    for i in range(1, num_tramos):
+        ideal = inicio + duracion * i / num_tramos
+        idx = bisect_left(internos, ideal)
+        vecinos = internos[max(0, idx - 1):idx + 1]
+        if not vecinos:
+            break
+        corte = min(vecinos, key=lambda k: abs(k - ideal))
+        if corte - cortes[-1] >= _TRAMO_MINIMO / 2:
+            cortes.append(corte)
+    if fin - cortes[-1] < _TRAMO_MINIMO / 2 and len(cortes) > 1:
+        cortes.pop()  # último tramo demasiado corto: se une al anterior
+    cortes.append(fin)
+    return list(zip(cortes[:-1], cortes[1:]))
+
+
+def _tramo_video(input_path: str, inicio: float, duracion: float, video_args: List[str], hilos: int, salida: str):
+    """Recodifica solo el video de [inicio, inicio+duracion) con seek preciso."""
+    cmd = [
+        'ffmpeg', '-y',
+        '-ss', _formatear_segundos(inicio),
+        '-i', input_path,
+        '-t', _formatear_segundos(duracion),
+        '-map', '0:v:0',
+        *video_args,
+        '-threads', str(hilos),
+        '-an', '-sn', '-dn',
+        '-f', 'mpegts',
+        salida
+    ]
+    ejecutar_ffmpeg(cmd)
+
+
+def _tramo_audio(input_path: str, inicio: float, duracion: float, audio_args: List[str], salida: str):
+    """Recodifica el audio completo del tramo en un solo proceso (evita huecos de priming entre bloques)."""
+    cmd = [
+        'ffmpeg', '-y',
+        '-ss', _formatear_segundos(inicio),
+        '-i', input_path,
+        '-t', _formatear_segundos(duracion),
+        *audio_args,
+        '-vn', '-sn', '-dn',
+        '-f', 'mpegts',
+        salida
+    ]
+    ejecutar_ffmpeg(cmd)
+
+
+def recodificar_paralelo(input_path: str, output_path: str, inicio: float = 0.0, fin: Optional[float] = None,
+                         workers: Optional[int] = None, video_args: Optional[List[str]] = None) -> dict:
+    """
+    Recodifica [inicio, fin) repartiendo el video en tramos entre keyframes que se codifican
+    en procesos ffmpeg simultáneos, y une el resultado sin recodificar.
+
+    Args:
+        input_path: Ruta al video
+        output_path: Ruta de salida (el contenedor lo decide la extensión)
+        inicio: Segundo de inicio (exacto al frame)
+        fin: Segundo de fin; None = hasta el final
+        workers: Procesos ffmpeg simultáneos (por defecto, uno por núcleo)
+        video_args: Argumentos del encoder de video; por defecto reproduce el codec original
+                    (o H.264 si el codec original no tiene encoder equivalente)
+
+    Returns:
+        Diccionario con la salida, el número de tramos y workers usados
+    """
+    info = obtener_info_media(input_path)
+    streams = info.get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video'), None)
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+    if video is None:
+        raise ValueError("El archivo no tiene stream de video")
+
+    if fin is None:
+        fin = float(info.get('format', {}).get('duration') or 0)
+    if fin <= inicio:
+        raise ValueError("El tiempo de fin debe ser mayor que el de inicio")
+
+    cores = os.cpu_count() or 1
+    workers = max(1, workers or cores)
+    tramos = planificar_tramos(obtener_keyframes(input_path), inicio, fin, workers * _TRAMOS_POR_WORKER)
+    workers = min(workers, len(tramos))
+    # Repartir los núcleos entre los procesos simultáneos
+    hilos = max(1, cores // workers)
+    if video_args is None:
+        video_args = _parametros_video(video, encoder_defecto='libx264')
+    audio_args = _parametros_audio(audio)
+    if audio is not None and not audio_args:
+        audio_args = ['-map', '0:a:0', '-c:a', 'aac', '-b:a', '192k']
+
+    print(f"Recodificación paralela: {len(tramos)} tramos, {workers} workers x {hilos} hilos")
+
+    work_dir = tempfile.mkdtemp(prefix='workx_parallel_')
+    try:
+        segmentos = [os.path.join(work_dir, f"chunk{idx:04d}.ts") for idx in range(len(tramos))]
+        audio_path = os.path.join(work_dir, 'audio.ts') if audio_args else None
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = []
+            if audio_path:
+                futures.append(pool.submit(_tramo_audio, input_path, inicio, fin - inicio, audio_args, audio_path))
+            for (a, b), segmento in zip(tramos, segmentos):
+                futures.append(pool.submit(_tramo_video, input_path, a, b - a, video_args, hilos, segmento))
+            for future in futures:
+                future.result()
+        concatenar_segmentos(segmentos, output_path, work_dir, audio_path=audio_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {'output': output_path, 'chunks': len(tramos), 'workers': workers}
+
+
+def firma_codec(info: dict) -> tuple:
+    """
+    Parámetros que deben coincidir entre clips para poder unirlos con copia de streams.
+    """
+    streams = info.get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video'), {})
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), {})
+    return (
+        video.get('codec_name'), video.get('profile'), video.get('width'), video.get('height'),
+        video.get('pix_fmt'), video.get('r_frame_rate'),
+        bool(audio), audio.get('codec_name'), audio.get('sample_rate'), audio.get('channels'),
+    )
+
+
+def unir_videos(input_paths: List[str], output_path: str) -> dict:
+    """
+    Une clips en orden sin pérdida usando el demuxer concat (-c copy).
+    Los clips cuyos parámetros no coinciden con los de la mayoría se recodifican
+    (solo esos) para igualarlos antes de unir.
+    Devuelve la ruta de salida y los clips que hubo que recodificar.
+    """
+    if len(input_paths) < 2:
+        raise ValueError("Se necesitan al menos dos clips para unir")
+    for path in input_paths:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"El archivo {path} no existe")
+
+    infos = [obtener_info_media(path) for path in input_paths]
+    firmas = [firma_codec(info) for info in infos]
+    # La referencia es la firma más frecuente (a igualdad, la del primer clip)
+    referencia = max(firmas, key=lambda f: (firmas.count(f), -firmas.index(f)))
+    info_referencia = infos[firmas.index(referencia)]
+    distintos = [i for i, f in enumerate(firmas) if f != referencia]
+    print(f"Uniendo {len(input_paths)} clips ({len(distintos)} a recodificar)")
+
+    work_dir = tempfile.mkdtemp(prefix='workx_join_')
+    try:
+        if not distintos:
+            # Todos compatibles: concatenación directa de los originales
+            concatenar_segmentos(input_paths, output_path, work_dir)
+        else:
+            encoder_args = _parametros_encoder(info_referencia)
+            video_ref = next(s for s in info_referencia['streams'] if s.get('codec_type') == 'video')
+            con_audio = '0:a:0' in encoder_args
+            audio_ref = next((s for s in info_referencia['streams'] if s.get('codec_type') == 'audio'), {})
+            segmentos = []
+            for idx, path in enumerate(input_paths):
+                segmento = os.path.join(work_dir, f"clip{idx:03d}.ts")
+                if idx in distintos:
+                    tiene_audio = any(s.get('codec_type') == 'audio' for s in infos[idx].get('streams', []))
+                    if con_audio and not tiene_audio:
+                        # Clip sin audio: pista de silencio con el formato de la referencia
+                        # (si no, '-map 0:a:0' falla y el concat quedaría desalineado)
+                        layout = audio_ref.get('channel_layout') or f"{audio_ref.get('channels') or 2}c"
+                        silencio = f"anullsrc=r={audio_ref.get('sample_rate') or 48000}:cl={layout}"
+                        args = ['1:a' if arg == '0:a:0' else arg for arg in encoder_args]
+                        cmd = ['ffmpeg', '-y', '-i', path, '-f', 'lavfi', '-i', silencio, *args, '-shortest']
+                    else:
+                        cmd = ['ffmpeg', '-y', '-i', path, *encoder_args]
+                    # Igualar también la cadencia de frames de la referencia
+                    if video_ref.get('r_frame_rate'):
+                        cmd += ['-r', video_ref['r_frame_rate']]
+                    cmd += ['-f', 'mpegts', segmento]
+                else:
+                    # Remux sin recodificar a MPEG-TS para que los parámetros viajen en banda
+                    cmd = ['ffmpeg', '-y', '-i', path, '-map', '0:v:0',
+                           *(['-map', '0:a:0'] if con_audio else []),
+                           '-c', 'copy', '-f', 'mpegts', segmento]
+                ejecutar_ffmpeg(cmd)
+                segmentos.append(segmento)
+            concatenar_segmentos(segmentos, output_path, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'output': output_path,
+        'reencoded': [input_paths[i] for i in distintos],
+    }
+
+
+def calcular_escenas(input_path: str, progress: Optional[Callable[[float], None]] = None) -> List[list]:
+    """
+    Calcula la línea de tiempo de cambios de escena con el filtro 'scene' de ffmpeg.
+    Analiza el video reducido a 160 px de ancho, por lo que el costo es sobre todo de decodificación.
+
+    Args:
+        input_path: Ruta al video
+        progress: Callback opcional con la fracción procesada (0..1)
+
+    Returns:
+        Lista [[tiempo, score], ...] de los frames con score >= ESCENA_SCORE_MINIMO
+    """
+    try:
+        formato = obtener_info_media(input_path).get('format', {})
+        duracion = float(formato.get('duration') or 0)
+        inicio = float(formato.get('start_time') or 0)
+    except Exception:
+        duracion, inicio = 0.0, 0.0
+
+    cmd = [
+        'ffmpeg', '-hide_banner', '-nostats',
+        '-v', 'error',
+        '-i', input_path,
+        '-an', '-sn', '-dn',
+        '-vf', (
+            f"scale={_ESCENA_ANCHO_ANALISIS}:-2,"
+            f"select='gt(scene\\,{ESCENA_SCORE_MINIMO})',"
+            "metadata=print:file='pipe\\:1'"
+        ),
+        '-progress', 'pipe:2',
+        '-f', 'null', '-'
+    ]
+    proceso = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+    )
+
+    # stderr lleva el progreso (clave=valor) y los errores; se lee en paralelo a stdout
+    errores = []
+
+    def leer_stderr():
+        for linea in proceso.stderr:
+            clave, sep, valor = linea.strip().partition('=')
+            if not sep:
+                errores.append(linea)
+            elif clave == 'out_time_us' and progress and duracion > 0 and valor.isdigit():
+                progress(int(valor) / 1e6 / duracion)
+
+    hilo_stderr = threading.Thread(target=leer_stderr, daemon=True)
+    hilo_stderr.start()
+
+    escenas = []
+    tiempo = None
+    try:
+        for linea in proceso.stdout:
+            if linea.startswith('frame:'):
+                tiempo = None
+                for campo in linea.split():
+                    if campo.startswith('pts_time:'):
+                        try:
+                            tiempo = float(campo[len('pts_time:'):]) - inicio
+                        except ValueError:
+                            tiempo = None
+            elif linea.startswith('lavfi.scene_score=') and tiempo is not None:
+                escenas.append([round(max(0.0, tiempo), 3), round(float(linea.split('=', 1)[1]), 4)])
+        proceso.wait()
+        hilo_stderr.join(timeout=5)
+        if proceso.returncode != 0:
+            raise RuntimeError(f"ffmpeg falló calculando escenas: {''.join(errores).strip()}")
+    finally:
+        if proceso.poll() is None:
+            proceso.kill()
+
+    print(f"[VideoService] {len(escenas)} cambios de escena candidatos: {input_path}")
+    return escenas
+
+
+def obtener_escenas(input_path: str, progress: Optional[Callable[[float], None]] = None) -> List[list]:
     """
-    Recorta el video entre start y end sin recodificar (mantiene calidad y fps).
+    Devuelve el índice de escenas desde la caché de metadatos, calculándolo una sola vez por video.
+    """
+    return media_cache.get(input_path, 'scenes', lambda path: calcular_escenas(path, progress))
+
+
+def escenas_en_cache(input_path: str) -> Optional[List[list]]:
+    """
+    Devuelve el índice de escenas si ya está calculado (None si hay que calcularlo).
+    """
+    return media_cache.peek(input_path, 'scenes')
+
+
+def sugerir_puntos_corte(escenas: List[list], tiempo: Optional[float] = None, ventana: float = 10.0,
+                         umbral: float = 0.3, limite: int = 5) -> List[dict]:
+    """
+    Busca cambios de escena cercanos a un tiempo dado.
+
+    Args:
+        escenas: Índice [[tiempo, score], ...] ordenado por tiempo
+        tiempo: Segundo de referencia; si es None se devuelven todos los cortes sobre el umbral
+        ventana: Segundos a cada lado del tiempo de referencia
+        umbral: Score mínimo para considerar un cambio de escena
+        limite: Máximo de sugerencias (las de mayor score, y a igualdad las más cercanas)
+
+    Returns:
+        Lista de {'time', 'score', 'offset'} ordenada por tiempo
+    """
+    if tiempo is None:
+        return [{'time': t, 'score': sc, 'offset': None} for t, sc in escenas if sc >= umbral]
+
+    tiempos = [t for t, _ in escenas]
+    desde = bisect_left(tiempos, tiempo - ventana)
+    hasta = bisect_right(tiempos, tiempo + ventana)
+    candidatos = [(t, sc) for t, sc in escenas[desde:hasta] if sc >= umbral]
+    candidatos.sort(key=lambda c: (-c[1], abs(c[0] - tiempo)))
+    return sorted(
+        ({'time': t, 'score': sc, 'offset': round(t - tiempo, 3)} for t, sc in candidatos[:limite]),
+        key=lambda c: c['time']
+    )
+
+
+def recortar_varios(input_path: str, cortes: List[tuple], mode: str = MODO_COPY,
+                    al_terminar: Optional[Callable[[int, str], None]] = None) -> List[str]:
+    """
+    Recorta varios rangos de un mismo video con el mismo motor que recortar_video.
+    En modo 'copy' todos los rangos salen de un único ffmpeg con varias salidas, de modo que
+    el archivo de entrada se lee una sola vez; en los modos con recodificación se procesan en orden.
+
+    Args:
+        input_path: Ruta al video
+        cortes: Lista de (start, end, output_path)
+        mode: Modo de corte ('copy', 'smart' o 'reencode')
+        al_terminar: Callback opcional (índice, salida) al completar cada rango
+
+    Returns:
+        Lista de rutas de salida en el mismo orden que cortes
+    """
+    if mode != MODO_COPY:
+        salidas = []
+        for idx, (start, end, output_path) in enumerate(cortes):
+            salidas.append(recortar_video(input_path, start, end, output_path, mode=mode))
+            if al_terminar:
+                al_terminar(idx, salidas[-1])
+        return salidas
+
+    cmd = ['ffmpeg', '-y', '-i', input_path]
+    for start, end, output_path in cortes:
+        # Mismas opciones de salida que recortar_video en modo copy, una vez por rango
+        cmd += ['-ss', str(start), '-to', str(end), '-c', 'copy', output_path]
+    print(f"Recortando {len(cortes)} rangos de {input_path} en un solo ffmpeg")
+    ejecutar_ffmpeg(cmd)
+    salidas = [output_path for _, _, output_path in cortes]
+    if al_terminar:
+        for idx, salida in enumerate(salidas):
+            al_terminar(idx, salida)
+    return salidas
+
+
+def recortar_video(input_path, start, end, output_path=None, mode=MODO_COPY):
+    """
+    Recorta el video entre start y end.
+    - mode='copy': sin recodificar (mantiene calidad y fps); el inicio cae en un keyframe.
+    - mode='smart': corte exacto al frame, recodificando solo los extremos y copiando el resto.
+    - mode='reencode': corte exacto recodificando todo, en paralelo por tramos (usa todos los núcleos).
     Devuelve la ruta del archivo de salida.
     """
-    print(f"Recortando video desde {start} hasta {end}")
+    print(f"Recortando video desde {start} hasta {end} (modo {mode})")
     print(f"Input path: {input_path}")
     if output_path is None:
         output_path = generar_nombre_salida(input_path, start, end)
     print(f"Output path: {output_path}")
+
+    if mode == MODO_SMART:
+        inicio = tiempo_a_segundos(start)
+        fin = tiempo_a_segundos(end)
+        if fin <= inicio:
+            raise ValueError("El tiempo de fin debe ser mayor que el de inicio")
+        _recortar_smart(input_path, inicio, fin, output_path)
+        return output_path
+    if mode == MODO_REENCODE:
+        inicio = tiempo_a_segundos(start)
+        fin = tiempo_a_segundos(end)
+        if fin <= inicio:
+            raise ValueError("El tiempo de fin debe ser mayor que el de inicio")
+        recodificar_paralelo(input_path, output_path, inicio, fin)
+        return output_path
+    if mode != MODO_COPY:
+        raise ValueError(f"Modo de corte no soportado: {mode}")
+
     cmd = [
         'ffmpeg',
         '-y',              # sobrescribe si existe
@@ -47,4 +680,4 @@ def recortar_video(input_path, start, end, output_path=None):
     except FileNotFoundError:
         print("Error: Comando 'ffmpeg' no encontrado. Asegúrate de que esté instalado y en el PATH.", file=sys.stderr)
         raise # O manejar el error
-    return output_path 
\ No newline at end of file
+    return output_path
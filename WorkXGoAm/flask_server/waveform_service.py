@@ -0,0 +1,218 @@
+"""
+Waveform Service - Genera datos de picos de audio (min/max) para dibujar formas de onda
+"""
+
+import os
+import json
+import struct
+import hashlib
+import subprocess
+import threading
+from functools import cached_property
+from typing import Optional, List
+
+import numpy as np
+
+from media_cache import file_fingerprint, get_cache_dir
+
+
+class WaveformService:
+    """
+    Genera archivos binarios de picos en varios niveles de zoom para videos y WAVs.
+    - ffmpeg decodifica el audio una sola vez a PCM mono de baja frecuencia por un pipe.
+    - Los picos min/max por bucket se calculan vectorizados con NumPy sobre bloques fijos,
+      de modo que la memoria es constante aunque el archivo dure varias horas.
+
+    Formato del archivo (little endian):
+        cabecera: b'WXPK', version u16, bits u8, num_niveles u8, sample_rate u32
+        por nivel: samples_per_peak u32, num_picos u32
+        datos: por nivel, pares (min, max) intercalados en int8 o int16
+    """
+
+    MAGIC = b'WXPK'
+    VERSION = 1
+    SAMPLE_RATE = 8000          # Hz del PCM intermedio (suficiente para una forma de onda)
+    BASE_SAMPLES_PER_PEAK = 80  # 100 picos por segundo en el nivel más detallado
+    ZOOM_FACTORS = (1, 4, 16, 64, 256)
+    READ_BLOCK_PEAKS = 4096     # picos base por lectura del pipe (~41 s de audio)
+
+    def __init__(self):
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    @cached_property
+    def _cache_dir(self) -> str:
+        return get_cache_dir('waveforms')
+
+    def _get_lock(self, key: str) -> threading.Lock:
+        with self._locks_lock:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def get_peaks_path(self, key: str) -> Optional[str]:
+        """Retorna la ruta de un archivo de picos ya generado."""
+        if not key or not all(c in '0123456789abcdef' for c in key):
+            return None
+        path = os.path.join(self._cache_dir, f"{key}.peaks")
+        return path if os.path.exists(path) else None
+
+    def get_waveform(self, input_path: str, bits: int = 8) -> dict:
+        """
+        Devuelve los metadatos del archivo de picos de un audio/video, generándolo si no existe.
+
+        Args:
+            input_path: Ruta al video o WAV
+            bits: 8 (int8, más compacto) o 16 (int16, más precisión)
+
+        Returns:
+            Diccionario con la clave del archivo de picos y la descripción de cada nivel
+        """
+        if bits not in (8, 16):
+            raise ValueError("bits debe ser 8 o 16")
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"El archivo {input_path} no existe")
+
+        key = hashlib.sha1(f"{file_fingerprint(input_path)}|{bits}|{self.VERSION}".encode('utf-8')).hexdigest()
+        peaks_path = os.path.join(self._cache_dir, f"{key}.peaks")
+        meta_path = os.path.join(self._cache_dir, f"{key}.json")
+
+        with self._get_lock(key):
+            if not (os.path.exists(peaks_path) and os.path.exists(meta_path)):
+                levels = self._generate(input_path, peaks_path, bits)
+                meta = {
+                    'key': key,
+                    'bits': bits,
+                    'sample_rate': self.SAMPLE_RATE,
+                    'levels': levels,
+                }
+                with open(meta_path, 'w', encoding='utf-8') as f:
+                    json.dump(meta, f)
+                return meta
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+    def _generate(self, input_path: str, peaks_path: str, bits: int) -> List[dict]:
+        cmd = [
+            'ffmpeg',
+            '-v', 'error',
+            '-i', input_path,
+            '-vn', '-sn', '-dn',
+            '-ac', '1',
+            '-ar', str(self.SAMPLE_RATE),
+            '-f', 's16le',
+            '-'
+        ]
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+        )
+
+        dtype = np.int8 if bits == 8 else np.int16
+        tmp_paths = [f"{peaks_path}.{i}.{os.getpid()}.tmp" for i in range(len(self.ZOOM_FACTORS))]
+        level_files = [open(p, 'wb') for p in tmp_paths]
+        counts = [0] * len(self.ZOOM_FACTORS)
+        # Restos por nivel: picos base (min, max) que aún no completan un bucket del nivel
+        carry_min = [np.empty(0, dtype=np.int16) for _ in self.ZOOM_FACTORS]
+        carry_max = [np.empty(0, dtype=np.int16) for _ in self.ZOOM_FACTORS]
+        pcm_carry = b''
+        block_bytes = self.READ_BLOCK_PEAKS * self.BASE_SAMPLES_PER_PEAK * 2
+
+        def emit(mins: np.ndarray, maxs: np.ndarray, final: bool = False):
+            for level, factor in enumerate(self.ZOOM_FACTORS):
+                lmin = np.concatenate((carry_min[level], mins))
+                lmax = np.concatenate((carry_max[level], maxs))
+                full = (len(lmin) // factor) * factor
+                if final and full < len(lmin):
+                    full = len(lmin)  # último bucket incompleto
+                    pad = (-full) % factor
+                    lmin = np.concatenate((lmin, np.full(pad, lmin[-1], dtype=np.int16)))
+                    lmax = np.concatenate((lmax, np.full(pad, lmax[-1], dtype=np.int16)))
+                    full += pad
+                out_min = lmin[:full].reshape(-1, factor).min(axis=1)
+                out_max = lmax[:full].reshape(-1, factor).max(axis=1)
+                carry_min[level] = lmin[full:]
+                carry_max[level] = lmax[full:]
+                if len(out_min):
+                    self._write_pairs(level_files[level], out_min, out_max, dtype)
+                    counts[level] += len(out_min)
+
+        try:
+            while True:
+                chunk = process.stdout.read(block_bytes)
+                if not chunk:
+                    break
+                data = pcm_carry + chunk
+                usable = (len(data) // (self.BASE_SAMPLES_PER_PEAK * 2)) * self.BASE_SAMPLES_PER_PEAK * 2
+                pcm_carry = data[usable:]
+                if usable == 0:
+                    continue
+                samples = np.frombuffer(data[:usable], dtype='<i2').reshape(-1, self.BASE_SAMPLES_PER_PEAK)
+                emit(samples.min(axis=1), samples.max(axis=1))
+
+            # Último bucket base incompleto
+            if len(pcm_carry) >= 2:
+                samples = np.frombuffer(pcm_carry[:len(pcm_carry) // 2 * 2], dtype='<i2')
+                emit(np.array([samples.min()], dtype=np.int16), np.array([samples.max()], dtype=np.int16), final=True)
+            else:
+                emit(np.empty(0, dtype=np.int16), np.empty(0, dtype=np.int16), final=True)
+
+            stderr = process.stderr.read()
+            if process.wait() != 0:
+                raise RuntimeError(f"ffmpeg falló extrayendo audio: {stderr.decode('utf-8', 'replace').strip()}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+            for f in level_files:
+                f.close()
+
+        try:
+            levels = []
+            tmp_out = f"{peaks_path}.{os.getpid()}.tmp"
+            with open(tmp_out, 'wb') as out:
+                out.write(self.MAGIC)
+                out.write(struct.pack('<HBBI', self.VERSION, bits, len(self.ZOOM_FACTORS), self.SAMPLE_RATE))
+                for factor, count in zip(self.ZOOM_FACTORS, counts):
+                    out.write(struct.pack('<II', self.BASE_SAMPLES_PER_PEAK * factor, count))
+                offset = out.tell()
+                for factor, count, tmp_path in zip(self.ZOOM_FACTORS, counts, tmp_paths):
+                    with open(tmp_path, 'rb') as src:
+                        while True:
+                            buf = src.read(1 << 20)
+                            if not buf:
+                                break
+                            out.write(buf)
+                    levels.append({
+                        'samples_per_peak': self.BASE_SAMPLES_PER_PEAK * factor,
+                        'peaks_per_second': self.SAMPLE_RATE / (self.BASE_SAMPLES_PER_PEAK * factor),
+                        'count': count,
+                        'offset': offset,
+                    })
+                    offset += count * 2 * (bits // 8)
+            os.replace(tmp_out, peaks_path)
+        finally:
+            for tmp_path in tmp_paths:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+        print(f"[WaveformService] Picos generados ({counts[0]} en nivel base): {input_path}")
+        return levels
+
+    @staticmethod
+    def _write_pairs(f, mins: np.ndarray, maxs: np.ndarray, dtype):
+        if dtype == np.int8:
+            # int16 -> int8 conservando el signo (división entera por 256)
+            mins = (mins >> 8).astype(np.int8)
+            maxs = (maxs >> 8).astype(np.int8)
+        pairs = np.empty(len(mins) * 2, dtype=dtype)
+        pairs[0::2] = mins
+        pairs[1::2] = maxs
+        f.write(pairs.astype(np.dtype(dtype).newbyteorder('<'), copy=False).tobytes())
+
+
+# Instancia global del servicio
+waveform_service = WaveformService()
@@ -0,0 +1,100 @@
+"""
+WSGI Server - Sirve la app Flask con waitress (producción) o con el servidor de desarrollo de Werkzeug
+"""
+
+import os
+import socket
+import argparse
+from dataclasses import dataclass
+from typing import Callable
+
+try:
+    import waitress
+except ImportError:
+    waitress = None
+
+
+SERVER_WAITRESS = 'waitress'
+SERVER_DEV = 'dev'
+
+
+@dataclass
+class ServerConfig:
+    """
+    Parámetros del servidor. Cada feed MJPEG ocupa un hilo mientras está abierto, así que
+    'threads' debe cubrir los visores simultáneos más las peticiones normales (polling UI, cortes).
+    """
+    server: str = SERVER_WAITRESS
+    threads: int = 32              # hilos de trabajo de waitress
+    connection_limit: int = 200    # conexiones simultáneas aceptadas
+    channel_timeout: int = 120     # segundos de inactividad antes de cerrar una conexión (incluye keep-alive)
+    cleanup_interval: int = 30     # cada cuánto se revisan las conexiones inactivas
+    backlog: int = 1024            # cola de conexiones pendientes del socket
+
+
+def add_server_arguments(parser: argparse.ArgumentParser):
+    """Agrega las opciones del servidor a un parser (valores por defecto desde variables WORKX_*)."""
+    defaults = ServerConfig()
+    parser.add_argument('--server', choices=[SERVER_WAITRESS, SERVER_DEV],
+                        default=os.environ.get('WORKX_SERVER', defaults.server),
+                        help="Servidor WSGI: waitress (producción) o dev (Werkzeug, solo desarrollo)")
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('WORKX_THREADS', defaults.threads)),
+                        help="Hilos de trabajo (cada visor MJPEG ocupa uno)")
+    parser.add_argument('--connection-limit', type=int,
+                        default=int(os.environ.get('WORKX_CONNECTION_LIMIT', defaults.connection_limit)),
+                        help="Conexiones simultáneas máximas")
+    parser.add_argument('--channel-timeout', type=int,
+                        default=int(os.environ.get('WORKX_CHANNEL_TIMEOUT', defaults.channel_timeout)),
+                        help="Segundos de inactividad antes de cerrar una conexión keep-alive")
+
+
+def config_from_args(args: argparse.Namespace) -> ServerConfig:
+    return ServerConfig(
+        server=args.server,
+        threads=args.threads,
+        connection_limit=args.connection_limit,
+        channel_timeout=args.channel_timeout,
+    )
+
+
+def serve(app, sock: socket.socket, config: ServerConfig = None, on_listening: Callable[[], None] = None):
+    """
+    Sirve la app en un socket ya abierto (ver connection.bind_server_socket), bloqueando el hilo actual.
+    El socket se usa tal cual: no hay un segundo bind en el que otro proceso pueda quitarnos el puerto.
+    Si waitress no está instalado se usa el servidor de desarrollo de Werkzeug como respaldo.
+
+    Args:
+        on_listening: Se llama con el servidor listo, antes de atender peticiones
+    """
+    config = config or ServerConfig()
+    host, port = sock.getsockname()[:2]
+    if config.server == SERVER_WAITRESS and waitress is None:
+        print("[WSGIServer] waitress no está instalado, usando el servidor de desarrollo")
+        config.server = SERVER_DEV
+
+    if config.server == SERVER_DEV:
+        from werkzeug.serving import make_server
+        print(f"[WSGIServer] Servidor de desarrollo en {host}:{port}")
+        server = make_server(host, port, app, threaded=True, fd=sock.fileno())
+        if on_listening:
+            on_listening()
+        server.serve_forever()
+        return
+
+    server = waitress.create_server(
+        app,
+        sockets=[sock],
+        threads=config.threads,
+        connection_limit=config.connection_limit,
+        channel_timeout=config.channel_timeout,
+        cleanup_interval=config.cleanup_interval,
+        backlog=config.backlog,
+        asyncore_use_poll=True,   # select() en Windows está limitado a 512 sockets
+        ident='WorkXFlaskServer',
+    )
+    print(f"[WSGIServer] waitress en {host}:{port} "
+          f"(threads={config.threads}, connection_limit={config.connection_limit}, "
+          f"channel_timeout={config.channel_timeout}s)")
+    if on_listening:
+        on_listening()
+    server.run()
@@ -5,13 +5,15 @@ from datetime import datetime
 from typing import Optional, List, Dict, Tuple, Union
 import openai
 from dotenv import load_dotenv
-from pydub import AudioSegment
-from pydub.silence import detect_nonsilent
-import tempfile
 import concurrent.futures
 import time
 import re
 
+# Módulos del servidor Flask (caché de metadatos, índice de transcripciones)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'flask_server'))
+
+from audio_asset import AudioAsset
+
 # Cargar variables de entorno (para la API key)
 load_dotenv()
 
@@ -31,14 +33,25 @@ class AudioTranscriber:
     SILENCE_THRESHOLD = -50  # dBFS (menos exigente para detectar sonido)
     MIN_AUDIO_LENGTH = 0.5  # Duración mínima en segundos
     MIN_TRANSCRIPTION_LENGTH = 5  # Caracteres mínimos para considerar una transcripción válida
+
+    # Constantes para audio largo (transcripción por fragmentos, ver long_audio.py)
+    LONG_AUDIO_SECONDS = 600  # Un WAV más largo se transcribe por fragmentos
+    API_LIMIT_MB = 24  # Límite de la API: 25 MB (se deja margen); otros formatos más grandes van por fragmentos
+    LONG_AUDIO_WORKERS = 4  # Fragmentos transcritos a la vez por cada modelo
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, client: Optional[openai.OpenAI] = None):
         """
         Inicializa el transcriptor de audio.
         
         Args:
             api_key: API key de OpenAI. Si no se proporciona, se intentará cargar de las variables de entorno.
+            client: Cliente de OpenAI ya creado (p. ej. compartido por el servidor, con su pool de conexiones).
         """
+        if client is not None:
+            self.api_key = client.api_key
+            self.client = client
+            return
+
         # Usar la API key proporcionada o intentar cargarla de las variables de entorno
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         if not self.api_key:
@@ -46,6 +59,20 @@ class AudioTranscriber:
         
         # Inicializar cliente de OpenAI
         self.client = openai.OpenAI(api_key=self.api_key)
+
+    def audio_asset(self, audio_file: Union[str, AudioAsset]) -> AudioAsset:
+        """
+        Envuelve una ruta en un AudioAsset con los umbrales de silencio de esta clase.
+        Pasar el mismo asset por todo el proceso evita decodificar el archivo más de una vez.
+        """
+        if isinstance(audio_file, AudioAsset):
+            return audio_file
+        return AudioAsset(
+            audio_file,
+            silence_threshold=self.SILENCE_THRESHOLD,
+            min_silence_len=self.MIN_SILENCE_LENGTH,
+            min_audio_length=self.MIN_AUDIO_LENGTH
+        )
     
     def find_most_recent_wav(self, directory: str) -> Optional[str]:
         """
@@ -76,93 +103,151 @@ class AudioTranscriber:
         
         return wav_files[0][0]
     
-    def convert_wav_to_mp3(self, wav_file: str) -> str:
+    def convert_wav_to_mp3(self, wav_file: Union[str, AudioAsset]) -> str:
         """
-        Convierte un archivo WAV a MP3 para mejor compatibilidad con la API.
+        Convierte un archivo WAV a MP3 en disco (la transcripción ya no lo necesita:
+        AudioAsset codifica en memoria los bytes a subir).
         
         Args:
-            wav_file: Ruta al archivo WAV.
+            wav_file: Ruta al archivo WAV o su AudioAsset.
             
         Returns:
-            Ruta al archivo MP3 temporal convertido.
+            Ruta al archivo MP3 convertido.
         """
+        asset = self.audio_asset(wav_file)
         # Guardar el archivo MP3 en el mismo directorio que el WAV original
-        dir_name = os.path.dirname(wav_file)
-        base_name = os.path.splitext(os.path.basename(wav_file))[0]
+        dir_name = os.path.dirname(asset.path)
+        base_name = os.path.splitext(os.path.basename(asset.path))[0]
         mp3_file = os.path.join(dir_name, f"{base_name}.mp3")
         
-        # Cargar el archivo WAV
-        audio = AudioSegment.from_wav(wav_file)
-        
-        # Exportar como MP3 con buena calidad
-        audio.export(mp3_file, format="mp3", bitrate="192k")
+        # Exportar como MP3 con buena calidad (reutiliza el audio ya decodificado)
+        asset.audio.export(mp3_file, format="mp3", bitrate="192k")
         
         return mp3_file
     
-    def get_audio_info(self, audio_file: str) -> dict:
+    def get_audio_info(self, audio_file: Union[str, AudioAsset]) -> dict:
         """
         Obtiene información sobre un archivo de audio.
         
         Args:
-            audio_file: Ruta al archivo de audio.
+            audio_file: Ruta al archivo de audio o su AudioAsset.
             
         Returns:
             Diccionario con información del archivo.
         """
-        if audio_file.lower().endswith('.wav'):
-            audio = AudioSegment.from_wav(audio_file)
-        elif audio_file.lower().endswith('.mp3'):
-            audio = AudioSegment.from_mp3(audio_file)
-        else:
+        asset = self.audio_asset(audio_file)
+        if not (asset.is_wav or asset.is_mp3):
             return {"error": "Formato no soportado"}
-        
-        # Calcular tamaño en MB
-        file_size_mb = os.path.getsize(audio_file) / (1024 * 1024)
-        
-        return {
-            "duración_segundos": len(audio) / 1000,
-            "canales": audio.channels,
-            "sample_width": audio.sample_width,
-            "frame_rate": audio.frame_rate,
-            "tamaño_mb": round(file_size_mb, 2)
-        }
+        # Cabecera WAV / ffprobe desde la caché de metadatos; solo decodifica si no hay otra forma
+        return asset.info()
     
-    def is_silent_audio(self, audio_file: str) -> bool:
+    def is_silent_audio(self, audio_file: Union[str, AudioAsset]) -> bool:
         """
         Determina si un archivo de audio contiene principalmente silencio.
         
         Args:
-            audio_file: Ruta al archivo de audio.
+            audio_file: Ruta al archivo de audio o su AudioAsset (el veredicto queda guardado en él).
             
         Returns:
             True si el audio es principalmente silencio, False en caso contrario.
         """
-        try:
-            # Cargar el audio según el formato
-            if audio_file.lower().endswith('.wav'):
-                audio = AudioSegment.from_wav(audio_file)
-            elif audio_file.lower().endswith('.mp3'):
-                audio = AudioSegment.from_mp3(audio_file)
-            else:
-                return False  # No podemos determinar si es silencio para formatos no soportados
+        return self.audio_asset(audio_file).is_silent()
+    
+    def is_long_audio(self, audio_file: Union[str, AudioAsset]) -> bool:
+        """
+        Determina si un archivo debe transcribirse por fragmentos.
+        
+        Args:
+            audio_file: Ruta al archivo de audio o su AudioAsset.
             
-            # Verificar duración mínima
-            if len(audio) / 1000 < self.MIN_AUDIO_LENGTH:
-                return True
+        Returns:
+            True si es un WAV de más de LONG_AUDIO_SECONDS o un archivo que supera el límite de la API.
+        """
+        asset = self.audio_asset(audio_file)
+        audio_info = self.get_audio_info(asset)
+        if "error" in audio_info:
+            return os.path.getsize(asset.path) / (1024 * 1024) > self.API_LIMIT_MB
+        if asset.is_wav:
+            return audio_info["duración_segundos"] > self.LONG_AUDIO_SECONDS
+        return audio_info["tamaño_mb"] > self.API_LIMIT_MB
+    
+    def should_check_silence(self, audio_file: Union[str, AudioAsset]) -> bool:
+        """
+        Determina si conviene comprobar el silencio antes de transcribir.
+        
+        Args:
+            audio_file: Ruta al archivo de audio o su AudioAsset.
             
-            # Detectar partes no silenciosas
-            non_silent_parts = detect_nonsilent(
-                audio, 
-                min_silence_len=self.MIN_SILENCE_LENGTH,
-                silence_thresh=self.SILENCE_THRESHOLD
-            )
+        Returns:
+            False para un archivo largo que no es WAV: pydub lo decodificaría entero (~600 MB por hora)
+            y la transcripción por fragmentos ya omite los tramos en silencio (ffmpeg silencedetect).
+        """
+        asset = self.audio_asset(audio_file)
+        return asset.is_wav or not self.is_long_audio(asset)
+    
+    def transcribe_long_audio(self,
+                              audio_file: Union[str, AudioAsset],
+                              language: Optional[str] = None,
+                              prompt: Optional[str] = None,
+                              model: Optional[str] = None,
+                              verbose: bool = False) -> str:
+        """
+        Transcribe un archivo largo por fragmentos cortados en pausas, en paralelo y con memoria acotada.
+        
+        Args:
+            audio_file: Ruta al archivo de audio o su AudioAsset.
+            language: Código de idioma opcional para mejorar la transcripción.
+            prompt: Texto opcional para guiar la transcripción (solo GPT-4o Mini Transcribe).
+            model: Modelo de transcripción a utilizar.
+            verbose: Si se deben mostrar mensajes de progreso.
             
-            # Si se detecta al menos un fragmento no silencioso, no es silencio
-            return not non_silent_parts
+        Returns:
+            Texto de todos los fragmentos en orden (una línea por segmento) o etiqueta de silencio.
+        """
+        from long_audio import LongAudioTranscriber
+        
+        asset = self.audio_asset(audio_file)
+        long_transcriber = LongAudioTranscriber(self, max_workers=self.LONG_AUDIO_WORKERS)
+        segments = long_transcriber.transcribe(asset.path, model, language=language, prompt=prompt, verbose=verbose)
+        text = long_transcriber.to_text(segments)
+        if self.is_empty_transcription(text):
+            return self.SILENCE_TAG
+        return text
+
+    def transcribe_long_audio_models(self,
+                                     audio_file: Union[str, AudioAsset],
+                                     models: List[str],
+                                     language: Optional[str] = None,
+                                     prompt: Optional[str] = None,
+                                     verbose: bool = False) -> Dict[str, str]:
+        """
+        Transcribe un archivo largo con varios modelos en una sola pasada: el archivo se planifica y
+        cada fragmento se codifica una vez; los mismos bytes se envían a todos los modelos.
+        
+        Args:
+            audio_file: Ruta al archivo de audio o su AudioAsset.
+            models: Modelos de transcripción a utilizar.
+            language: Código de idioma opcional para mejorar la transcripción.
+            prompt: Texto opcional para guiar la transcripción (solo GPT-4o Mini Transcribe).
+            verbose: Si se deben mostrar mensajes de progreso.
             
-        except Exception as e:
-            # Si hay un error, asumimos que no es silencio para evitar falsos positivos
-            return False
+        Returns:
+            Diccionario modelo -> texto, etiqueta de silencio o "ERROR: ..." si alguno de sus fragmentos falló.
+        """
+        from long_audio import LongAudioTranscriber
+        
+        asset = self.audio_asset(audio_file)
+        long_transcriber = LongAudioTranscriber(self, max_workers=self.LONG_AUDIO_WORKERS)
+        results = long_transcriber.transcribe_models(asset.path, models, language=language, prompt=prompt,
+                                                     verbose=verbose)
+        texts = {}
+        for model, segments in results.items():
+            if isinstance(segments, Exception):
+                texts[model] = f"ERROR: Error al transcribir el audio largo con modelo {model}: {str(segments)}"
+                continue
+            text = long_transcriber.to_text(segments)
+            texts[model] = self.SILENCE_TAG if self.is_empty_transcription(text) else text
+        return texts
     
     def is_empty_transcription(self, text: str) -> bool:
         """
@@ -202,7 +287,7 @@ class AudioTranscriber:
         return False
     
     def transcribe_audio(self, 
-                         audio_file: str, 
+                         audio_file: Union[str, AudioAsset], 
                          language: Optional[str] = None,
                          prompt: Optional[str] = None,
                          model: Optional[str] = None) -> str:
@@ -210,7 +295,7 @@ class AudioTranscriber:
         Transcribe un archivo de audio utilizando el modelo especificado.
         
         Args:
-            audio_file: Ruta al archivo de audio.
+            audio_file: Ruta al archivo de audio o su AudioAsset (un WAV se sube codificado a Opus 16 kHz mono en memoria).
             language: Código de idioma opcional para mejorar la transcripción.
             prompt: Texto opcional para guiar la transcripción y mejorar la precisión.
             model: Modelo de transcripción a utilizar.
@@ -218,53 +303,60 @@ class AudioTranscriber:
         Returns:
             Texto transcrito del audio o etiqueta de silencio.
         """
-        if not os.path.exists(audio_file):
-            raise FileNotFoundError(f"El archivo {audio_file} no existe")
+        asset = self.audio_asset(audio_file)
+        if not os.path.exists(asset.path):
+            raise FileNotFoundError(f"El archivo {asset.path} no existe")
         
-        # Verificar si el audio es silencio
-        if self.is_silent_audio(audio_file):
+        # Verificar si el audio es silencio (salvo audio largo comprimido)
+        if self.should_check_silence(asset) and asset.is_silent():
             return self.SILENCE_TAG
         
+        # Audio largo: por fragmentos en lugar de subir el archivo entero
+        if self.is_long_audio(asset):
+            try:
+                return self.transcribe_long_audio(asset, language=language, prompt=prompt, model=model)
+            except Exception as e:
+                raise Exception(f"Error al transcribir el audio largo con modelo {model}: {str(e)}")
+        
         try:
-            with open(audio_file, "rb") as file_obj:
-                # Preparar los parámetros para la transcripción
-                params = {
-                    "model": model,
-                    "file": file_obj,
-                    "response_format": "text"
-                }
-                
-                # Añadir parámetros opcionales según el modelo
-                if language:
-                    params["language"] = language
-                
-                # Añadir prompt SOLO si es GPT-4o Mini Transcribe
-                if prompt and model == self.GPT4O_MINI_TRANSCRIBE:
-                    params["prompt"] = prompt
-                
-                # Realizar la transcripción
-                transcript = self.client.audio.transcriptions.create(**params)
-                
-                # Manejar la respuesta
-                if hasattr(transcript, 'text'):
-                    transcription_text = transcript.text
-                elif isinstance(transcript, str):
-                    transcription_text = transcript
-                else:
-                    # Intentar convertir a string como último recurso
-                    transcription_text = str(transcript)
+            # Preparar los parámetros para la transcripción
+            params = {
+                "model": model,
+                "file": asset.upload_file(),
+                "response_format": "text"
+            }
+            
+            # Añadir parámetros opcionales según el modelo
+            if language:
+                params["language"] = language
+            
+            # Añadir prompt SOLO si es GPT-4o Mini Transcribe
+            if prompt and model == self.GPT4O_MINI_TRANSCRIBE:
+                params["prompt"] = prompt
+            
+            # Realizar la transcripción
+            transcript = self.client.audio.transcriptions.create(**params)
+            
+            # Manejar la respuesta
+            if hasattr(transcript, 'text'):
+                transcription_text = transcript.text
+            elif isinstance(transcript, str):
+                transcription_text = transcript
+            else:
+                # Intentar convertir a string como último recurso
+                transcription_text = str(transcript)
+            
+            # Verificar si la transcripción está vacía o solo contiene ruido
+            if self.is_empty_transcription(transcription_text):
+                return self.SILENCE_TAG
                 
-                # Verificar si la transcripción está vacía o solo contiene ruido
-                if self.is_empty_transcription(transcription_text):
-                    return self.SILENCE_TAG
-                    
-                return transcription_text
+            return transcription_text
                 
         except Exception as e:
             raise Exception(f"Error al transcribir el audio con modelo {model}: {str(e)}")
     
     def _transcribe_with_model(self, 
-                             audio_file: str, 
+                             audio_file: Union[str, AudioAsset], 
                              model: str,
                              language: Optional[str] = None,
                              prompt: Optional[str] = None) -> Tuple[str, str]:
@@ -297,7 +389,7 @@ class AudioTranscriber:
             return model, error_msg
     
     def transcribe_with_all_models(self, 
-                                 audio_file: str, 
+                                 audio_file: Union[str, AudioAsset], 
                                  language: Optional[str] = None,
                                  prompt: Optional[str] = None,
                                  verbose: bool = False) -> Dict[str, str]:
@@ -305,7 +397,7 @@ class AudioTranscriber:
         Transcribe un archivo de audio utilizando todos los modelos disponibles en paralelo.
         
         Args:
-            audio_file: Ruta al archivo de audio.
+            audio_file: Ruta al archivo de audio o su AudioAsset.
             language: Código de idioma opcional para mejorar la transcripción.
             prompt: Texto opcional para guiar la transcripción y mejorar la precisión.
             verbose: Si se deben mostrar mensajes de progreso.
@@ -313,8 +405,11 @@ class AudioTranscriber:
         Returns:
             Diccionario con los resultados de cada modelo.
         """
-        # Verificar si el audio es silencio antes de intentar transcribir
-        if self.is_silent_audio(audio_file):
+        # Un solo asset para las comprobaciones y todos los hilos: se decodifica y codifica una vez
+        audio_file = self.audio_asset(audio_file)
+
+        # Verificar si el audio es silencio antes de intentar transcribir (salvo audio largo comprimido)
+        if self.should_check_silence(audio_file) and self.is_silent_audio(audio_file):
             if verbose:
                 print("Archivo detectado como silencio, omitiendo transcripción")
             return {
@@ -328,9 +423,11 @@ class AudioTranscriber:
         # for key, value in audio_info.items():
         #     print(f"- {key}: {value}")
         
-        # Verificar tamaño para advertir sobre posibles problemas
-        if audio_info["tamaño_mb"] > 24:
-            print("⚠️ ADVERTENCIA: El archivo supera los 24 MB (límite API: 25 MB)")
+        # Audio largo o por encima del límite de la API: se transcribe por fragmentos
+        is_long = self.is_long_audio(audio_file)
+        if verbose and is_long:
+            print(f"Audio largo ({audio_info.get('duración_segundos', 0):.0f}s, {audio_info.get('tamaño_mb', 0)} MB): "
+                  f"transcripción por fragmentos ({self.LONG_AUDIO_WORKERS} a la vez, los mismos para cada modelo)")
         
         start_time = time.time()
         
@@ -341,35 +438,48 @@ class AudioTranscriber:
         models = [self.GPT4O_MINI_TRANSCRIBE, self.WHISPER_1]
         results = {}
         
-        # Usar ThreadPoolExecutor para ejecutar las transcripciones en paralelo
-        with concurrent.futures.ThreadPoolExecutor(max_workers=len(models)) as executor:
-            # Crear un futuro para cada modelo
-            futures = {
-                executor.submit(
-                    self._transcribe_with_model, 
-                    audio_file, 
-                    model, 
-                    language, 
-                    prompt
-                ): model for model in models
-            }
+        if is_long:
+            # Un solo plan y una sola codificación por fragmento; los mismos bytes van a ambos modelos
+            try:
+                results = self.transcribe_long_audio_models(audio_file, models, language=language,
+                                                            prompt=prompt, verbose=verbose)
+            except Exception as e:
+                results = {model: f"ERROR: {str(e)}" for model in models}
+        else:
+            # Usar ThreadPoolExecutor para ejecutar las transcripciones en paralelo
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(models)) as executor:
+                # Crear un futuro para cada modelo
+                futures = {
+                    executor.submit(
+                        self._transcribe_with_model, 
+                        audio_file, 
+                        model, 
+                        language, 
+                        prompt
+                    ): model for model in models
+                }
             
-            # Procesar los resultados a medida que se completen
-            for future in concurrent.futures.as_completed(futures):
-                model = futures[future]
-                try:
-                    model_name, result = future.result()
-                    results[model_name] = result
-                    if verbose:
-                        print(f"✓ Transcripción completada: {model_name} ({time.time() - start_time:.2f}s)")
-                except Exception as e:
-                    results[model] = f"ERROR: {str(e)}"
-                    if verbose:
-                        print(f"✗ Error en transcripción {model}: {str(e)}")
+                # Procesar los resultados a medida que se completen
+                for future in concurrent.futures.as_completed(futures):
+                    model = futures[future]
+                    try:
+                        model_name, result = future.result()
+                        results[model_name] = result
+                        if verbose:
+                            print(f"✓ Transcripción completada: {model_name} ({time.time() - start_time:.2f}s)")
+                    except Exception as e:
+                        results[model] = f"ERROR: {str(e)}"
+                        if verbose:
+                            print(f"✗ Error en transcripción {model}: {str(e)}")
         
         if verbose:
             print(f"Todas las transcripciones completadas en {time.time() - start_time:.2f} segundos")
         
+        # Si ningún modelo pudo transcribir no hay resultado: fallar en lugar de devolver errores como texto
+        errors = [result for result in results.values() if result.startswith("ERROR:")]
+        if len(errors) == len(models):
+            raise Exception(f"Ningún modelo pudo transcribir el audio: {errors[0]}")
+        
         # Verificar si ambos modelos detectaron silencio
         silence_count = sum(1 for result in results.values() if result == self.SILENCE_TAG)
         if silence_count == len(models):
@@ -393,15 +503,21 @@ class AudioTranscriber:
         gpt4o_mini_text = transcriptions.get(self.GPT4O_MINI_TRANSCRIBE, "")
         whisper_text = transcriptions.get(self.WHISPER_1, "")
         
+        # Un modelo que falló no aporta texto: su mensaje de error no debe llegar a la transcripción
+        if gpt4o_mini_text.startswith("ERROR:"):
+            gpt4o_mini_text = ""
+        if whisper_text.startswith("ERROR:"):
+            whisper_text = ""
+        
         # Verificar si ambas transcripciones indican silencio
         if gpt4o_mini_text == self.SILENCE_TAG and whisper_text == self.SILENCE_TAG:
             return self.SILENCE_TAG
         
         # Si solo una transcripción indica silencio, usar la otra
         if gpt4o_mini_text == self.SILENCE_TAG:
-            return whisper_text
+            return whisper_text or self.SILENCE_TAG
         if whisper_text == self.SILENCE_TAG:
-            return gpt4o_mini_text
+            return gpt4o_mini_text or self.SILENCE_TAG
         
         # Verificar si tenemos ambas transcripciones
         if not gpt4o_mini_text or not whisper_text:
@@ -490,11 +606,13 @@ def main():
     parser.add_argument("--api-key", "-k", type=str, 
                         help="API key de OpenAI (opcional, por defecto usa la variable de entorno OPENAI_API_KEY)")
     parser.add_argument("--convert", "-c", action="store_true", 
-                        help="Convertir a MP3 antes de transcribir")
+                        help="Guardar también una copia MP3 junto al WAV (la subida ya se codifica a Opus en memoria)")
     parser.add_argument("--verbose", "-v", action="store_true",
                         help="Mostrar información detallada durante el proceso")
     parser.add_argument("--no-optimize", "-n", action="store_true",
                         help="No generar la transcripción optimizada con GPT-4o")
+    parser.add_argument("--workers", "-w", type=int, default=AudioTranscriber.LONG_AUDIO_WORKERS,
+                        help="Fragmentos transcritos en paralelo por modelo en audios largos (por defecto: 4)")
     
     args = parser.parse_args()
     
@@ -504,6 +622,7 @@ def main():
     try:
         # Crear instancia del transcriptor
         transcriber = AudioTranscriber(api_key=args.api_key)
+        transcriber.LONG_AUDIO_WORKERS = max(1, args.workers)
         
         # Determinar archivo de audio a procesar
         if args.file:
@@ -525,8 +644,11 @@ def main():
             if verbose:
                 print(f"Archivo WAV más reciente encontrado: {audio_file}")
         
-        # Verificar si el audio es silencio antes de continuar
-        if transcriber.is_silent_audio(audio_file):
+        # Un solo asset para todo el proceso: el archivo se decodifica una vez
+        audio_file = transcriber.audio_asset(audio_file)
+
+        # Verificar si el audio es silencio antes de continuar (salvo audio largo comprimido)
+        if transcriber.should_check_silence(audio_file) and transcriber.is_silent_audio(audio_file):
             if verbose:
                 print("El archivo de audio contiene principalmente silencio.")
             
@@ -543,10 +665,9 @@ def main():
             
             return 0
         
-        # Convertir a MP3 si se solicita
-        if args.convert or audio_file.lower().endswith('.wav'):
+        # Guardar copia MP3 si se solicita (reutiliza el audio ya decodificado)
+        if args.convert and audio_file.is_wav:
             mp3_file = transcriber.convert_wav_to_mp3(audio_file)
-            audio_file = mp3_file
             if verbose:
                 print(f"Archivo convertido a MP3: {mp3_file}")
         
@@ -615,12 +736,6 @@ def main():
         if verbose:
             print(f"Tiempo total de procesamiento: {time.time() - start_time:.2f} segundos")
             
-        # Si creamos un archivo MP3 temporal, eliminarlo
-        if 'mp3_file' in locals() and os.path.exists(mp3_file) and mp3_file.startswith(tempfile.gettempdir()):
-            os.remove(mp3_file)
-            if verbose:
-                print(f"Archivo temporal eliminado: {mp3_file}")
-        
         return 0
         
     except Exception as e:
@@ -0,0 +1,407 @@
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+import concurrent.futures
+from typing import Dict, Optional, List, Tuple, Union
+
+import speech_encoder
+from FileToText import AudioTranscriber
+from long_audio import ChunkTranscriptionError, transcribe_for_models
+
+
+class VideoTranscriber:
+    """
+    Transcribe la pista de audio de un video (o de cualquier archivo que ffmpeg pueda leer).
+    - ffmpeg extrae el audio directamente a 16 kHz mono Opus/FLAC por un pipe, sin WAV temporal.
+    - El audio se divide en silencios en fragmentos por debajo del límite de la API.
+    - Los fragmentos se extraen y transcriben en paralelo y se unen en orden con sus tiempos (TXT/SRT).
+    - Con varios modelos cada fragmento se extrae una sola vez y los mismos bytes van a todos.
+    """
+
+    SAMPLE_RATE = speech_encoder.SAMPLE_RATE
+    API_LIMIT_MB = 24              # límite de la API: 25 MB (se deja margen)
+    TARGET_CHUNK_SECONDS = 300     # duración ideal de cada fragmento
+    MAX_CHUNK_SECONDS = 600        # nunca más largo que esto aunque no haya silencios
+    SILENCE_MIN_SECONDS = 0.4      # silencio mínimo para usarlo como punto de corte
+    MAX_RETRIES = 2
+
+    # formato: (nombre de archivo para la API, argumentos de ffmpeg); los mismos que la subida de WAV
+    FORMATS = {name: (f"audio.{extension}", args) for name, (extension, args) in speech_encoder.FORMATS.items()}
+
+    def __init__(self, api_key: Optional[str] = None, transcriber: Optional[AudioTranscriber] = None):
+        """
+        Inicializa el transcriptor de video.
+
+        Args:
+            api_key: API key de OpenAI. Si no se proporciona, se usa la variable de entorno.
+            transcriber: AudioTranscriber existente para compartir su cliente de OpenAI.
+        """
+        self.transcriber = transcriber or AudioTranscriber(api_key=api_key)
+        self.client = self.transcriber.client
+
+    def _run(self, cmd: List[str], input_bytes: Optional[bytes] = None) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            cmd,
+            input=input_bytes,
+            capture_output=True,
+            check=True,
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+        )
+
+    def detect_silences(self, media_file: str) -> Tuple[float, List[Tuple[float, float]]]:
+        """
+        Recorre el audio una vez con el filtro silencedetect de ffmpeg.
+
+        Args:
+            media_file: Ruta al video o audio.
+
+        Returns:
+            Tupla (duración_total, [(inicio_silencio, fin_silencio), ...]).
+        """
+        cmd = [
+            "ffmpeg", "-hide_banner", "-nostats",
+            "-i", media_file,
+            "-vn", "-sn", "-dn",
+            "-ac", "1", "-ar", str(self.SAMPLE_RATE),
+            # Mismo umbral (dBFS) que la detección de silencio de AudioTranscriber
+            "-af", f"silencedetect=noise={self.transcriber.SILENCE_THRESHOLD}dB:d={self.SILENCE_MIN_SECONDS}",
+            "-f", "null", "-"
+        ]
+        stderr = self._run(cmd).stderr.decode("utf-8", "replace")
+
+        silences = []
+        current_start = None
+        for line in stderr.splitlines():
+            match = re.search(r"silence_start: (-?[\d.]+)", line)
+            if match:
+                current_start = max(0.0, float(match.group(1)))
+                continue
+            match = re.search(r"silence_end: ([\d.]+)", line)
+            if match and current_start is not None:
+                silences.append((current_start, float(match.group(1))))
+                current_start = None
+
+        duration = silences[-1][1] if silences else 0.0
+        match = re.search(r"Duration: (\d+):(\d+):([\d.]+)", stderr)
+        if match:
+            duration = int(match.group(1)) * 3600 + int(match.group(2)) * 60 + float(match.group(3))
+        if current_start is not None:
+            silences.append((current_start, duration))  # silencio hasta el final
+        return duration, silences
+
+    def plan_chunks(self, duration: float, silences: List[Tuple[float, float]],
+                    max_seconds: Optional[float] = None) -> List[Tuple[float, float]]:
+        """
+        Divide [0, duración) en fragmentos cortando en el centro de los silencios
+        más cercanos a TARGET_CHUNK_SECONDS, sin superar max_seconds.
+
+        Returns:
+            Lista de (inicio, fin) en segundos, sin incluir fragmentos que son solo silencio.
+        """
+        max_seconds = max_seconds or self.MAX_CHUNK_SECONDS
+        target = min(self.TARGET_CHUNK_SECONDS, max_seconds)
+        cut_points = [(s + e) / 2 for s, e in silences]
+
+        chunks = []
+        start = 0.0
+        while duration - start > max_seconds:
+            ideal = start + target
+            candidates = [c for c in cut_points if start + target / 2 <= c <= start + max_seconds]
+            end = min(candidates, key=lambda c: abs(c - ideal)) if candidates else start + max_seconds
+            chunks.append((start, end))
+            start = end
+        if duration - start > 0.05:
+            chunks.append((start, duration))
+
+        # Descartar fragmentos contenidos por completo en un silencio
+        return [
+            (a, b) for a, b in chunks
+            if not any(s <= a + 0.05 and b - 0.05 <= e for s, e in silences)
+        ]
+
+    def extract_chunk(self, media_file: str, start: float, end: float, audio_format: str = "opus") -> bytes:
+        """
+        Extrae [inicio, fin) directamente a Opus/FLAC 16 kHz mono en memoria (stdout de ffmpeg).
+        """
+        _, codec_args = self.FORMATS[audio_format]
+        cmd = [
+            "ffmpeg", "-v", "error",
+            "-ss", f"{start:.3f}",
+            "-i", media_file,
+            "-t", f"{end - start:.3f}",
+            "-vn", "-sn", "-dn",
+            "-ac", "1", "-ar", str(self.SAMPLE_RATE),
+            *codec_args,
+            "pipe:1"
+        ]
+        return self._run(cmd).stdout
+
+    def extract_payloads(self, media_file: str, start: float, end: float,
+                         audio_format: str) -> List[Tuple[Tuple[float, float], bytes]]:
+        """
+        Extrae un fragmento una sola vez para todos los modelos.
+
+        Returns:
+            Lista de ((inicio, fin), bytes); más de uno si hubo que partirlo por el límite de la API.
+        """
+        data = self.extract_chunk(media_file, start, end, audio_format)
+        if len(data) > self.API_LIMIT_MB * 1024 * 1024:
+            # Demasiado grande para la API (p. ej. FLAC con mucho ruido): partir por la mitad
+            middle = (start + end) / 2
+            return (self.extract_payloads(media_file, start, middle, audio_format) +
+                    self.extract_payloads(media_file, middle, end, audio_format))
+        return [((start, end), data)]
+
+    def transcribe_payload(self, span: Tuple[float, float], data: bytes, model: str,
+                           language: Optional[str], prompt: Optional[str], audio_format: str) -> List[dict]:
+        """
+        Transcribe un fragmento ya extraído. Devuelve segmentos con tiempos absolutos del video.
+        """
+        start, end = span
+        filename, _ = self.FORMATS[audio_format]
+        # whisper-1 devuelve segmentos con tiempos; los modelos gpt-4o solo texto (un segmento por fragmento)
+        response_format = "verbose_json" if model == AudioTranscriber.WHISPER_1 else "json"
+        params = {"model": model, "file": (filename, data), "response_format": response_format}
+        if language:
+            params["language"] = language
+        if prompt and model == AudioTranscriber.GPT4O_MINI_TRANSCRIBE:
+            params["prompt"] = prompt
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                result = self.client.audio.transcriptions.create(**params)
+                break
+            except Exception:
+                if attempt == self.MAX_RETRIES:
+                    raise
+                time.sleep(2 ** attempt)
+
+        segments = getattr(result, "segments", None)
+        if segments:
+            return [
+                {
+                    "start": start + float(getattr(s, "start", 0.0)),
+                    "end": min(end, start + float(getattr(s, "end", 0.0))),
+                    "text": getattr(s, "text", "").strip()
+                }
+                for s in segments if getattr(s, "text", "").strip()
+            ]
+        text = getattr(result, "text", result if isinstance(result, str) else "")
+        text = (text or "").strip()
+        if self.transcriber.is_empty_transcription(text):
+            return []
+        return [{"start": start, "end": end, "text": text}]
+
+    def transcribe_video(self,
+                         media_file: str,
+                         model: str = AudioTranscriber.WHISPER_1,
+                         language: Optional[str] = None,
+                         prompt: Optional[str] = None,
+                         audio_format: str = "opus",
+                         max_workers: int = 8,
+                         verbose: bool = False) -> List[dict]:
+        """
+        Transcribe un video completo.
+
+        Args:
+            media_file: Ruta al video o audio.
+            model: Modelo de transcripción.
+            language: Código de idioma opcional.
+            prompt: Prompt opcional (solo GPT-4o Mini Transcribe).
+            audio_format: 'opus' (más pequeño) o 'flac' (sin pérdida).
+            max_workers: Fragmentos transcritos a la vez.
+            verbose: Si se deben mostrar mensajes de progreso.
+
+        Returns:
+            Lista ordenada de segmentos {'start', 'end', 'text'}.
+
+        Raises:
+            ChunkTranscriptionError: Si algún fragmento sigue fallando tras MAX_RETRIES reintentos.
+        """
+        result = self.transcribe_video_models(
+            media_file, [model], language=language, prompt=prompt,
+            audio_format=audio_format, max_workers=max_workers, verbose=verbose
+        )[model]
+        if isinstance(result, ChunkTranscriptionError):
+            raise result
+        return result
+
+    def transcribe_video_models(self,
+                                media_file: str,
+                                models: List[str],
+                                language: Optional[str] = None,
+                                prompt: Optional[str] = None,
+                                audio_format: str = "opus",
+                                max_workers: int = 8,
+                                verbose: bool = False) -> Dict[str, Union[List[dict], ChunkTranscriptionError]]:
+        """
+        Transcribe un video con varios modelos en una sola pasada: silencedetect y la extracción
+        de cada fragmento se hacen una vez y los mismos bytes se envían a todos los modelos.
+
+        Args:
+            media_file: Ruta al video o audio.
+            models: Modelos de transcripción.
+            language: Código de idioma opcional.
+            prompt: Prompt opcional (solo GPT-4o Mini Transcribe).
+            audio_format: 'opus' (más pequeño) o 'flac' (sin pérdida).
+            max_workers: Fragmentos extraídos (y en memoria) a la vez.
+            verbose: Si se deben mostrar mensajes de progreso.
+
+        Returns:
+            Diccionario modelo -> segmentos ordenados, o ChunkTranscriptionError si alguno de
+            sus fragmentos siguió fallando tras MAX_RETRIES reintentos.
+        """
+        if not os.path.exists(media_file):
+            raise FileNotFoundError(f"El archivo {media_file} no existe")
+        if audio_format not in self.FORMATS:
+            raise ValueError(f"Formato no soportado: {audio_format}")
+
+        start_time = time.time()
+        duration, silences = self.detect_silences(media_file)
+        chunks = self.plan_chunks(duration, silences)
+        if verbose:
+            print(f"Duración: {duration:.1f}s, {len(silences)} silencios, {len(chunks)} fragmentos "
+                  f"({time.time() - start_time:.2f}s)")
+
+        results = {model: {} for model in models}
+        failed = {model: [] for model in models}
+
+        def process(a: float, b: float, requests: concurrent.futures.Executor) -> dict:
+            payloads = self.extract_payloads(media_file, a, b, audio_format)
+            return transcribe_for_models(
+                payloads, models,
+                lambda span, data, model: self.transcribe_payload(span, data, model, language, prompt, audio_format),
+                requests
+            )
+
+        max_workers = max(1, max_workers)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=max_workers * len(models)) as requests:
+            futures = {executor.submit(process, a, b, requests): idx for idx, (a, b) in enumerate(chunks)}
+            for future in concurrent.futures.as_completed(futures):
+                idx = futures[future]
+                a, b = chunks[idx]
+                try:
+                    by_model = future.result()
+                except Exception as e:
+                    by_model = {model: e for model in models}  # falló la extracción
+                for model, result in by_model.items():
+                    if isinstance(result, Exception):
+                        # Sin texto de error en el TXT/SRT: el fragmento se informa aparte
+                        failed[model].append({"index": idx, "start": a, "end": b, "error": str(result)})
+                        if verbose:
+                            print(f"✗ Error en fragmento {idx + 1} ({a:.1f}-{b:.1f}s) con {model}: {str(result)}")
+                    else:
+                        results[model][idx] = [segment for _, segments in result for segment in segments]
+                        if verbose:
+                            print(f"✓ Fragmento {idx + 1}/{len(chunks)} ({a:.1f}-{b:.1f}s) con {model} "
+                                  f"en {time.time() - start_time:.2f}s")
+
+        if verbose:
+            print(f"Transcripción completada en {time.time() - start_time:.2f} segundos")
+        transcriptions = {}
+        for model in models:
+            segments = [segment for idx in sorted(results[model]) for segment in results[model][idx]]
+            if failed[model]:
+                transcriptions[model] = ChunkTranscriptionError(
+                    sorted(failed[model], key=lambda f: f["index"]), segments
+                )
+            else:
+                transcriptions[model] = segments
+        return transcriptions
+
+    @staticmethod
+    def _srt_time(seconds: float) -> str:
+        ms = int(round(seconds * 1000))
+        h, ms = divmod(ms, 3600000)
+        m, ms = divmod(ms, 60000)
+        s, ms = divmod(ms, 1000)
+        return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+
+    def to_srt(self, segments: List[dict]) -> str:
+        """Convierte los segmentos a subtítulos SRT."""
+        blocks = []
+        for idx, segment in enumerate(segments, start=1):
+            blocks.append(
+                f"{idx}\n{self._srt_time(segment['start'])} --> {self._srt_time(segment['end'])}\n{segment['text']}\n"
+            )
+        return "\n".join(blocks)
+
+    def to_txt(self, segments: List[dict]) -> str:
+        """Convierte los segmentos a texto plano (un párrafo por segmento)."""
+        return "\n".join(segment["text"] for segment in segments)
+
+
+def main():
+    """
+    Transcribe un video a TXT y SRT.
+    """
+    parser = argparse.ArgumentParser(description="Transcribe la pista de audio de un video a TXT/SRT.")
+    parser.add_argument("file", type=str, help="Ruta al video (o audio) a transcribir")
+    parser.add_argument("--output-dir", "-o", type=str,
+                        help="Directorio de salida (por defecto, junto al video)")
+    parser.add_argument("--language", "-l", type=str, default="es",
+                        help="Código de idioma para la transcripción (por defecto: es)")
+    parser.add_argument("--prompt", "-p", type=str,
+                        help="Prompt para guiar la transcripción (solo aplicable a GPT-4o Mini Transcribe)")
+    parser.add_argument("--model", "-m", type=str, default=AudioTranscriber.WHISPER_1,
+                        choices=[AudioTranscriber.WHISPER_1, AudioTranscriber.GPT4O_MINI_TRANSCRIBE],
+                        help="Modelo de transcripción (whisper-1 da tiempos por frase para el SRT)")
+    parser.add_argument("--format", "-f", type=str, default="opus", choices=["opus", "flac"],
+                        help="Formato de audio enviado a la API (por defecto: opus)")
+    parser.add_argument("--workers", "-w", type=int, default=8,
+                        help="Fragmentos transcritos en paralelo (por defecto: 8)")
+    parser.add_argument("--api-key", "-k", type=str,
+                        help="API key de OpenAI (opcional, por defecto usa la variable de entorno OPENAI_API_KEY)")
+    parser.add_argument("--verbose", "-v", action="store_true",
+                        help="Mostrar información detallada durante el proceso")
+
+    args = parser.parse_args()
+
+    try:
+        video_transcriber = VideoTranscriber(api_key=args.api_key)
+        failed = []
+        try:
+            segments = video_transcriber.transcribe_video(
+                args.file,
+                model=args.model,
+                language=args.language,
+                prompt=args.prompt,
+                audio_format=args.format,
+                max_workers=args.workers,
+                verbose=args.verbose
+            )
+        except ChunkTranscriptionError as e:
+            # Se guarda lo transcrito y los fragmentos fallidos se listan aparte (código de salida 1)
+            segments, failed = e.segments, e.failed
+
+        output_dir = args.output_dir or os.path.dirname(os.path.abspath(args.file))
+        os.makedirs(output_dir, exist_ok=True)
+        base_name = os.path.splitext(os.path.basename(args.file))[0]
+        txt_path = os.path.join(output_dir, f"{base_name}.txt")
+        srt_path = os.path.join(output_dir, f"{base_name}.srt")
+        with open(txt_path, "w", encoding="utf-8") as f:
+            f.write(video_transcriber.to_txt(segments))
+        with open(srt_path, "w", encoding="utf-8") as f:
+            f.write(video_transcriber.to_srt(segments))
+
+        print(f"Transcripción guardada en: {txt_path}")
+        print(f"Subtítulos guardados en: {srt_path}")
+        if failed:
+            print(f"Error: {len(failed)} fragmento(s) sin transcribir (no incluidos en la salida):")
+            for chunk in failed:
+                print(f"  {video_transcriber._srt_time(chunk['start'])} --> "
+                      f"{video_transcriber._srt_time(chunk['end'])}: {chunk['error']}")
+            return 1
+        return 0
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Audio Asset - Un archivo de audio que se decodifica como mucho una vez por transcripción.
+Duración, formato, veredicto de silencio y bytes a subir se calculan bajo demanda y se guardan,
+así las comprobaciones y los hilos de cada modelo comparten el mismo trabajo.
+"""
+
+import io
+import os
+import sys
+import threading
+from typing import Optional, Tuple
+
+from pydub import AudioSegment
+from pydub.silence import detect_nonsilent
+
+import audio_vad
+import speech_encoder
+
+# Caché compartida de metadatos multimedia (módulo del servidor Flask)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'flask_server'))
+try:
+    from media_cache import media_cache
+except ImportError:
+    media_cache = None
+
+
+class AudioAsset:
+    """
+    Envuelve la ruta de un WAV/MP3:
+    - info(): de la cabecera WAV (caché de metadatos) sin decodificar; si no, del audio decodificado.
+    - audio: AudioSegment decodificado una sola vez (con lock: lo piden varios hilos a la vez).
+    - is_silent(): veredicto de silencio calculado una vez (WAV: audio_vad con NumPy, sin decodificar).
+    - upload_file(): (nombre, bytes) para la API; un WAV se codifica una vez en memoria a 16 kHz
+      mono Opus (speech_encoder), sin decodificar con pydub ni escribir nada junto al original.
+    """
+
+    UPLOAD_FORMAT = "opus"           # formato de speech_encoder: 'opus', 'flac' o 'wav'
+    FALLBACK_FORMAT = "mp3"          # WAV que speech_encoder no sabe leer: pydub
+    FALLBACK_BITRATE = "192k"
+
+    decode_count = 0  # decodificaciones completas en el proceso (para benchmarks)
+    _count_lock = threading.Lock()
+
+    def __init__(self, path: str, silence_threshold: float = -50, min_silence_len: int = 300,
+                 min_audio_length: float = 0.5):
+        """
+        Args:
+            path: Ruta al archivo de audio
+            silence_threshold: dBFS por debajo de los cuales un fragmento es silencio
+            min_silence_len: Milisegundos mínimos de un fragmento para contar (como detect_nonsilent)
+            min_audio_length: Segundos por debajo de los cuales el audio se considera silencio
+        """
+        self.path = path
+        self.silence_threshold = silence_threshold
+        self.min_silence_len = min_silence_len
+        self.min_audio_length = min_audio_length
+        self._lock = threading.RLock()
+        self._audio: Optional[AudioSegment] = None
+        self._info: Optional[dict] = None
+        self._silent: Optional[bool] = None
+        self._upload: Optional[Tuple[str, bytes]] = None
+
+    def __repr__(self) -> str:
+        return f"AudioAsset({self.path!r})"
+
+    @property
+    def is_wav(self) -> bool:
+        return self.path.lower().endswith('.wav')
+
+    @property
+    def is_mp3(self) -> bool:
+        return self.path.lower().endswith('.mp3')
+
+    @property
+    def audio(self) -> AudioSegment:
+        with self._lock:
+            if self._audio is None:
+                if self.is_wav:
+                    self._audio = AudioSegment.from_wav(self.path)
+                elif self.is_mp3:
+                    self._audio = AudioSegment.from_mp3(self.path)
+                else:
+                    self._audio = AudioSegment.from_file(self.path)
+                with AudioAsset._count_lock:
+                    AudioAsset.decode_count += 1
+            return self._audio
+
+    def info(self) -> dict:
+        """
+        Returns:
+            Mismo formato que AudioTranscriber.get_audio_info
+        """
+        with self._lock:
+            if self._info is None:
+                file_size_mb = os.path.getsize(self.path) / (1024 * 1024)
+                info = None
+                if media_cache is not None and self._audio is None:
+                    try:
+                        cached = media_cache.audio_info(self.path)
+                        info = {
+                            "duración_segundos": cached["duration"],
+                            "canales": cached["channels"],
+                            "sample_width": cached["sample_width"],
+                            "frame_rate": cached["sample_rate"],
+                        }
+                    except Exception:
+                        pass  # Sin ffprobe o archivo no reconocido: decodificar
+                if info is None:
+                    audio = self.audio
+                    info = {
+                        "duración_segundos": len(audio) / 1000,
+                        "canales": audio.channels,
+                        "sample_width": audio.sample_width,
+                        "frame_rate": audio.frame_rate,
+                    }
+                info["tamaño_mb"] = round(file_size_mb, 2)
+                self._info = info
+            return self._info
+
+    @property
+    def duration(self) -> float:
+        return self.info()["duración_segundos"]
+
+    def is_silent(self) -> bool:
+        with self._lock:
+            if self._silent is None:
+                self._silent = self._detect_silence()
+            return self._silent
+
+    def _detect_silence(self) -> bool:
+        if not (self.is_wav or self.is_mp3):
+            return False  # No podemos determinar si es silencio para formatos no soportados
+        if self.is_wav and self._audio is None:
+            # WAV sin comprimir: NumPy sobre el archivo mapeado, sin decodificar con pydub
+            try:
+                return audio_vad.is_silent(self.path, self.silence_threshold,
+                                           self.min_silence_len, self.min_audio_length)
+            except Exception:
+                pass  # Formato no soportado por audio_vad: seguir con pydub
+        try:
+            if self.duration < self.min_audio_length:
+                return True
+            non_silent_parts = detect_nonsilent(
+                self.audio,
+                min_silence_len=self.min_silence_len,
+                silence_thresh=self.silence_threshold
+            )
+            return not non_silent_parts
+        except Exception:
+            # Si hay un error, asumimos que no es silencio para evitar falsos positivos
+            return False
+
+    def upload_file(self) -> Tuple[str, bytes]:
+        """
+        Archivo para la API de transcripción como (nombre, bytes).
+        Un WAV se codifica a voz 16 kHz mono en memoria (una vez); otros formatos se suben tal cual.
+        """
+        with self._lock:
+            if self._upload is None:
+                base_name = os.path.splitext(os.path.basename(self.path))[0]
+                if self.is_wav:
+                    try:
+                        extension, data = speech_encoder.encode_speech(self.path, self.UPLOAD_FORMAT)
+                    except (ValueError, RuntimeError):
+                        # WAV comprimido o con cabecera rara, o ffmpeg sin libopus: decodificar con pydub
+                        buffer = io.BytesIO()
+                        self.audio.export(buffer, format=self.FALLBACK_FORMAT, bitrate=self.FALLBACK_BITRATE)
+                        extension, data = self.FALLBACK_FORMAT, buffer.getvalue()
+                    self._upload = (f"{base_name}.{extension}", data)
+                else:
+                    with open(self.path, 'rb') as f:
+                        self._upload = (os.path.basename(self.path), f.read())
+            return self._upload
+
+    def release(self):
+        """Libera el audio decodificado y los bytes codificados (se conservan info y silencio)."""
+        with self._lock:
+            self._audio = None
+            self._upload = None
@@ -0,0 +1,330 @@
+"""
+Audio VAD - Detección de silencio y de voz vectorizada con NumPy sobre el PCM de un WAV
+(np.memmap del chunk de datos: no se decodifica ni se copia el archivo entero a memoria)
+
+- nonsilent_ranges / is_silent: misma semántica que pydub.silence.detect_nonsilent con
+  SILENCE_THRESHOLD (dBFS) y MIN_SILENCE_LENGTH (ms), ventana deslizante de 1 ms incluida,
+  pero con sumas acumuladas de energía por milisegundo en lugar de un bucle en Python.
+- speech_regions: VAD por tramas (RMS + cruces por cero) con histéresis, para cortar por pausas.
+"""
+
+import os
+import sys
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Lectura de cabeceras WAV (módulo del servidor Flask)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'flask_server'))
+from media_cache import read_wav_header
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+
+CHUNK_MS = 10_000  # milisegundos de audio por bloque: la memoria no depende de la duración
+
+
+@dataclass
+class PcmData:
+    """Muestras de un WAV mapeadas en memoria, sin convertir, forma (frames, canales[, 3 si 24 bits])."""
+    path: str
+    samples: np.ndarray
+    sample_rate: int
+    channels: int
+    frames: int
+    full_scale: float
+    packed24: bool = False
+
+    @property
+    def duration_ms(self) -> int:
+        """Duración en ms redondeada como len(AudioSegment)."""
+        return round(1000 * self.frames / self.sample_rate)
+
+    def block(self, start: int, end: int) -> np.ndarray:
+        """Frames [start, end) como float32 normalizado a [-1, 1], forma (frames, canales)."""
+        raw = self.samples[start:end]
+        if self.packed24:
+            raw = raw.astype(np.int32)
+            raw = ((raw[..., 0] | (raw[..., 1] << 8) | (raw[..., 2] << 16)) << 8) >> 8  # extender el signo
+        elif raw.dtype == np.uint8:
+            return (raw.astype(np.float32) - 128.0) / self.full_scale
+        if raw.dtype == np.float32:
+            return np.asarray(raw)
+        return raw.astype(np.float32) / self.full_scale
+
+    def close(self):
+        """Libera el mapeo (en Windows el archivo queda abierto mientras exista)."""
+        mm = getattr(self.samples, '_mmap', None)
+        self.samples = np.empty((0, self.channels))
+        if mm is not None:
+            mm.close()
+
+
+def load_pcm(path: str) -> PcmData:
+    """
+    Mapea el chunk de datos de un WAV PCM entero (8/16/24/32 bits) o float (32/64 bits).
+
+    Raises:
+        ValueError: Si no es un WAV sin comprimir que se pueda leer así (usar pydub en ese caso)
+    """
+    header = read_wav_header(path)
+    fmt = header['format_tag']
+    bits = header['bits_per_sample']
+    channels = header['channels']
+    sample_rate = header['sample_rate']
+    if sample_rate < 1000 or channels < 1:
+        raise ValueError(f"{path}: frecuencia o canales no soportados")
+    if header['block_align'] != channels * bits // 8:
+        raise ValueError(f"{path}: block_align no estándar")
+
+    if fmt == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+        dtype, full_scale, packed24 = np.dtype('<f4' if bits == 32 else '<f8'), 1.0, False
+    elif fmt == WAVE_FORMAT_PCM and bits in (8, 16, 32):
+        dtype = np.dtype({8: 'u1', 16: '<i2', 32: '<i4'}[bits])
+        full_scale, packed24 = float(2 ** (bits - 1)), False
+    elif fmt == WAVE_FORMAT_PCM and bits == 24:
+        dtype, full_scale, packed24 = np.dtype('u1'), float(2 ** 23), True
+    else:
+        raise ValueError(f"{path}: formato WAV {fmt} de {bits} bits no soportado")
+
+    frames = header['frames']
+    if frames == 0:
+        samples = np.zeros((0, channels, 3) if packed24 else (0, channels), dtype=dtype)
+    else:
+        shape = (frames, channels, 3) if packed24 else (frames, channels)
+        samples = np.memmap(path, dtype=dtype, mode='r', offset=header['data_offset'], shape=shape)
+    return PcmData(path, samples, sample_rate, channels, frames, full_scale, packed24)
+
+
+def _as_pcm(audio) -> Tuple[PcmData, bool]:
+    """Acepta ruta o PcmData; indica si hay que cerrar el mapeo al terminar."""
+    if isinstance(audio, PcmData):
+        return audio, False
+    return load_pcm(audio), True
+
+
+# ==========================
+# Energía por milisegundo (semántica de pydub)
+# ==========================
+def _ms_bounds(pcm: PcmData, first_ms: int, last_ms: int) -> np.ndarray:
+    """Frame inicial de cada ms de [first_ms, last_ms] como AudioSegment[ms]: floor(ms * sr / 1000)."""
+    return (np.arange(first_ms, last_ms + 1, dtype=np.int64) * pcm.sample_rate) // 1000
+
+
+def ms_energy(pcm: PcmData, first_ms: int = 0, last_ms: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Suma de muestras al cuadrado (normalizadas, todos los canales) de cada milisegundo de [first_ms, last_ms).
+
+    Returns:
+        (energía por ms, frame inicial de cada ms + frame final)
+    """
+    last_ms = pcm.duration_ms if last_ms is None else last_ms
+    bounds = _ms_bounds(pcm, first_ms, last_ms)
+    total_ms = len(bounds) - 1
+    clamped = np.minimum(bounds, pcm.frames)  # el redondeo de la duración puede pasarse del final
+    energy = np.zeros(total_ms, dtype=np.float64)
+    for k0 in range(0, total_ms, CHUNK_MS):
+        k1 = min(total_ms, k0 + CHUNK_MS)
+        f0, f1 = int(clamped[k0]), int(clamped[k1])
+        if f1 <= f0:
+            continue
+        block = pcm.block(f0, f1)
+        per_frame = np.square(block).sum(axis=1, dtype=np.float64)
+        starts = clamped[k0:k1] - f0
+        valid = starts < len(per_frame)
+        energy[k0:k1][valid] = np.add.reduceat(per_frame, starts[valid])
+    energy[clamped[1:] == clamped[:-1]] = 0.0  # ms sin frames (reduceat no devuelve 0 ahí)
+    return energy, bounds
+
+
+def _silence_limit(pcm: PcmData, silence_thresh: float) -> float:
+    """
+    RMS normalizado por debajo del cual una ventana es silencio. pydub compara int(rms) <= umbral
+    en la escala entera de las muestras (float: ffmpeg a 32 bits), es decir rms < floor(umbral) + 1;
+    con 8 bits esa diferencia decide el veredicto.
+    """
+    scale = 2.0 ** 31 if pcm.samples.dtype.kind == 'f' else pcm.full_scale
+    return (np.floor(10 ** (silence_thresh / 20) * scale) + 1) / scale
+
+
+def _silent_starts(pcm: PcmData, first: int, last: int, window: int, limit: float) -> np.ndarray:
+    """Inicios (ms) de [first, last) cuya ventana [i, i + window) es silencio, como detect_silence."""
+    energy, bounds = ms_energy(pcm, first, min(pcm.duration_ms, last - 1 + window))
+    cumulative = np.concatenate(([0.0], np.cumsum(energy)))
+    starts = np.arange(last - first)
+    window_energy = cumulative[starts + window] - cumulative[starts]
+    # AudioSegment rellena con ceros si la ventana se pasa del final: cuentan en el promedio
+    count = (bounds[starts + window] - bounds[starts]) * pcm.channels
+    return first + np.flatnonzero(window_energy < limit * limit * np.maximum(count, 1))
+
+
+def nonsilent_ranges(audio, min_silence_len: int = 300, silence_thresh: float = -50) -> List[List[int]]:
+    """
+    Equivalente vectorizado de pydub.silence.detect_nonsilent(seek_step=1).
+    Usa unos bytes por milisegundo de audio; para solo saber si hay sonido, is_silent() va por bloques.
+
+    Args:
+        audio: Ruta a un WAV o PcmData
+        min_silence_len: Milisegundos mínimos de una ventana silenciosa
+        silence_thresh: dBFS por debajo (o igual) de los cuales la ventana es silencio
+
+    Returns:
+        Lista de [inicio_ms, fin_ms] con sonido
+    """
+    pcm, owned = _as_pcm(audio)
+    try:
+        total_ms = pcm.duration_ms
+        window = int(min_silence_len)
+        if total_ms < window or window <= 0:
+            return [[0, total_ms]]
+        silent_starts = _silent_starts(pcm, 0, total_ms - window + 1, window, _silence_limit(pcm, silence_thresh))
+    finally:
+        if owned:
+            pcm.close()
+
+    if silent_starts.size == 0:
+        return [[0, total_ms]]
+    # Rangos de silencio: inicios consecutivos o solapados (separados <= window) se unen
+    breaks = np.flatnonzero(np.diff(silent_starts) > window)
+    range_starts = silent_starts[np.concatenate(([0], breaks + 1))]
+    range_ends = silent_starts[np.concatenate((breaks, [silent_starts.size - 1]))] + window
+    if range_starts[0] == 0 and range_ends[0] == total_ms:
+        return []
+
+    # Complemento (mismas reglas de borde que detect_nonsilent)
+    nonsilent = [[0, int(range_starts[0])]]
+    nonsilent += [[int(e), int(s)] for e, s in zip(range_ends[:-1], range_starts[1:])]
+    if range_ends[-1] != total_ms:
+        nonsilent.append([int(range_ends[-1]), total_ms])
+    if nonsilent[0] == [0, 0]:
+        nonsilent.pop(0)
+    return nonsilent
+
+
+def is_silent(audio, silence_thresh: float = -50, min_silence_len: int = 300,
+              min_audio_length: float = 0.5) -> bool:
+    """
+    Mismo veredicto que AudioTranscriber.is_silent_audio con pydub: corto o sin rangos con sonido.
+
+    detect_nonsilent no devuelve nada solo si el primer rango de silencio cubre todo el audio:
+    inicios silenciosos desde 0 hasta el último, sin huecos mayores que la ventana. Se comprueba
+    por bloques de CHUNK_MS (memoria constante) y se corta en el primer hueco, que en audio con
+    voz suele estar en el primer bloque.
+    """
+    pcm, owned = _as_pcm(audio)
+    try:
+        if pcm.frames / pcm.sample_rate < min_audio_length:
+            return True
+        window = int(min_silence_len)
+        if pcm.duration_ms < window or window <= 0:
+            return False
+        limit = _silence_limit(pcm, silence_thresh)
+        n_starts = pcm.duration_ms - window + 1
+        previous = None
+        for first in range(0, n_starts, CHUNK_MS):
+            last = min(n_starts, first + CHUNK_MS)
+            starts = _silent_starts(pcm, first, last, window, limit)
+            if previous is None:
+                if starts.size == 0 or starts[0] != 0:
+                    return False
+            else:
+                starts = np.concatenate(([previous], starts))
+            if np.any(np.diff(starts) > window) or last - 1 - starts[-1] > window:
+                return False
+            previous = starts[-1]
+        return previous == n_starts - 1
+    finally:
+        if owned:
+            pcm.close()
+
+
+# ==========================
+# VAD por tramas
+# ==========================
+def frame_features(audio, frame_ms: int = 10, start: float = 0.0,
+                   end: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    RMS (dBFS) y tasa de cruces por cero (por muestra, mezcla mono) de tramas de frame_ms.
+
+    Args:
+        audio: Ruta a un WAV o PcmData
+        frame_ms: Duración de cada trama
+        start: Segundo inicial (la trama 0 empieza ahí)
+        end: Segundo final (None: hasta el final)
+
+    Returns:
+        (dbfs, zcr) con una entrada por trama (la última puede ser parcial)
+    """
+    pcm, owned = _as_pcm(audio)
+    try:
+        frame_len = max(1, pcm.sample_rate * frame_ms // 1000)
+        begin = min(pcm.frames, max(0, int(start * pcm.sample_rate)))
+        stop = pcm.frames if end is None else min(pcm.frames, max(begin, int(end * pcm.sample_rate)))
+        n_frames = -(-(stop - begin) // frame_len)
+        dbfs = np.full(n_frames, -np.inf)
+        zcr = np.zeros(n_frames)
+        chunk = frame_len * max(1, CHUNK_MS // frame_ms)
+        prev_sign = None
+        for f0 in range(begin, stop, chunk):
+            f1 = min(stop, f0 + chunk)
+            block = pcm.block(f0, f1)
+            starts = np.arange(0, f1 - f0, frame_len)
+            lengths = np.diff(np.append(starts, f1 - f0))
+            first = (f0 - begin) // frame_len
+
+            energy = np.add.reduceat(np.square(block).sum(axis=1, dtype=np.float64), starts)
+            rms = np.sqrt(energy / (lengths * pcm.channels))
+            with np.errstate(divide='ignore'):
+                dbfs[first:first + len(starts)] = 20 * np.log10(rms)
+
+            signs = np.signbit(block.mean(axis=1))
+            # El cruce entre el último frame del bloque anterior y el primero de este cuenta en este
+            previous = signs[:1] if prev_sign is None else prev_sign
+            crossings = np.diff(np.concatenate((previous, signs))).astype(np.float64)
+            zcr[first:first + len(starts)] = np.add.reduceat(crossings, starts) / lengths
+            prev_sign = signs[-1:]
+        return dbfs, zcr
+    finally:
+        if owned:
+            pcm.close()
+
+
+def speech_regions(audio, silence_thresh: float = -50, min_silence_len: int = 300,
+                   hysteresis_db: float = 6.0, zcr_threshold: float = 0.25, min_speech_ms: int = 0,
+                   frame_ms: int = 10, features: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> List[List[int]]:
+    """
+    Regiones con voz, con histéresis:
+    - Una región empieza con una trama por encima de silence_thresh, o por encima de
+      silence_thresh - hysteresis_db con muchos cruces por cero (consonantes sordas, suaves pero ruidosas).
+    - Sigue mientras la energía no baje de silence_thresh - hysteresis_db.
+    - Pausas más cortas que min_silence_len no la cortan (misma idea que MIN_SILENCE_LENGTH).
+
+    Returns:
+        Lista de [inicio_ms, fin_ms]
+    """
+    dbfs, zcr = features if features is not None else frame_features(audio, frame_ms)
+    if dbfs.size == 0:
+        return []
+    low = silence_thresh - hysteresis_db
+    sustain = dbfs > low
+    trigger = (dbfs > silence_thresh) | (sustain & (zcr >= zcr_threshold))
+
+    # Tramos contiguos por encima del umbral bajo; se conservan los que contienen un disparo
+    edges = np.diff(np.concatenate(([0], sustain.astype(np.int8), [0])))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    if run_starts.size == 0:
+        return []
+    triggers = np.concatenate(([0], np.cumsum(trigger)))
+    keep = triggers[run_ends] - triggers[run_starts] > 0
+    run_starts, run_ends = run_starts[keep], run_ends[keep]
+    if run_starts.size == 0:
+        return []
+
+    # Unir tramos separados por pausas cortas
+    gap_frames = max(1, -(-min_silence_len // frame_ms))
+    split = np.flatnonzero(run_starts[1:] - run_ends[:-1] >= gap_frames)
+    region_starts = run_starts[np.concatenate(([0], split + 1))] * frame_ms
+    region_ends = run_ends[np.concatenate((split, [run_ends.size - 1]))] * frame_ms
+    return [[int(s), int(e)] for s, e in zip(region_starts, region_ends) if e - s >= min_speech_ms]
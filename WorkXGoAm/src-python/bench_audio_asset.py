@@ -0,0 +1,149 @@
+"""
+Benchmark de decodificaciones por archivo en la ruta de transcripción (sin llamar a la API):
+- antes: la secuencia anterior (MP3 en disco, silencio e info sobre el MP3, silencio otra vez en cada hilo)
+- después: un AudioAsset compartido por las comprobaciones y los dos hilos de modelo
+
+Uso:
+    python bench_audio_asset.py                      # WAV sintético de 60 s
+    python bench_audio_asset.py --wav grabacion.wav
+    python bench_audio_asset.py --seconds 300 --float32
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import concurrent.futures
+
+import numpy as np
+
+from pydub import AudioSegment
+from pydub.silence import detect_nonsilent
+from audio_asset import AudioAsset
+
+# Caché compartida de metadatos multimedia (módulo del servidor Flask)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'flask_server'))
+from media_cache import media_cache
+
+MODELS = 2               # hilos de modelo en transcribe_with_all_models
+SILENCE_THRESHOLD = -50
+MIN_SILENCE_LENGTH = 300
+
+decodes = {'n': 0}
+_from_wav = AudioSegment.from_wav
+_from_mp3 = AudioSegment.from_mp3
+
+
+def _contar(func):
+    def wrapper(*args, **kwargs):
+        decodes['n'] += 1
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def escribir_wav(path: str, seconds: float, float32: bool):
+    """Ráfagas de ruido (voz simulada) separadas por silencios, 44.1 kHz."""
+    import wave
+    rate = 44100
+    rnd = np.random.default_rng(0)
+    t = np.arange(int(seconds * rate))
+    envolvente = (np.sin(2 * np.pi * t / rate * 0.25) > 0).astype(np.float32)
+    senal = rnd.standard_normal(t.size).astype(np.float32) * 0.2 * envolvente
+    if not float32:
+        with wave.open(path, 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(rate)
+            w.writeframes((senal * 32767).astype('<i2').tobytes())
+        return
+    # WAV float32 estéreo (como el grabador de Tauri): cabecera escrita a mano, wave no soporta float
+    import struct
+    datos = np.repeat(senal[:, None], 2, axis=1).astype('<f4').tobytes()
+    with open(path, 'wb') as f:
+        f.write(b'RIFF' + struct.pack('<I', 36 + len(datos)) + b'WAVE')
+        f.write(b'fmt ' + struct.pack('<IHHIIHH', 16, 3, 2, rate, rate * 8, 8, 32))
+        f.write(b'data' + struct.pack('<I', len(datos)) + datos)
+
+
+def antes(wav: str):
+    """Secuencia anterior de TranscriptionService._transcribe + transcribe_with_all_models."""
+    def es_silencio(path):
+        audio = AudioSegment.from_wav(path) if path.endswith('.wav') else AudioSegment.from_mp3(path)
+        if len(audio) / 1000 < 0.5:
+            return True
+        return not detect_nonsilent(audio, min_silence_len=MIN_SILENCE_LENGTH, silence_thresh=SILENCE_THRESHOLD)
+
+    mp3 = os.path.splitext(wav)[0] + '.mp3'
+    AudioSegment.from_wav(wav).export(mp3, format='mp3', bitrate='192k')  # convert_wav_to_mp3
+    try:
+        if es_silencio(mp3):
+            return
+        try:
+            media_cache.audio_info(mp3)  # get_audio_info: ffprobe vía caché de metadatos
+        except Exception:
+            AudioSegment.from_mp3(mp3)  # sin ffprobe: decodifica el MP3
+
+        def modelo(_):
+            if es_silencio(mp3):
+                return None
+            with open(mp3, 'rb') as f:
+                return f.read()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=MODELS) as pool:
+            list(pool.map(modelo, range(MODELS)))
+    finally:
+        os.remove(mp3)
+
+
+def despues(wav: str):
+    asset = AudioAsset(wav, silence_threshold=SILENCE_THRESHOLD, min_silence_len=MIN_SILENCE_LENGTH)
+    if asset.is_silent():
+        return
+    asset.info()
+
+    def modelo(_):
+        if asset.is_silent():
+            return None
+        return asset.upload_file()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MODELS) as pool:
+        list(pool.map(modelo, range(MODELS)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de AudioAsset (decodificar una vez)")
+    parser.add_argument('--wav', help="WAV a usar (por defecto uno sintético)")
+    parser.add_argument('--seconds', type=float, default=60.0, help="Duración del WAV sintético")
+    parser.add_argument('--float32', action='store_true', help="WAV sintético float32 estéreo")
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    AudioSegment.from_wav = _contar(_from_wav)
+    AudioSegment.from_mp3 = _contar(_from_mp3)
+
+    work_dir = tempfile.mkdtemp(prefix='workx_bench_asset_')
+    try:
+        wav = os.path.join(work_dir, 'bench.wav')
+        if args.wav:
+            shutil.copy(args.wav, wav)
+        else:
+            escribir_wav(wav, args.seconds, args.float32)
+        print(f"Archivo: {os.path.getsize(wav) / 1e6:.1f} MB\n")
+        for nombre, func in (('antes', antes), ('después', despues)):
+            tiempos = []
+            for _ in range(args.runs):
+                decodes['n'] = 0
+                inicio = time.perf_counter()
+                func(wav)
+                tiempos.append(time.perf_counter() - inicio)
+            tiempos.sort()
+            print(f"  {nombre:<8} decodificaciones {decodes['n']}   mediana {tiempos[len(tiempos) // 2]:6.2f} s")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
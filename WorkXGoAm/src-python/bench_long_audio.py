@@ -0,0 +1,146 @@
+"""
+Benchmark de la transcripción por fragmentos de audio largo (long_audio): memoria máxima
+(tracemalloc) y tiempo según la duración del WAV, frente a cargar el archivo entero con pydub.
+
+Sin --api usa un cliente local que responde tras --latency segundos con el tamaño recibido,
+así se mide planificación, codificación y concurrencia sin gastar API. Con --api (y
+OPENAI_API_KEY) transcribe de verdad con el modelo indicado.
+
+Uso:
+    python bench_long_audio.py                          # WAV sintéticos de 5, 20 y 60 minutos
+    python bench_long_audio.py --minutes 10 120 --workers 8
+    python bench_long_audio.py --wav reunion.wav --api
+"""
+
+import os
+import sys
+import time
+import struct
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+
+from long_audio import LongAudioTranscriber
+
+RATE = 44100
+
+
+class ClienteLocal:
+    """Imita client.audio.transcriptions.create: espera y devuelve un texto por fragmento."""
+
+    def __init__(self, latencia: float):
+        self.latencia = latencia
+        self.peticiones = 0
+        self.bytes = 0
+        self.audio = SimpleNamespace(transcriptions=SimpleNamespace(create=self.create))
+
+    def create(self, model, file, response_format, **kwargs):
+        nombre, datos = file
+        self.peticiones += 1
+        self.bytes += len(datos)
+        time.sleep(self.latencia)
+        return SimpleNamespace(text=f"{nombre} con {len(datos)} bytes de audio codificado")
+
+
+def transcriptor_local(latencia: float):
+    """Mismos umbrales y modelos que AudioTranscriber, con el cliente local."""
+    return SimpleNamespace(
+        client=ClienteLocal(latencia),
+        SILENCE_THRESHOLD=-50, MIN_SILENCE_LENGTH=300, SILENCE_TAG="[silence]",
+        WHISPER_1="whisper-1", GPT4O_MINI_TRANSCRIBE="gpt-4o-mini-transcribe",
+        is_empty_transcription=lambda text: not text or text.startswith("ERROR:"),
+    )
+
+
+def escribir_wav_largo(path: str, minutes: float):
+    """
+    WAV int16 mono escrito por bloques (sin tener el audio entero en memoria): frases con
+    pausas y, cada 20 minutos, 12 minutos de ruido continuo sin pausas (corte con solapamiento).
+    """
+    rnd = np.random.default_rng(0)
+    total = int(minutes * 60 * RATE)
+    with open(path, 'wb') as f:
+        f.write(b'RIFF' + struct.pack('<I', 36 + total * 2) + b'WAVE')
+        f.write(b'fmt ' + struct.pack('<IHHIIHH', 16, 1, 1, RATE, RATE * 2, 2, 16))
+        f.write(b'data' + struct.pack('<I', total * 2))
+        escrito = 0
+        while escrito < total:
+            minuto = escrito / RATE / 60
+            if minuto % 20 >= 8:
+                largo = int(60 * RATE)  # ruido continuo
+                envolvente = np.full(largo, 0.2, dtype=np.float32)
+            else:
+                voz = int(rnd.uniform(1, 8) * RATE)
+                pausa = int(rnd.uniform(0.2, 1.5) * RATE)
+                largo = voz + pausa
+                envolvente = np.zeros(largo, dtype=np.float32)
+                envolvente[:voz] = 0.2
+            largo = min(largo, total - escrito)
+            senal = rnd.standard_normal(largo).astype(np.float32) * envolvente[:largo]
+            f.write((senal * 32767).astype('<i2').tobytes())
+            escrito += largo
+
+
+def medir(func):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = func()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, segundos, pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de transcripción por fragmentos de audio largo")
+    parser.add_argument('--wav', help="WAV a usar (por defecto sintéticos de --minutes)")
+    parser.add_argument('--minutes', type=float, nargs='+', default=[5, 20, 60])
+    parser.add_argument('--workers', type=int, default=4, help="Fragmentos en vuelo")
+    parser.add_argument('--format', default='opus', choices=['opus', 'flac', 'wav'])
+    parser.add_argument('--latency', type=float, default=0.5, help="Latencia simulada de cada petición (s)")
+    parser.add_argument('--api', action='store_true', help="Transcribir con la API real")
+    parser.add_argument('--model', default='whisper-1')
+    parser.add_argument('--no-pydub', action='store_true', help="No medir la carga completa con pydub")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='workx_bench_long_')
+    try:
+        archivos = []
+        if args.wav:
+            archivos.append(args.wav)
+        else:
+            for minutos in args.minutes:
+                path = os.path.join(work_dir, f'largo_{minutos:g}min.wav')
+                escribir_wav_largo(path, minutos)
+                archivos.append(path)
+
+        for path in archivos:
+            if args.api:
+                from FileToText import AudioTranscriber
+                transcriptor = AudioTranscriber()
+            else:
+                transcriptor = transcriptor_local(args.latency)
+            largo = LongAudioTranscriber(transcriptor, max_workers=args.workers, audio_format=args.format)
+            segmentos, segundos, pico = medir(lambda: largo.transcribe(path, args.model))
+            fragmentos = len({s['text'].split()[0] for s in segmentos}) if not args.api else len(segmentos)
+            print(f"{os.path.basename(path)} ({os.path.getsize(path) / 1e6:.0f} MB):")
+            print(f"  long_audio          pico {pico / 1e6:7.1f} MB   {segundos:7.2f} s   {fragmentos} fragmentos")
+            if not args.api:
+                cliente = transcriptor.client
+                print(f"                      {cliente.peticiones} peticiones, "
+                      f"{cliente.bytes / max(1, cliente.peticiones) / 1e6:.2f} MB de media por fragmento")
+            if not args.no_pydub:
+                from pydub import AudioSegment
+                _, segundos, pico = medir(lambda: AudioSegment.from_wav(path))
+                print(f"  pydub (solo cargar) pico {pico / 1e6:7.1f} MB   {segundos:7.2f} s")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Benchmark de la codificación de subida de un WAV a la API de transcripción:
+- antes: pydub decodifica el WAV y exporta MP3 estéreo a 192 kbps (otro ffmpeg, a 44.1 kHz)
+- después: speech_encoder (mono 16 kHz con NumPy + Opus/FLAC por pipe de ffmpeg, o WAV sin ffmpeg)
+
+Mide tiempo de codificación, tamaño y tiempo de subida estimado con el ancho de banda indicado.
+Con --api (y OPENAI_API_KEY) transcribe además cada variante y mide la latencia total.
+
+Uso:
+    python bench_upload_encoding.py                     # WAV sintético float32 estéreo de 60 s
+    python bench_upload_encoding.py --wav grabacion.wav --api
+    python bench_upload_encoding.py --seconds 300 --mbps 5
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+from pydub import AudioSegment
+import speech_encoder
+from bench_audio_vad import escribir_wav
+
+
+def antes(wav: str):
+    buffer = io.BytesIO()
+    AudioSegment.from_wav(wav).export(buffer, format="mp3", bitrate="192k")
+    return "mp3", buffer.getvalue()
+
+
+def transcribir(client, nombre: str, datos: bytes) -> float:
+    inicio = time.perf_counter()
+    client.audio.transcriptions.create(model="whisper-1", file=(nombre, datos), response_format="text")
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la codificación de subida (MP3 vs Opus/FLAC 16 kHz)")
+    parser.add_argument('--wav', help="WAV a usar (por defecto uno sintético)")
+    parser.add_argument('--seconds', type=float, default=60.0, help="Duración del WAV sintético")
+    parser.add_argument('--int16', action='store_true', help="WAV sintético int16 mono en lugar de float32 estéreo")
+    parser.add_argument('--mbps', type=float, default=10.0, help="Ancho de banda de subida para estimar la latencia")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--api', action='store_true', help="Transcribir cada variante con whisper-1")
+    args = parser.parse_args()
+
+    client = None
+    if args.api:
+        from openai import OpenAI
+        client = OpenAI()
+
+    work_dir = tempfile.mkdtemp(prefix='workx_bench_upload_')
+    try:
+        wav = os.path.join(work_dir, 'bench.wav')
+        if args.wav:
+            shutil.copy(args.wav, wav)
+        else:
+            escribir_wav(wav, args.seconds, float32=not args.int16)
+        print(f"WAV: {os.path.getsize(wav) / 1e6:.1f} MB, subida estimada a {args.mbps:g} Mbps\n")
+
+        variantes = [('MP3 192k (pydub)', antes)] + [
+            (f"{fmt} 16 kHz mono", lambda path, fmt=fmt: speech_encoder.encode_speech(path, fmt))
+            for fmt in ('opus', 'flac', 'wav')
+        ]
+        for nombre, func in variantes:
+            tiempos = []
+            for _ in range(args.runs):
+                inicio = time.perf_counter()
+                extension, datos = func(wav)
+                tiempos.append(time.perf_counter() - inicio)
+            tiempos.sort()
+            codificar = tiempos[len(tiempos) // 2]
+            subir = len(datos) * 8 / (args.mbps * 1e6)
+            linea = (f"  {nombre:<20} .{extension:<5} {len(datos) / 1e6:7.2f} MB   codificar {codificar:6.2f} s"
+                     f"   subir ~{subir:6.2f} s   total ~{codificar + subir:6.2f} s")
+            if client is not None:
+                linea += f"   API {transcribir(client, f'bench.{extension}', datos) + codificar:6.2f} s"
+            print(linea)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
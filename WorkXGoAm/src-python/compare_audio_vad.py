@@ -0,0 +1,130 @@
+"""
+Comparación de audio_vad con pydub: nonsilent_ranges e is_silent frente a detect_nonsilent
+(y el veredicto de silencio de AudioTranscriber) sobre WAV sintéticos de 8, 16, 24 y 32 bits,
+float32, mono y estéreo, con niveles y pausas justo en los límites de los umbrales.
+Los rangos deben coincidir exactamente; sale con código 1 si algún caso difiere.
+
+Uso:
+    python compare_audio_vad.py
+    python compare_audio_vad.py --wav grabacion.wav
+    python compare_audio_vad.py --threshold -40 --min-silence 500
+"""
+
+import os
+import sys
+import struct
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+from pydub import AudioSegment
+from pydub.silence import detect_nonsilent
+import audio_vad
+
+MIN_AUDIO_LENGTH = 0.5  # segundos; igual que AudioAsset
+
+
+def nivel(dbfs: float) -> float:
+    """Amplitud RMS (fracción de fondo de escala) de un ruido a dbfs."""
+    return 10 ** (dbfs / 20)
+
+
+def casos():
+    """
+    (nombre, bits, canales, frecuencia, tramos): cada tramo es (milisegundos, dBFS RMS o None para
+    silencio digital). Los niveles cerca de -50 y las pausas de 299/300/301 ms prueban los bordes.
+    """
+    voz = [(150, None), (700, -20), (299, None), (400, -35), (300, None), (500, -10), (301, None), (600, -25)]
+    # Ráfagas largas: pydub une los silencios separados por menos de min_silence_len de inicios con sonido
+    borde = [(200, None), (1500, -50.5), (400, None), (1500, -49.5), (400, None), (1500, -50.0), (200, None)]
+    return [
+        ('int16 mono 44.1 kHz', 16, 1, 44100, voz),
+        ('int16 estéreo 48 kHz', 16, 2, 48000, voz),
+        ('int16 mono nivel en el umbral', 16, 1, 16000, borde),
+        ('uint8 mono 8 kHz', 8, 1, 8000, voz),
+        ('uint8 mono nivel en el umbral', 8, 1, 22050, borde),
+        ('int24 mono 44.1 kHz', 24, 1, 44100, voz),
+        ('int24 estéreo nivel en el umbral', 24, 2, 48000, borde),
+        ('int32 mono 16 kHz', 32, 1, 16000, voz),
+        ('float32 estéreo 44.1 kHz', 'f32', 2, 44100, voz),
+        ('float32 mono nivel en el umbral', 'f32', 1, 16000, borde),
+        ('int16 silencio digital', 16, 1, 16000, [(3000, None)]),
+        ('int16 ruido bajo el umbral', 16, 2, 44100, [(3000, -60)]),
+        ('int16 más corto que MIN_AUDIO_LENGTH', 16, 1, 16000, [(400, -10)]),
+        ('int16 más corto que la ventana', 16, 1, 16000, [(250, None)]),
+    ]
+
+
+def escribir_wav(path: str, bits, canales: int, rate: int, tramos):
+    """WAV PCM (8 bits sin signo, 16/24/32 con signo) o float32 con los tramos indicados."""
+    rnd = np.random.default_rng(0)
+    partes = []
+    for ms, dbfs in tramos:
+        n = rate * ms // 1000
+        if dbfs is None:
+            partes.append(np.zeros((n, canales)))
+        else:
+            partes.append(rnd.standard_normal((n, canales)) * nivel(dbfs))
+    senal = np.clip(np.concatenate(partes), -1.0, 1.0 - 2 ** -31)
+
+    if bits == 'f32':
+        datos, ancho, formato = senal.astype('<f4').tobytes(), 4, 3
+    elif bits == 8:
+        datos, ancho, formato = np.round(senal * 128 + 128).clip(0, 255).astype('u1').tobytes(), 1, 1
+    elif bits == 24:
+        enteros = np.round(senal * 2 ** 23).clip(-2 ** 23, 2 ** 23 - 1).astype('<i4')
+        datos, ancho, formato = enteros.view('u1').reshape(-1, 4)[:, :3].tobytes(), 3, 1
+    else:
+        escala = 2 ** (bits - 1)
+        tipo = {16: '<i2', 32: '<i4'}[bits]
+        datos, ancho, formato = np.round(senal * escala).clip(-escala, escala - 1).astype(tipo).tobytes(), bits // 8, 1
+    bloque = canales * ancho
+    with open(path, 'wb') as f:
+        f.write(b'RIFF' + struct.pack('<I', 36 + len(datos)) + b'WAVE')
+        f.write(b'fmt ' + struct.pack('<IHHIIHH', 16, formato, canales, rate, rate * bloque, bloque, ancho * 8))
+        f.write(b'data' + struct.pack('<I', len(datos)) + datos)
+
+
+def comparar(nombre: str, wav: str, threshold: float, min_silence: int) -> bool:
+    audio = AudioSegment.from_wav(wav)
+    esperado = detect_nonsilent(audio, min_silence_len=min_silence, silence_thresh=threshold)
+    silencio_esperado = audio.duration_seconds < MIN_AUDIO_LENGTH or not esperado
+
+    obtenido = audio_vad.nonsilent_ranges(wav, min_silence, threshold)
+    silencio = audio_vad.is_silent(wav, threshold, min_silence, MIN_AUDIO_LENGTH)
+
+    ok = [list(r) for r in esperado] == obtenido and silencio == silencio_esperado
+    print(f"  {'ok  ' if ok else 'MAL '} {nombre:<36} {len(obtenido):3d} rangos   silencio {silencio}")
+    if not ok:
+        print(f"        pydub:     {esperado}   silencio {silencio_esperado}")
+        print(f"        audio_vad: {obtenido}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paridad de audio_vad con pydub.silence.detect_nonsilent")
+    parser.add_argument('--wav', help="Comparar solo este WAV")
+    parser.add_argument('--threshold', type=float, default=-50, help="silence_thresh en dBFS")
+    parser.add_argument('--min-silence', type=int, default=300, help="min_silence_len en ms")
+    args = parser.parse_args()
+
+    if args.wav:
+        return 0 if comparar(os.path.basename(args.wav), args.wav, args.threshold, args.min_silence) else 1
+
+    work_dir = tempfile.mkdtemp(prefix='workx_vad_parity_')
+    try:
+        ok = True
+        for i, (nombre, bits, canales, rate, tramos) in enumerate(casos()):
+            wav = os.path.join(work_dir, f'caso{i:02d}.wav')
+            escribir_wav(wav, bits, canales, rate, tramos)
+            ok = comparar(nombre, wav, args.threshold, args.min_silence) and ok
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print("\nTodos los casos coinciden" if ok else "\nHay casos que difieren")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
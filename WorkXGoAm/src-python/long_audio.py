@@ -0,0 +1,370 @@
+"""
+Long Audio - Transcripción por fragmentos de grabaciones largas con memoria acotada.
+
+- El WAV se recorre mapeado en memoria (audio_vad), ventana a ventana: para cada fragmento solo
+  se analiza el tramo donde puede caer el corte y se corta en la pausa más cercana a la duración ideal.
+- Cada fragmento se codifica a Opus 16 kHz mono (speech_encoder) justo antes de subirlo; como mucho
+  hay max_workers fragmentos en vuelo, así que la memoria no depende de la duración del archivo.
+- Con varios modelos el archivo se planifica y cada fragmento se codifica una sola vez: los mismos
+  bytes se envían a todos los modelos en paralelo.
+- Si no hay pausa donde cortar, el siguiente fragmento repite unos segundos del anterior y al unir
+  se descartan los segmentos y palabras repetidos.
+- Otros formatos (MP3...) se transcriben con VideoTranscriber (ffmpeg silencedetect + extracción por tramos).
+"""
+
+import re
+import time
+import concurrent.futures
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import audio_vad
+import speech_encoder
+
+
+class ChunkTranscriptionError(Exception):
+    """
+    Fragmentos que siguieron fallando tras los reintentos. La transcripción queda incompleta, así que
+    no se devuelve como texto; segments tiene lo transcrito del resto por si el llamador lo necesita.
+    """
+
+    def __init__(self, failed: List[dict], segments: List[dict]):
+        self.failed = failed        # [{'index', 'start', 'end', 'error'}] en orden
+        self.segments = segments
+        detail = "; ".join(f"{f['start']:.1f}-{f['end']:.1f}s: {f['error']}" for f in failed[:3])
+        super().__init__(f"{len(failed)} fragmento(s) sin transcribir ({detail})")
+
+
+def transcribe_for_models(payloads: List[tuple], models: List[str], transcribe_payload: Callable,
+                          executor: concurrent.futures.Executor) -> Dict[str, Union[List[tuple], Exception]]:
+    """
+    Envía los mismos payloads ya codificados a cada modelo (un modelo por tarea de executor).
+
+    Args:
+        payloads: Lista de (fragmento, datos) de un mismo tramo
+        models: Modelos de transcripción
+        transcribe_payload: Función (fragmento, datos, modelo) -> segmentos
+        executor: Pool para las peticiones (distinto del que codifica, para no bloquearlo)
+
+    Returns:
+        Diccionario modelo -> [(fragmento, segmentos), ...], o la excepción si alguna petición de ese modelo falló
+    """
+    futures = {
+        model: executor.submit(
+            lambda model=model: [(part, transcribe_payload(part, data, model)) for part, data in payloads]
+        )
+        for model in models
+    }
+    results = {}
+    for model, future in futures.items():
+        try:
+            results[model] = future.result()
+        except Exception as e:
+            results[model] = e
+    return results
+
+
+@dataclass
+class Chunk:
+    """Fragmento [start, end) en segundos; el audio subido empieza overlap segundos antes."""
+    index: int
+    start: float
+    end: float
+    overlap: float = 0.0
+
+    @property
+    def audio_start(self) -> float:
+        return max(0.0, self.start - self.overlap)
+
+
+class LongAudioTranscriber:
+    """
+    Transcribe un archivo largo por fragmentos en paralelo usando el cliente y los umbrales
+    de un AudioTranscriber. Devuelve segmentos {'start', 'end', 'text'} con tiempos absolutos.
+    """
+
+    TARGET_CHUNK_SECONDS = 300     # duración ideal de cada fragmento
+    MAX_CHUNK_SECONDS = 600        # nunca más largo que esto aunque no haya pausas
+    OVERLAP_SECONDS = 2.0          # audio repetido cuando se corta sin pausa
+    OVERLAP_MAX_WORDS = 20         # palabras comparadas al quitar la repetición
+    MIN_OVERLAP_WORDS = 2          # una sola palabra igual no se considera repetición
+    API_LIMIT_MB = 24              # límite de la API: 25 MB (se deja margen)
+    FRAME_MS = 10
+    MAX_RETRIES = 2
+
+    def __init__(self, transcriber, max_workers: int = 4, audio_format: str = "opus"):
+        """
+        Args:
+            transcriber: AudioTranscriber (cliente de OpenAI, umbrales de silencio y modelos)
+            max_workers: Fragmentos transcritos (y en memoria) a la vez
+            audio_format: Formato de subida de speech_encoder ('opus', 'flac' o 'wav')
+        """
+        self.transcriber = transcriber
+        self.client = transcriber.client
+        self.max_workers = max(1, max_workers)
+        self.audio_format = audio_format
+
+    # ==========================
+    # Planificación de fragmentos
+    # ==========================
+    def _speech(self, pcm: audio_vad.PcmData, start: float, end: float) -> List[List[int]]:
+        """Regiones con voz de [start, end) en ms relativos a start."""
+        features = audio_vad.frame_features(pcm, self.FRAME_MS, start, end)
+        return audio_vad.speech_regions(
+            None,
+            silence_thresh=self.transcriber.SILENCE_THRESHOLD,
+            min_silence_len=self.transcriber.MIN_SILENCE_LENGTH,
+            frame_ms=self.FRAME_MS,
+            features=features
+        )
+
+    def _find_cut(self, pcm: audio_vad.PcmData, start: float) -> Optional[float]:
+        """
+        Centro de la pausa más cercana a start + TARGET_CHUNK_SECONDS dentro de
+        [start + TARGET / 2, start + MAX]; None si en ese tramo no hay ninguna pausa.
+        """
+        low = start + self.TARGET_CHUNK_SECONDS / 2
+        high = start + self.MAX_CHUNK_SECONDS
+        ideal = start + self.TARGET_CHUNK_SECONDS
+        regions = self._speech(pcm, low, high)
+        if not regions:
+            return ideal  # todo el tramo es silencio
+        window_ms = int(round((high - low) * 1000))
+        edges = [0] + [edge for region in regions for edge in region] + [window_ms]
+        # Huecos entre regiones (speech_regions ya une las pausas más cortas que MIN_SILENCE_LENGTH)
+        pauses = [(a, b) for a, b in zip(edges[::2], edges[1::2])
+                  if b - a >= self.transcriber.MIN_SILENCE_LENGTH]
+        if not pauses:
+            return None
+        centers = [low + (a + b) / 2000 for a, b in pauses]
+        return min(centers, key=lambda c: abs(c - ideal))
+
+    def plan_chunks(self, pcm: audio_vad.PcmData) -> Iterator[Chunk]:
+        """Genera los fragmentos en orden mientras recorre el archivo (no hace falta el plan completo)."""
+        duration = pcm.frames / pcm.sample_rate
+        start, overlap, index = 0.0, 0.0, 0
+        while duration - start > 0.05:
+            if duration - start <= self.MAX_CHUNK_SECONDS:
+                end, next_overlap = duration, 0.0
+            else:
+                cut = self._find_cut(pcm, start)
+                if cut is None:
+                    end, next_overlap = start + self.MAX_CHUNK_SECONDS, self.OVERLAP_SECONDS
+                else:
+                    end, next_overlap = cut, 0.0
+            yield Chunk(index, start, end, overlap)
+            start, overlap, index = end, next_overlap, index + 1
+
+    # ==========================
+    # Transcripción de un fragmento
+    # ==========================
+    def _request(self, filename: str, data: bytes, model: str, language: Optional[str],
+                 prompt: Optional[str]):
+        # whisper-1 devuelve segmentos con tiempos; los modelos gpt-4o solo texto (un segmento por fragmento)
+        response_format = "verbose_json" if model == self.transcriber.WHISPER_1 else "json"
+        params = {"model": model, "file": (filename, data), "response_format": response_format}
+        if language:
+            params["language"] = language
+        if prompt and model == self.transcriber.GPT4O_MINI_TRANSCRIBE:
+            params["prompt"] = prompt
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                return self.client.audio.transcriptions.create(**params)
+            except Exception:
+                if attempt == self.MAX_RETRIES:
+                    raise
+                time.sleep(2 ** attempt)
+
+    def encode_chunk(self, pcm: audio_vad.PcmData, chunk: Chunk) -> List[Tuple[Chunk, Optional[tuple]]]:
+        """
+        Codifica un fragmento una sola vez para todos los modelos.
+
+        Returns:
+            Lista de (fragmento, (nombre de archivo, bytes)) o (fragmento, None) si no tiene voz;
+            más de uno si hubo que partirlo
+        """
+        if not self._speech(pcm, chunk.audio_start, chunk.end):
+            return [(chunk, None)]
+        extension, data = speech_encoder.encode_speech(pcm, self.audio_format, chunk.audio_start, chunk.end)
+        if len(data) > self.API_LIMIT_MB * 1024 * 1024:
+            # Demasiado grande para la API (p. ej. WAV sin ffmpeg): partir por la mitad con solapamiento
+            del data
+            middle = (chunk.start + chunk.end) / 2
+            first = Chunk(chunk.index, chunk.start, middle, chunk.overlap)
+            second = Chunk(chunk.index, middle, chunk.end, self.OVERLAP_SECONDS)
+            return self.encode_chunk(pcm, first) + self.encode_chunk(pcm, second)
+        return [(chunk, (f"chunk{chunk.index:04d}.{extension}", data))]
+
+    def transcribe_payload(self, chunk: Chunk, payload: Optional[tuple], model: str,
+                           language: Optional[str], prompt: Optional[str]) -> List[dict]:
+        """Transcribe un fragmento ya codificado con un modelo. Devuelve segmentos con tiempos absolutos."""
+        if payload is None:
+            return []
+        filename, data = payload
+        result = self._request(filename, data, model, language, prompt)
+        offset = chunk.audio_start
+        segments = getattr(result, "segments", None)
+        if segments:
+            return [
+                {
+                    "start": offset + float(getattr(s, "start", 0.0)),
+                    "end": min(chunk.end, offset + float(getattr(s, "end", 0.0))),
+                    "text": getattr(s, "text", "").strip()
+                }
+                for s in segments if getattr(s, "text", "").strip()
+            ]
+        text = getattr(result, "text", result if isinstance(result, str) else "")
+        text = (text or "").strip()
+        if self.transcriber.is_empty_transcription(text):
+            return []
+        return [{"start": chunk.start, "end": chunk.end, "text": text}]
+
+    # ==========================
+    # Unión
+    # ==========================
+    @staticmethod
+    def _normalize(word: str) -> str:
+        return re.sub(r"\W+", "", word.lower())
+
+    def _drop_repeated_words(self, previous: str, text: str) -> str:
+        """Quita del inicio de text las palabras con las que termina previous (audio solapado)."""
+        tail = [self._normalize(w) for w in previous.split()[-self.OVERLAP_MAX_WORDS:]]
+        words = text.split()
+        head = [self._normalize(w) for w in words[:self.OVERLAP_MAX_WORDS]]
+        for k in range(min(len(tail), len(head)), self.MIN_OVERLAP_WORDS - 1, -1):
+            if tail[-k:] == head[:k]:
+                return " ".join(words[k:])
+        return text
+
+    def merge(self, parts: List[Tuple[Chunk, List[dict]]]) -> List[dict]:
+        """Une los segmentos en orden; en fragmentos solapados descarta lo ya transcrito."""
+        merged = []
+        for chunk, segments in parts:
+            if chunk.overlap > 0 and merged:
+                # Segmentos que terminan dentro del solapamiento ya están en el fragmento anterior
+                segments = [s for s in segments if s["end"] > chunk.start + 0.05]
+                if segments:
+                    previous = " ".join(s["text"] for s in merged[-3:])
+                    text = self._drop_repeated_words(previous, segments[0]["text"])
+                    segments = ([dict(segments[0], text=text)] if text else []) + segments[1:]
+            merged.extend(segments)
+        return merged
+
+    @staticmethod
+    def to_text(segments: List[dict]) -> str:
+        return "\n".join(segment["text"] for segment in segments)
+
+    # ==========================
+    # Archivo completo
+    # ==========================
+    def transcribe(self, audio_path: str, model: str, language: Optional[str] = None,
+                   prompt: Optional[str] = None, verbose: bool = False) -> List[dict]:
+        """
+        Transcribe un archivo largo.
+
+        Args:
+            audio_path: Ruta al WAV (otros formatos van por VideoTranscriber)
+            model: Modelo de transcripción
+            language: Código de idioma opcional
+            prompt: Prompt opcional (solo GPT-4o Mini Transcribe)
+            verbose: Si se deben mostrar mensajes de progreso
+
+        Returns:
+            Lista ordenada de segmentos {'start', 'end', 'text'}
+
+        Raises:
+            ChunkTranscriptionError: Si algún fragmento sigue fallando tras MAX_RETRIES reintentos
+        """
+        result = self.transcribe_models(audio_path, [model], language=language, prompt=prompt, verbose=verbose)[model]
+        if isinstance(result, ChunkTranscriptionError):
+            raise result
+        return result
+
+    def transcribe_models(self, audio_path: str, models: List[str], language: Optional[str] = None,
+                          prompt: Optional[str] = None,
+                          verbose: bool = False) -> Dict[str, Union[List[dict], ChunkTranscriptionError]]:
+        """
+        Transcribe un archivo largo con varios modelos en una sola pasada: el plan se calcula y cada
+        fragmento se codifica una vez, y los mismos bytes se envían a todos los modelos.
+
+        Args:
+            audio_path: Ruta al WAV (otros formatos van por VideoTranscriber)
+            models: Modelos de transcripción
+            language: Código de idioma opcional
+            prompt: Prompt opcional (solo GPT-4o Mini Transcribe)
+            verbose: Si se deben mostrar mensajes de progreso
+
+        Returns:
+            Diccionario modelo -> segmentos ordenados, o ChunkTranscriptionError si alguno de
+            sus fragmentos siguió fallando tras MAX_RETRIES reintentos
+        """
+        try:
+            pcm = audio_vad.load_pcm(audio_path)
+        except ValueError:
+            from VideoToText import VideoTranscriber
+            return VideoTranscriber(transcriber=self.transcriber).transcribe_video_models(
+                audio_path, models, language=language, prompt=prompt,
+                max_workers=self.max_workers, verbose=verbose
+            )
+
+        start_time = time.time()
+        results = {model: {} for model in models}
+        failed = {model: [] for model in models}
+
+        def process(chunk: Chunk, requests: concurrent.futures.Executor) -> dict:
+            payloads = self.encode_chunk(pcm, chunk)
+            return transcribe_for_models(
+                payloads, models,
+                lambda part, data, model: self.transcribe_payload(part, data, model, language, prompt),
+                requests
+            )
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor, \
+                    concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers * len(models)) as requests:
+                pending = {}
+
+                def collect(done):
+                    for future in done:
+                        chunk = pending.pop(future)
+                        try:
+                            by_model = future.result()
+                        except Exception as e:
+                            by_model = {model: e for model in models}  # falló la codificación
+                        for model, result in by_model.items():
+                            if isinstance(result, Exception):
+                                # Sin texto de error en la transcripción: el fragmento se informa aparte
+                                failed[model].append({"index": chunk.index, "start": chunk.start,
+                                                      "end": chunk.end, "error": str(result)})
+                                if verbose:
+                                    print(f"✗ Error en fragmento {chunk.index + 1} "
+                                          f"({chunk.start:.1f}-{chunk.end:.1f}s) con {model}: {str(result)}")
+                            else:
+                                results[model][chunk.index] = result
+                                if verbose:
+                                    print(f"✓ Fragmento {chunk.index + 1} ({chunk.start:.1f}-{chunk.end:.1f}s) "
+                                          f"con {model} en {time.time() - start_time:.2f}s")
+
+                # El plan se genera mientras se transcribe; nunca más de max_workers fragmentos en vuelo
+                for chunk in self.plan_chunks(pcm):
+                    if len(pending) >= self.max_workers:
+                        done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                        collect(done)
+                    pending[executor.submit(process, chunk, requests)] = chunk
+                collect(concurrent.futures.wait(pending).done)
+        finally:
+            pcm.close()
+
+        if verbose:
+            print(f"Transcripción con {len(models)} modelo(s) completada en {time.time() - start_time:.2f} segundos")
+        transcriptions = {}
+        for model in models:
+            segments = self.merge([part for index in sorted(results[model]) for part in results[model][index]])
+            if failed[model]:
+                transcriptions[model] = ChunkTranscriptionError(
+                    sorted(failed[model], key=lambda f: f["index"]), segments
+                )
+            else:
+                transcriptions[model] = segments
+        return transcriptions
@@ -0,0 +1,171 @@
+"""
+Speech Encoder - Codifica un WAV para las APIs de voz: mezcla a mono y remuestreo a 16 kHz
+vectorizados con NumPy sobre el archivo mapeado (audio_vad.load_pcm), y Opus/FLAC por un pipe
+de ffmpeg (PCM por stdin, archivo por stdout). Nada pasa por disco y la memoria no depende de
+la duración: el PCM se genera y se envía por bloques.
+"""
+
+import io
+import os
+import wave
+import threading
+import subprocess
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from audio_vad import PcmData, load_pcm
+
+SAMPLE_RATE = 16000            # las APIs de voz trabajan a 16 kHz mono
+OPUS_BITRATE = "24k"           # suficiente para voz a 16 kHz mono
+OPUS_COMPLEXITY = "0"          # 3 veces más rápido que el 10 por defecto y ~12% más grande
+BLOCK_SECONDS = 10             # segundos de salida generados por bloque
+FILTER_ZERO_CROSSINGS = 8      # lóbulos del sinc a cada lado (calidad del filtro antialias)
+
+FORMATS = {
+    # formato: (extensión para la API, argumentos de ffmpeg)
+    "opus": ("ogg", ["-c:a", "libopus", "-b:a", OPUS_BITRATE, "-application", "voip",
+                      "-compression_level", OPUS_COMPLEXITY, "-f", "ogg"]),
+    "flac": ("flac", ["-c:a", "flac", "-sample_fmt", "s16", "-f", "flac"]),
+}
+
+
+def _lowpass(cutoff: float) -> np.ndarray:
+    """FIR sinc con ventana de Blackman; cutoff en ciclos por muestra de entrada (< 0.5)."""
+    half = int(np.ceil(FILTER_ZERO_CROSSINGS / (2 * cutoff)))
+    n = np.arange(-half, half + 1)
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.blackman(len(n))
+    return (taps / taps.sum()).astype(np.float32)
+
+
+def output_rate(pcm: PcmData) -> int:
+    """16 kHz, o la frecuencia original si ya es menor (no se remuestrea hacia arriba)."""
+    return min(SAMPLE_RATE, pcm.sample_rate)
+
+
+def pcm16_blocks(pcm: PcmData, start: float = 0.0, end: Optional[float] = None) -> Iterator[bytes]:
+    """
+    PCM s16le mono a output_rate(pcm) del intervalo [start, end) en segundos, por bloques de BLOCK_SECONDS.
+
+    Cada bloque lee del archivo solo los frames que necesita (más el margen del filtro), así que
+    la memoria es la misma para 10 segundos que para 3 horas.
+    """
+    rate_in = pcm.sample_rate
+    rate_out = output_rate(pcm)
+    total_in = pcm.frames
+    end = total_in / rate_in if end is None else min(end, total_in / rate_in)
+    first_out = int(round(start * rate_out))
+    last_out = int(round(end * rate_out))
+    step = rate_in / rate_out
+    taps = _lowpass(0.45 / step) if rate_out < rate_in else None
+    half = len(taps) // 2 if taps is not None else 0
+
+    block_out = BLOCK_SECONDS * rate_out
+    for n0 in range(first_out, last_out, block_out):
+        n1 = min(last_out, n0 + block_out)
+        if taps is None:
+            mono = pcm.block(n0, n1).mean(axis=1)
+        else:
+            positions = np.arange(n0, n1) * step
+            index = positions.astype(np.int64)
+            # Frames de entrada necesarios: los de la interpolación más medio filtro a cada lado
+            a = int(index[0]) - half
+            b = int(index[-1]) + 2 + half
+            lo, hi = max(a, 0), min(b, total_in)
+            mono = np.zeros(b - a, dtype=np.float32)
+            if hi > lo:
+                mono[lo - a:hi - a] = pcm.block(lo, hi).mean(axis=1)
+            filtered = np.convolve(mono, taps, mode='valid')  # filtered[i] corresponde al frame a + half + i
+            # Interpolación lineal en float32 (np.interp convierte todo el bloque a float64)
+            index -= a + half
+            fraction = (positions - positions.astype(np.int64)).astype(np.float32)
+            mono = filtered[index] + (filtered[index + 1] - filtered[index]) * fraction
+        yield (np.clip(mono, -1.0, 1.0) * 32767).round().astype('<i2').tobytes()
+
+
+def _wav_bytes(pcm: PcmData, start: float, end: Optional[float]) -> bytes:
+    """WAV 16 kHz mono en memoria (sin ffmpeg): más grande que Opus/FLAC pero sin codificar."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(output_rate(pcm))
+        for block in pcm16_blocks(pcm, start, end):
+            w.writeframes(block)
+    return buffer.getvalue()
+
+
+def _ffmpeg_encode(pcm: PcmData, audio_format: str, start: float, end: Optional[float]) -> bytes:
+    """Envía el PCM por stdin de ffmpeg desde un hilo y lee el archivo codificado de stdout."""
+    _, codec_args = FORMATS[audio_format]
+    cmd = [
+        "ffmpeg", "-v", "error",
+        "-f", "s16le", "-ar", str(output_rate(pcm)), "-ac", "1", "-i", "pipe:0",
+        *codec_args,
+        "pipe:1"
+    ]
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+    )
+    feed_error = []
+
+    def feed():
+        try:
+            for block in pcm16_blocks(pcm, start, end):
+                proc.stdin.write(block)
+        except Exception as e:  # BrokenPipe si ffmpeg falla: el error real sale por stderr
+            feed_error.append(e)
+        finally:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    data = proc.stdout.read()  # leer mientras se escribe: sin esto el pipe se llena y se bloquean ambos
+    stderr = proc.stderr.read()
+    proc.wait()
+    feeder.join()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg falló codificando {audio_format}: {stderr.decode('utf-8', 'replace').strip()}")
+    if feed_error:
+        raise feed_error[0]
+    return data
+
+
+def encode_speech(audio, audio_format: str = "opus", start: float = 0.0,
+                  end: Optional[float] = None) -> Tuple[str, bytes]:
+    """
+    Codifica un WAV (o un tramo) a 16 kHz mono para subirlo a la API.
+
+    Args:
+        audio: Ruta a un WAV o PcmData ya mapeado
+        audio_format: 'opus' (más pequeño), 'flac' (sin pérdida) o 'wav' (sin codificar)
+        start: Segundo inicial del tramo
+        end: Segundo final del tramo (None: hasta el final)
+
+    Returns:
+        (extensión, bytes); con ffmpeg no disponible se devuelve WAV
+
+    Raises:
+        ValueError: Si el formato no existe o el WAV no se puede mapear (usar pydub en ese caso)
+    """
+    if audio_format not in FORMATS and audio_format != "wav":
+        raise ValueError(f"Formato no soportado: {audio_format}")
+    owned = not isinstance(audio, PcmData)
+    pcm = load_pcm(audio) if owned else audio
+    try:
+        if audio_format != "wav":
+            try:
+                return FORMATS[audio_format][0], _ffmpeg_encode(pcm, audio_format, start, end)
+            except FileNotFoundError:
+                pass  # ffmpeg no instalado: WAV en memoria
+        return "wav", _wav_bytes(pcm, start, end)
+    finally:
+        if owned:
+            pcm.close()
@@ -6,7 +6,7 @@ import threading
 import logging
 import re
 import json
-from typing import List, Set, Dict
+from typing import Callable, List, Optional, Set, Dict
 from datetime import datetime
 import heapq
 from collections import Counter
@@ -16,6 +16,12 @@ import argparse
 from FileToText import AudioTranscriber as FTTranscriber
 from dotenv import load_dotenv
 
+# Índice de transcripciones (módulo del servidor Flask; FileToText ya agregó su ruta)
+try:
+    from transcript_index import transcript_index
+except ImportError:
+    transcript_index = None
+
 # Cargar variables de entorno desde .env
 load_dotenv()
 
@@ -27,11 +33,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger('wav_monitor')
 
-# Configuración: monitor-dir obligatorio
-parser = argparse.ArgumentParser()
-parser.add_argument("--monitor-dir", dest="monitor_dir", type=str, required=True, help="Directorio a monitorear")
-args = parser.parse_args()
-MONITOR_DIR = args.monitor_dir
 CHECK_INTERVAL = 5  # Segundos entre cada comprobación
 FILETOTTEXT_SCRIPT = "FileToText.py"  # Nombre del script principal
 CONTEXT_INTERVAL = 60  # Segundos entre actualizaciones de contexto
@@ -50,21 +51,27 @@ class ContextGenerator:
     Genera y actualiza un archivo de contexto basado en las transcripciones más recientes.
     """
     
-    def __init__(self, directory: str):
+    def __init__(self, directory: str, client: Optional[openai.OpenAI] = None):
         """
         Inicializa el generador de contexto.
         
         Args:
             directory: Directorio donde se encuentran los archivos de transcripción.
+            client: Cliente de OpenAI compartido (si no se indica, se crea uno con API_KEY).
         """
         self.directory = directory
         self.context_file = os.path.join(directory, CONTEXT_FILE)
         self.summary_state_file = os.path.join(directory, SUMMARY_STATE_FILE)
         self.running = False
         self.thread = None
-        self.api_key = API_KEY
-        if self.api_key:
-            self.client = openai.OpenAI(api_key=self.api_key)
+        self._stop_event = threading.Event()
+        if client is not None:
+            self.api_key = client.api_key
+            self.client = client
+        else:
+            self.api_key = API_KEY
+            if self.api_key:
+                self.client = openai.OpenAI(api_key=self.api_key)
         logger.info(f"Generador de contexto inicializado para: {directory}")
     
     def get_most_recent_txt_files(self, count: int = 10) -> List[str]:
@@ -77,6 +84,15 @@ class ContextGenerator:
         Returns:
             Lista de rutas a los archivos TXT más recientes que contienen contenido.
         """
+        if transcript_index is not None:
+            try:
+                # El índice ya sabe qué archivos son silencio: no hace falta abrir cada TXT
+                transcript_index.sync_directory(self.directory)
+                recientes = transcript_index.latest(self.directory, limit=count, include_silence=False)
+                return [r['path'] for r in recientes if os.path.exists(r['path'])]
+            except Exception as e:
+                logger.warning(f"Índice de transcripciones no disponible, leyendo archivos: {str(e)}")
+
         txt_files = []
         for filename in os.listdir(self.directory):
             if filename.lower().endswith('.txt') and filename != CONTEXT_FILE and not filename.startswith('.'):
@@ -425,8 +441,8 @@ Genera un resumen conciso que capture progresivamente los aspectos importantes d
             except Exception as e:
                 logger.error(f"Error en el hilo de contexto: {str(e)}")
             
-            # Esperar hasta la próxima actualización
-            time.sleep(CONTEXT_INTERVAL)
+            # Esperar hasta la próxima actualización (stop() despierta la espera)
+            self._stop_event.wait(CONTEXT_INTERVAL)
     
     def start(self):
         """
@@ -437,6 +453,7 @@ Genera un resumen conciso que capture progresivamente los aspectos importantes d
             return
         
         self.running = True
+        self._stop_event.clear()
         self.thread = threading.Thread(
             target=self.context_thread_func,
             daemon=True
@@ -449,6 +466,7 @@ Genera un resumen conciso que capture progresivamente los aspectos importantes d
         Detiene el hilo de actualización de contexto.
         """
         self.running = False
+        self._stop_event.set()
         if self.thread is not None:
             self.thread.join(timeout=5)
             logger.info("Hilo de actualización de contexto detenido")
@@ -460,23 +478,30 @@ class WavProcessor:
     y los procesa automáticamente.
     """
     
-    def __init__(self, directory: str, check_interval: int = 5):
+    def __init__(self, directory: str, check_interval: int = 5,
+                 client: Optional[openai.OpenAI] = None,
+                 submit: Optional[Callable[[Callable, str], None]] = None):
         """
         Inicializa el monitor de archivos WAV.
         
         Args:
             directory: Directorio a monitorear.
             check_interval: Intervalo de tiempo entre comprobaciones (segundos).
+            client: Cliente de OpenAI compartido (por defecto se crea uno propio).
+            submit: Función submit(func, wav_file) para procesar en un pool compartido
+                    (por defecto, un hilo por archivo).
         """
         self.directory = os.path.abspath(directory)
         self.check_interval = check_interval
         self.processing_files = set()  # Archivos actualmente en procesamiento
         self.lock = threading.Lock()   # Para acceso seguro a processing_files
+        self._submit = submit
+        self._stop_event = threading.Event()
         
         # Inicializar el generador de contexto
-        self.context_generator = ContextGenerator(self.directory)
+        self.context_generator = ContextGenerator(self.directory, client=client)
         # Inicializar transcriptor de FileToText como librería
-        self.ft_transcriber = FTTranscriber(api_key=API_KEY)
+        self.ft_transcriber = FTTranscriber(api_key=API_KEY, client=client)
         
         # Verificar que el directorio exista
         if not os.path.exists(self.directory):
@@ -580,19 +605,18 @@ class WavProcessor:
                 logger.warning(f"El archivo {base_name} ya está siendo procesado por otro hilo")
                 return
             
-            logger.info(f"Procesando: {base_name}")
-            
-            # Procesar WAV usando FileToText como librería
+            # Procesar WAV usando FileToText como librería; el asset lee el WAV una sola vez
+            # y codifica a Opus 16 kHz mono en memoria lo que se sube (sin MP3 junto al WAV)
             transcriber = self.ft_transcriber
-            audio_file = wav_file
-            mp3_file = None
-            if wav_file.lower().endswith('.wav'):
-                mp3_file = transcriber.convert_wav_to_mp3(wav_file)
-                audio_file = mp3_file
+            asset = transcriber.audio_asset(wav_file)
+
+            # Duración desde la caché de metadatos (cabecera WAV, sin decodificar)
+            audio_info = transcriber.get_audio_info(asset)
+            logger.info(f"Procesando: {base_name} ({audio_info.get('duración_segundos', 0):.1f}s)")
 
             # Transcribir con todos los modelos
             results = transcriber.transcribe_with_all_models(
-                audio_file,
+                asset,
                 language=LANGUAGE,
                 prompt=PROMPT
             )
@@ -607,17 +631,24 @@ class WavProcessor:
             else:
                 output_text = f"\n{optimized_text}\n"
 
-            # # Eliminar archivo MP3 temporal
-            # if mp3_file and os.path.exists(mp3_file):
-            #     try:
-            #         os.remove(mp3_file)
-            #     except:
-            #         pass
-
             # Guardar en archivo
             with open(output_file, 'w', encoding='utf-8') as f:
                 f.write(output_text)
 
+            # Indexar para búsqueda (texto optimizado y crudo de cada modelo)
+            if transcript_index is not None:
+                try:
+                    transcript_index.add(
+                        output_file,
+                        text=output_text,
+                        silence=optimized_text == transcriber.SILENCE_TAG,
+                        models=results,
+                        audio_path=wav_file,
+                        duration=audio_info.get('duración_segundos')
+                    )
+                except Exception as e:
+                    logger.warning(f"No se pudo indexar {os.path.basename(output_file)}: {str(e)}")
+
             logger.info(f"Archivo guardado: {os.path.basename(output_file)}")
             
         except Exception as e:
@@ -660,6 +691,11 @@ class WavProcessor:
                 if wav_file not in self.processing_files:
                     # Marcar como en procesamiento
                     self.processing_files.add(wav_file)
+
+                    if self._submit is not None:
+                        self._submit(self.process_wav_file, wav_file)
+                        logger.info(f"Encolado para procesar: {os.path.basename(wav_file)}")
+                        continue
                     
                     # Iniciar un hilo para procesar el archivo
                     thread = threading.Thread(
@@ -680,9 +716,11 @@ class WavProcessor:
             # Iniciar el hilo de actualización de contexto
             self.context_generator.start()
             
-            while True:
+            self._stop_event.clear()
+            while not self._stop_event.is_set():
                 self.check_and_process()
-                time.sleep(self.check_interval)
+                self._stop_event.wait(self.check_interval)
+            self.context_generator.stop()
                 
         except KeyboardInterrupt:
             logger.info("Monitoreo detenido por el usuario.")
@@ -691,10 +729,22 @@ class WavProcessor:
             logger.error(f"Error en el monitoreo: {str(e)}")
             self.context_generator.stop()
 
+    def stop_monitoring(self):
+        """
+        Detiene el bucle de start_monitoring (los archivos ya en proceso terminan solos).
+        """
+        self._stop_event.set()
+
 def main():
     """
     Función principal.
     """
+    # Configuración: monitor-dir obligatorio
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--monitor-dir", dest="monitor_dir", type=str, required=True, help="Directorio a monitorear")
+    args = parser.parse_args()
+    MONITOR_DIR = args.monitor_dir
+
     try:
         # Asegurarse de que el directorio existe
         if not os.path.exists(MONITOR_DIR):
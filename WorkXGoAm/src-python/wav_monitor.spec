@@ -2,7 +2,7 @@
 
 a = Analysis(
     ['wav_monitor.py'],
-    pathex=[],
+    pathex=['../flask_server'],
     binaries=[],
     datas=[],
     hiddenimports=[],
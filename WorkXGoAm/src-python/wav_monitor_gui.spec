@@ -2,7 +2,7 @@
 
 a = Analysis(
     ['wav_monitor_gui.py'],
-    pathex=[],
+    pathex=['../flask_server'],
     binaries=[],
     datas=[],
     hiddenimports=[],
@@ -1,8 +1,9 @@
-import { Component, OnInit } from '@angular/core';
+import { Component, OnDestroy, OnInit } from '@angular/core';
 import { CommonModule } from '@angular/common';
 import { RouterModule } from '@angular/router';
 import { ApiService } from '../services/api.service';
 import { invoke } from '@tauri-apps/api/core';
+import { Subscription } from 'rxjs';
 
 @Component({
   selector: 'app-home',
@@ -11,9 +12,12 @@ import { invoke } from '@tauri-apps/api/core';
   templateUrl: './home.component.html',
   styleUrls: ['./home.component.css']
 })
-export class HomeComponent implements OnInit {
+export class HomeComponent implements OnInit, OnDestroy {
   serverStatus = false;
-  private popupCheckTimer: any = null;
+  private uiStateSub: Subscription | null = null;
+  private popupRetryTimer: any = null;
+  private hideTimer: any = null;
+  private lastState: any = null;
   private lastShown = false;
   private hideDelayMs = 350;
 
@@ -24,6 +28,13 @@ export class HomeComponent implements OnInit {
     this.startPopupWatcher();
   }
 
+  ngOnDestroy(): void {
+    this.uiStateSub?.unsubscribe();
+    this.uiStateSub = null;
+    clearTimeout(this.popupRetryTimer);
+    clearTimeout(this.hideTimer);
+  }
+
   checkServerStatus(): void {
     this.apiService.checkHealth().subscribe(status => {
       this.serverStatus = status;
@@ -56,40 +67,47 @@ export class HomeComponent implements OnInit {
   }
 
   private startPopupWatcher(){
-    const tick = async () => {
-      try{
-        const s = (await this.apiService.getUiState().toPromise()) || { face_hover:false, popup_hover:false, face_rect:null };
-        const wantVisible = !!((s as any).face_hover || (s as any).popup_hover);
-        if (wantVisible){
-          let x: number | null = null;
-          let y: number | null = null;
-          const rect: any = (s as any).face_rect as any;
-          if (rect && Array.isArray(rect) && rect.length >= 4){
-            const fx = rect[0];
-            const fy = rect[1];
-            const fw = rect[2];
-            const fh = rect[3];
-            x = fx + fw + 18;
-            y = Math.max(0, Math.floor(fy - (540 - fh)/2));
-          }
-          try{ await invoke('show_floating_face_popup', { x, y }) } catch {}
-          this.lastShown = true;
-        } else if (this.lastShown) {
-          setTimeout(async ()=>{
-            try{
-              const s2 = (await this.apiService.getUiState().toPromise()) || { face_hover:false, popup_hover:false } as any;
-              if (!((s2 as any).face_hover || (s2 as any).popup_hover)){
-                try{ await invoke('hide_floating_face_popup') } catch {}
-                this.lastShown = false;
-              }
-            } catch{}
-          }, this.hideDelayMs);
+    if (this.uiStateSub) return;
+    this.uiStateSub = this.apiService.watchUiState().subscribe({
+      next: s => this.applyUiState(s),
+      error: () => {
+        // El servidor se cayó o cambió de puerto: reintentar la suscripción
+        this.uiStateSub = null;
+        this.popupRetryTimer = setTimeout(() => this.startPopupWatcher(), 1000);
+      }
+    });
+  }
+
+  private async applyUiState(s: any){
+    this.lastState = s;
+    const wantVisible = !!(s.face_hover || s.popup_hover);
+    if (wantVisible){
+      if (this.hideTimer){
+        clearTimeout(this.hideTimer);
+        this.hideTimer = null;
+      }
+      let x: number | null = null;
+      let y: number | null = null;
+      const rect: any = s.face_rect;
+      if (rect && Array.isArray(rect) && rect.length >= 4){
+        const fx = rect[0];
+        const fy = rect[1];
+        const fw = rect[2];
+        const fh = rect[3];
+        x = fx + fw + 18;
+        y = Math.max(0, Math.floor(fy - (540 - fh)/2));
+      }
+      try{ await invoke('show_floating_face_popup', { x, y }) } catch {}
+      this.lastShown = true;
+    } else if (this.lastShown && !this.hideTimer) {
+      this.hideTimer = setTimeout(async ()=>{
+        this.hideTimer = null;
+        const s2 = this.lastState || {};
+        if (!(s2.face_hover || s2.popup_hover)){
+          try{ await invoke('hide_floating_face_popup') } catch {}
+          this.lastShown = false;
         }
-      }catch{}
-      this.popupCheckTimer = setTimeout(tick, 150);
-    };
-    if (!this.popupCheckTimer){
-      this.popupCheckTimer = setTimeout(tick, 200);
+      }, this.hideDelayMs);
     }
   }
-} 
\ No newline at end of file
+}
@@ -4,6 +4,43 @@ import { Observable, of, from, throwError } from 'rxjs';
 import { catchError, map, switchMap } from 'rxjs/operators';
 import { invoke } from '@tauri-apps/api/core';
 
+export interface VideoThumbnailTile {
+  time: number;
+  sheet: string;
+  x: number;
+  y: number;
+  url?: string;
+}
+
+export interface VideoThumbnails {
+  key: string;
+  duration: number;
+  interval: number;
+  tile_width: number;
+  tile_height: number;
+  columns: number;
+  rows: number;
+  sheets: string[];
+  vtt: string;
+  tiles: VideoThumbnailTile[];
+}
+
+export interface BackgroundJob {
+  id: string;
+  kind: string;
+  status: 'queued' | 'running' | 'done' | 'error';
+  progress: number;
+  result: any;
+  error: string | null;
+}
+
+export interface VideoProxy {
+  state: 'ready' | 'pending';
+  key: string;
+  url: string;
+  job?: BackgroundJob;
+}
+
 @Injectable({
   providedIn: 'root'
 })
@@ -65,13 +102,187 @@ export class ApiService {
 
   /**
    * Corte de video
+   * mode: 'copy' (sin recodificar, inicio en keyframe), 'smart' (exacto al frame)
+   * o 'reencode' (exacto, recodifica todo el tramo en paralelo)
    */
-  cutVideo(input: string, start: string, end: string, output: string): Observable<any> {
+  cutVideo(input: string, start: string, end: string, output: string, mode: 'copy' | 'smart' | 'reencode' = 'copy'): Observable<any> {
     return this.getApiUrl().pipe(
       switchMap(baseUrl =>
         this.http.post<{ status: string; output?: string; message?: string }>(
           `${baseUrl}/video/cut`,
-          { input, start, end, output }
+          { input, start, end, output, mode }
+        )
+      )
+    );
+  }
+
+  /**
+   * Une clips en orden sin recodificar (solo los clips incompatibles se recodifican)
+   */
+  joinVideos(inputs: string[], output: string): Observable<any> {
+    return this.getApiUrl().pipe(
+      switchMap(baseUrl =>
+        this.http.post<{ status: string; output?: string; reencoded?: string[]; message?: string }>(
+          `${baseUrl}/video/join`,
+          { inputs, output }
+        )
+      )
+    );
+  }
+
+  /**
+   * URL para reproducir un video local servido por el backend (Range + GET condicional).
+   * Solo funciona con archivos dentro de los directorios permitidos por el servidor.
+   */
+  getVideoFileUrl(path: string): Observable<string> {
+    return this.getApiUrl().pipe(
+      map(baseUrl => `${baseUrl}/video/file?path=${encodeURIComponent(path)}`)
+    );
+  }
+
+  /**
+   * Sprite sheets de miniaturas para la línea de tiempo del cutter.
+   * Devuelve el mapa de tiles con las URLs absolutas de cada sprite.
+   */
+  getVideoThumbnails(input: string, interval: number = 10, maxTiles: number = 200): Observable<VideoThumbnails> {
+    return this.getApiUrl().pipe(
+      switchMap(baseUrl =>
+        this.http.post<{ status: string; base_url: string; data: VideoThumbnails }>(
+          `${baseUrl}/video/thumbnails`,
+          { input, interval, max_tiles: maxTiles }
+        ).pipe(
+          map(r => ({
+            ...r.data,
+            tiles: r.data.tiles.map(t => ({ ...t, url: `${baseUrl}${r.base_url}/${t.sheet}` }))
+          }))
+        )
+      )
+    );
+  }
+
+  /**
+   * Proxy de baja resolución para navegar videos grandes.
+   * Si aún no existe, el backend lo genera en segundo plano y devuelve el job a consultar.
+   */
+  requestVideoProxy(input: string, height: number = 540): Observable<VideoProxy> {
+    return this.getApiUrl().pipe(
+      switchMap(baseUrl =>
+        this.http.post<{ status: string; state: 'ready' | 'pending'; key: string; url: string; job?: BackgroundJob }>(
+          `${baseUrl}/video/proxy`,
+          { input, height }
+        ).pipe(
+          map(r => ({ state: r.state, key: r.key, url: `${baseUrl}${r.url}`, job: r.job }))
+        )
+      )
+    );
+  }
+
+  /**
+   * Cortes de escena sugeridos cerca de un tiempo (segundos o HH:MM:SS).
+   * La primera vez el índice se calcula en segundo plano: state='pending' con el job a consultar.
+   */
+  getSceneSuggestions(input: string, time?: number | string, window: number = 10, threshold: number = 0.3): Observable<{
+    state: 'ready' | 'pending';
+    suggestions?: { time: number; score: number; offset: number | null }[];
+    job?: BackgroundJob;
+  }> {
+    return this.getApiUrl().pipe(
+      switchMap(baseUrl =>
+        this.http.post<any>(`${baseUrl}/video/scenes`, { input, time, window, threshold })
+      )
+    );
+  }
+
+  /**
+   * Estado de un trabajo en segundo plano
+   */
+  getJob(jobId: string): Observable<BackgroundJob> {
+    return this.getApiUrl().pipe(
+      switchMap(baseUrl => this.http.get<{ status: string; job: BackgroundJob }>(`${baseUrl}/jobs/${jobId}`)),
+      map(r => r.job)
+    );
+  }
+
+  /**
+   * Encola la transcripción de un archivo de audio en el servidor (sin modelo = todos los modelos + optimización).
+   */
+  submitTranscription(path: string, options: { language?: string; prompt?: string; model?: string; output?: string } = {}): Observable<BackgroundJob> {
+    return this.getApiUrl().pipe(
+      switchMap(baseUrl => this.http.post<{ status: string; job: BackgroundJob }>(`${baseUrl}/transcription/submit`, { path, ...options })),
+      map(r => r.job)
+    );
+  }
+
+  /**
+   * Estado/resultado de un trabajo de transcripción.
+   */
+  getTranscriptionJob(jobId: string): Observable<BackgroundJob> {
+    return this.getApiUrl().pipe(
+      switchMap(baseUrl => this.http.get<{ status: string; job: BackgroundJob }>(`${baseUrl}/transcription/jobs/${jobId}`)),
+      map(r => r.job)
+    );
+  }
+
+  /**
+   * Inicia el monitoreo de WAVs de un directorio dentro del servidor (reemplaza lanzar wav_monitor.py).
+   */
+  startTranscriptionMonitor(directory: string, checkInterval = 5): Observable<any> {
+    return this.getApiUrl().pipe(
+      switchMap(baseUrl => this.http.post<{ status: string; monitor: any }>(`${baseUrl}/transcription/monitor/start`, { directory, check_interval: checkInterval })),
+      map(r => r.monitor)
+    );
+  }
+
+  /**
+   * Detiene el monitoreo de un directorio.
+   */
+  stopTranscriptionMonitor(directory: string): Observable<any> {
+    return this.getApiUrl().pipe(
+      switchMap(baseUrl => this.http.post(`${baseUrl}/transcription/monitor/stop`, { directory }))
+    );
+  }
+
+  /**
+   * Búsqueda de texto completo en las transcripciones (ordenada por relevancia, con snippet).
+   */
+  searchTranscripts(q: string, directory?: string, limit = 20, offset = 0): Observable<any[]> {
+    return this.getApiUrl().pipe(
+      switchMap(baseUrl => {
+        const params: any = { q, limit, offset };
+        if (directory) params.directory = directory;
+        return this.http.get<{ status: string; results: any[] }>(`${baseUrl}/transcripts/search`, { params });
+      }),
+      map(r => r.results)
+    );
+  }
+
+  /**
+   * Últimas transcripciones; para la página siguiente pasar el next_before recibido.
+   */
+  getLatestTranscripts(directory?: string, limit = 50, before?: number): Observable<{ items: any[]; next_before: number | null }> {
+    return this.getApiUrl().pipe(
+      switchMap(baseUrl => {
+        const params: any = { limit };
+        if (directory) params.directory = directory;
+        if (before != null) params.before = before;
+        return this.http.get<{ status: string; items: any[]; next_before: number | null }>(`${baseUrl}/transcripts/latest`, { params });
+      }),
+      map(r => ({ items: r.items, next_before: r.next_before }))
+    );
+  }
+
+  /**
+   * Picos de audio (formato binario WXPK) para dibujar la forma de onda.
+   */
+  getWaveform(input: string, bits: 8 | 16 = 8): Observable<{ meta: any; peaks: ArrayBuffer }> {
+    return this.getApiUrl().pipe(
+      switchMap(baseUrl =>
+        this.http.post<{ status: string; url: string; data: any }>(`${baseUrl}/audio/waveform`, { input, bits }).pipe(
+          switchMap(r =>
+            this.http.get(`${baseUrl}${r.url}`, { responseType: 'arraybuffer' }).pipe(
+              map(peaks => ({ meta: r.data, peaks }))
+            )
+          )
         )
       )
     );
@@ -89,4 +300,55 @@ export class ApiService {
       catchError(() => of({ face_hover: false, popup_hover: false, face_rect: null }))
     )
   }
+
+  /**
+   * Suscripción push al estado UI (Server-Sent Events): emite en cuanto cambia la versión del estado.
+   * EventSource reconecta solo y reenvía Last-Event-ID, así que no se pierden cambios.
+   */
+  watchUiState(): Observable<{ face_hover: boolean; popup_hover: boolean; face_rect: any; version: number }> {
+    return this.getApiUrl().pipe(
+      switchMap(baseUrl => new Observable<{ face_hover: boolean; popup_hover: boolean; face_rect: any; version: number }>(subscriber => {
+        const source = new EventSource(`${baseUrl}/ui/state/stream`);
+        source.addEventListener('state', (event: MessageEvent) => {
+          try {
+            subscriber.next(JSON.parse(event.data));
+          } catch {}
+        });
+        source.onerror = () => {
+          if (source.readyState === EventSource.CLOSED) {
+            subscriber.error(new Error('UI state stream cerrado'));
+          }
+        };
+        return () => source.close();
+      }))
+    );
+  }
+
+  /**
+   * Suscripción a eventos del bus del servidor (Server-Sent Events).
+   * topics: nombres exactos ('job.update'), prefijos terminados en punto ('stream.') o '*'.
+   * Los tópicos de estado de alta frecuencia (ui.state, estadísticas de stream, trabajos) llegan coalescidos.
+   */
+  watchEvents(topics: string[] = ['*']): Observable<{ topic: string; key: string | null; seq: number; timestamp: number; data: any }> {
+    return this.getApiUrl().pipe(
+      switchMap(baseUrl => new Observable<{ topic: string; key: string | null; seq: number; timestamp: number; data: any }>(subscriber => {
+        const source = new EventSource(`${baseUrl}/events/stream?topics=${encodeURIComponent(topics.join(','))}`);
+        const onEvent = (event: MessageEvent) => {
+          try {
+            subscriber.next(JSON.parse(event.data));
+          } catch {}
+        };
+        // Cada evento SSE lleva como nombre su tópico
+        const topicNames = ['ui.state', 'ui.face_hover', 'ui.popup_hover', 'hotkey.triggered', 'window.event',
+                            'stream.state', 'stream.stats', 'job.update'];
+        topicNames.forEach(name => source.addEventListener(name, onEvent as EventListener));
+        source.onerror = () => {
+          if (source.readyState === EventSource.CLOSED) {
+            subscriber.error(new Error('Event stream cerrado'));
+          }
+        };
+        return () => source.close();
+      }))
+    );
+  }
 } 
\ No newline at end of file
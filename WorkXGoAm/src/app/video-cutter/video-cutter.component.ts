@@ -1,7 +1,7 @@
-import { Component, OnInit, ViewChild, ElementRef } from '@angular/core';
+import { Component, OnInit, OnDestroy, ViewChild, ElementRef } from '@angular/core';
 import { CommonModule } from '@angular/common';
 import { FormsModule } from '@angular/forms';
-import { ApiService } from '../services/api.service';
+import { ApiService, VideoThumbnails, VideoProxy } from '../services/api.service';
 import { Router } from '@angular/router';
 import { open, save } from '@tauri-apps/plugin-dialog';
 import { downloadDir, basename, extname, join } from '@tauri-apps/api/path';
@@ -14,13 +14,15 @@ import { convertFileSrc } from '@tauri-apps/api/core';
   templateUrl: './video-cutter.component.html',
   styleUrls: ['./video-cutter.component.css']
 })
-export class VideoCutterComponent implements OnInit {
+export class VideoCutterComponent implements OnInit, OnDestroy {
   inputPath: string = '';
   outputPath: string = '';
   startTime: string = '00:00:00';
   endTime: string = '00:00:10';
+  cutMode: 'copy' | 'smart' | 'reencode' = 'copy';
   isProcessing: boolean = false;
   resultMessage: string = '';
+  lastOutputPath: string = '';
 
   @ViewChild('videoPlayer', { static: true }) videoPlayer!: ElementRef<HTMLVideoElement>;
 
@@ -28,11 +30,19 @@ export class VideoCutterComponent implements OnInit {
   videoInfo: string = '';
   progress: number = 0;
   statusColor: string = 'text-gray-600';
+  thumbnails: VideoThumbnails | null = null;
+  // Proxy de baja resolución: solo para la previsualización, los cortes usan siempre inputPath
+  proxyStatus: string = '';
+  private proxyPollTimer: any = null;
 
   constructor(private apiService: ApiService, private router: Router) {}
 
   ngOnInit(): void {}
 
+  ngOnDestroy(): void {
+    this.stopProxyPolling();
+  }
+
   async selectInputVideo(): Promise<void> {
     try {
       const defaultDir = await downloadDir();
@@ -84,11 +94,12 @@ export class VideoCutterComponent implements OnInit {
     }
     this.isProcessing = true;
     this.resultMessage = '';
-    this.apiService.cutVideo(this.inputPath, this.startTime, this.endTime, this.outputPath)
+    this.apiService.cutVideo(this.inputPath, this.startTime, this.endTime, this.outputPath, this.cutMode)
       .subscribe(response => {
         this.isProcessing = false;
         if (response.status === 'success') {
           this.resultMessage = 'Vídeo recortado exitosamente: ' + response.output;
+          this.lastOutputPath = response.output;
         } else {
           this.resultMessage = 'Error: ' + response.message;
         }
@@ -98,11 +109,33 @@ export class VideoCutterComponent implements OnInit {
       });
   }
 
+  /**
+   * Reproduce el último recorte servido por el backend (/video/file con Range),
+   * así el seek solo descarga los bytes necesarios.
+   */
+  previewOutput(): void {
+    if (!this.lastOutputPath) {
+      return;
+    }
+    const outputPath = this.lastOutputPath;
+    this.apiService.getVideoFileUrl(outputPath).subscribe(url => {
+      this.stopProxyPolling();
+      this.proxyStatus = '';
+      this.videoPreviewShow = true;
+      this.videoPlayer.nativeElement.src = url;
+      const segments = outputPath.split(/[\\\/]/);
+      this.videoInfo = 'Resultado: ' + (segments.pop() || outputPath);
+    });
+  }
+
   clearVideo(): void {
     this.inputPath = '';
     this.videoPreviewShow = false;
     this.videoPlayer.nativeElement.src = '';
     this.videoInfo = '';
+    this.thumbnails = null;
+    this.stopProxyPolling();
+    this.proxyStatus = '';
     this.showStatus('Video eliminado', 'text-gray-600');
   }
 
@@ -207,6 +240,99 @@ export class VideoCutterComponent implements OnInit {
     const segments = path.split(/[\\\/]/);
     this.videoInfo = segments.pop() || path;
     this.showStatus('Ruta de video de entrada actualizada', 'text-green-600');
+    this.loadThumbnails(path);
+    this.loadProxy(path);
+  }
+
+  /**
+   * Pide el proxy de baja resolución y, cuando está listo, lo usa en el reproductor
+   * manteniendo la posición actual (los timestamps del proxy coinciden con el original).
+   */
+  private loadProxy(path: string): void {
+    this.stopProxyPolling();
+    this.proxyStatus = '';
+    this.apiService.requestVideoProxy(path).subscribe({
+      next: proxy => {
+        if (this.inputPath !== path) {
+          return;
+        }
+        if (proxy.state === 'ready') {
+          this.useProxy(proxy);
+        } else if (proxy.job) {
+          this.pollProxyJob(path, proxy.job.id);
+        }
+      },
+      error: e => console.error('Error solicitando proxy:', e)
+    });
+  }
+
+  private pollProxyJob(path: string, jobId: string): void {
+    this.proxyPollTimer = setInterval(() => {
+      this.apiService.getJob(jobId).subscribe({
+        next: job => {
+          if (this.inputPath !== path) {
+            this.stopProxyPolling();
+            return;
+          }
+          if (job.status === 'done') {
+            this.stopProxyPolling();
+            this.loadProxy(path);
+          } else if (job.status === 'error') {
+            this.stopProxyPolling();
+            this.proxyStatus = '';
+            console.error('Error generando proxy:', job.error);
+          } else {
+            this.proxyStatus = `Generando proxy ${Math.round(job.progress * 100)}%`;
+          }
+        },
+        error: () => this.stopProxyPolling()
+      });
+    }, 1000);
+  }
+
+  private stopProxyPolling(): void {
+    if (this.proxyPollTimer) {
+      clearInterval(this.proxyPollTimer);
+      this.proxyPollTimer = null;
+    }
+  }
+
+  private useProxy(proxy: VideoProxy): void {
+    const player = this.videoPlayer.nativeElement;
+    const currentTime = player.currentTime;
+    const wasPlaying = !player.paused;
+    player.src = proxy.url;
+    player.currentTime = currentTime;
+    if (wasPlaying) {
+      player.play();
+    }
+    this.proxyStatus = 'Proxy';
+  }
+
+  /**
+   * Carga la línea de tiempo de miniaturas (el backend la cachea por archivo).
+   */
+  private loadThumbnails(path: string): void {
+    this.thumbnails = null;
+    this.apiService.getVideoThumbnails(path).subscribe({
+      next: thumbs => {
+        if (this.inputPath === path) {
+          this.thumbnails = thumbs;
+        }
+      },
+      error: e => console.error('Error cargando miniaturas:', e)
+    });
+  }
+
+  seekTo(seconds: number): void {
+    this.videoPlayer.nativeElement.currentTime = seconds;
+  }
+
+  formatSeconds(seconds: number): string {
+    const hours = Math.floor(seconds / 3600).toString().padStart(2, '0');
+    const minutes = Math.floor((seconds % 3600) / 60).toString().padStart(2, '0');
+    const secs = Math.floor(seconds % 60).toString().padStart(2, '0');
+    return `${hours}:${minutes}:${secs}`;
   }
 
   public goHome(): void {